@@ -3,6 +3,7 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 from django.db.models import Count
 
+from apps.accounts.models import IdempotencyRecord
 from apps.billing.models import Subscription
 
 
@@ -49,3 +50,12 @@ except admin.sites.NotRegistered:
     pass
 
 admin.site.register(User, UserAdmin)
+
+
+@admin.register(IdempotencyRecord)
+class IdempotencyRecordAdmin(admin.ModelAdmin):
+    list_display = ("owner", "method", "path", "status_code", "created_at")
+    list_filter = ("method", "status_code", "created_at")
+    search_fields = ("owner__username", "owner__email", "path")
+    readonly_fields = ("owner", "key_hash", "method", "path", "status_code", "response_body", "created_at")
+    ordering = ("-created_at",)
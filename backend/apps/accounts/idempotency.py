@@ -0,0 +1,170 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from redis.exceptions import RedisError
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from apps.accounts.models import IdempotencyRecord
+from core.cache_utils import build_cache_key
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+def _cache_get(key: str):
+    try:
+        return cache.get(key)
+    except RedisError:
+        return None
+
+
+def _cache_set(key: str, value, timeout: int) -> None:
+    try:
+        cache.set(key, value, timeout=timeout)
+    except RedisError:
+        pass
+
+
+def purge_expired_records() -> int:
+    """Deletes stored responses older than IDEMPOTENCY_TTL_SECONDS; returns how many went."""
+    cutoff = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+    deleted, _ = IdempotencyRecord.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def _replay(entry: dict) -> Response:
+    response = Response(entry["body"], status=entry["status"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _mismatch() -> Response:
+    return Response(
+        {"detail": f"This {IDEMPOTENCY_HEADER} was already used with a different request body."},
+        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    )
+
+
+def _canonical(value):
+    if isinstance(value, UploadedFile):
+        # Files count by content: a re-sent upload gets a new multipart boundary but the same bytes.
+        digest = hashlib.sha256()
+        for chunk in value.chunks():
+            digest.update(chunk)
+        value.seek(0)
+        return {"name": value.name, "sha256": digest.hexdigest()}
+    return value
+
+
+def request_fingerprint(request) -> str:
+    """sha256 of the parsed request body, so a key cannot be reused for a different request."""
+    data = request.data
+    if hasattr(data, "lists"):
+        data = {name: [_canonical(value) for value in values] for name, values in data.lists()}
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _in_progress() -> Response:
+    return Response(
+        {"detail": "A request with this Idempotency-Key is still being processed."},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
+def idempotent(view_method):
+    """Replays the stored response when a client retries with the same ``Idempotency-Key``.
+
+    Only successful responses are stored: a 4xx or 5xx had no side effects worth
+    protecting, so the key is released and the retry runs normally. Lookups hit the
+    cache (Redis) first and the ``IdempotencyRecord`` table second; the table's unique
+    constraint decides which of two concurrent requests runs. A key reused with a
+    different body gets 422 instead of someone else's response.
+
+    The body is parsed before the view runs, so views that install upload handlers
+    must do so in ``initial()``.
+    """
+
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        client_key = request.headers.get(IDEMPOTENCY_HEADER, "").strip()
+        if not client_key:
+            return view_method(view, request, *args, **kwargs)
+        if len(client_key) > MAX_KEY_LENGTH:
+            return Response(
+                {"detail": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        key_hash = hashlib.sha256(f"{request.method}\x00{request.path}\x00{client_key}".encode("utf-8")).hexdigest()
+        cache_key = build_cache_key("idempotency", f"{request.user.id}:{key_hash}")
+        ttl = settings.IDEMPOTENCY_TTL_SECONDS
+
+        request_hash = request_fingerprint(request)
+
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            if cached.get("request_hash", request_hash) != request_hash:
+                return _mismatch()
+            return _replay(cached)
+
+        now = timezone.now()
+        records = IdempotencyRecord.objects.filter(owner=request.user, key_hash=key_hash)
+        record = records.first()
+        if record is not None:
+            if record.created_at < now - timedelta(seconds=ttl):
+                records.filter(pk=record.pk).delete()
+            elif record.request_hash and record.request_hash != request_hash:
+                return _mismatch()
+            elif record.status_code is not None:
+                entry = {"status": record.status_code, "body": record.response_body, "request_hash": request_hash}
+                _cache_set(cache_key, entry, ttl - int((now - record.created_at).total_seconds()))
+                return _replay(entry)
+            elif record.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS):
+                # The first attempt died mid-request; let this one run instead. Conditional, so a
+                # record that was completed meanwhile is replayed by the next retry, not dropped.
+                records.filter(pk=record.pk, status_code__isnull=True).delete()
+            else:
+                return _in_progress()
+
+        try:
+            with transaction.atomic():
+                record = IdempotencyRecord.objects.create(
+                    owner=request.user,
+                    key_hash=key_hash,
+                    method=request.method,
+                    path=request.path[:500],
+                    request_hash=request_hash,
+                )
+        except IntegrityError:
+            return _in_progress()
+
+        # Updates go through the queryset: a retry may have taken the record over, and a lost
+        # row must not turn a finished request into a 500.
+        claimed = IdempotencyRecord.objects.filter(pk=record.pk)
+        try:
+            response = view_method(view, request, *args, **kwargs)
+        except Exception:
+            claimed.delete()
+            raise
+
+        if not status.is_success(response.status_code):
+            claimed.delete()
+            return response
+
+        # Round-trip through JSON so UUIDs and datetimes are stored exactly as the client saw them.
+        body = json.loads(JSONRenderer().render(response.data) or b"null")
+        if claimed.update(status_code=response.status_code, response_body=body):
+            entry = {"status": response.status_code, "body": body, "request_hash": request_hash}
+            _cache_set(cache_key, entry, ttl)
+        return response
+
+    return wrapper
@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class IdempotencyRecord(models.Model):
+    """Durable copy of a response replayed for retries carrying the same ``Idempotency-Key``.
+
+    ``status_code`` stays null while the first request is still running. Redis holds
+    the same entry for fast replays; this row survives evictions and Redis outages.
+    """
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="idempotency_records")
+    # sha256 of method, path and the client key, so keys are scoped to one endpoint.
+    key_hash = models.CharField(max_length=64)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    # sha256 of the parsed body; a key reused for a different request is rejected.
+    request_hash = models.CharField(max_length=64, blank=True, default="")
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["owner", "key_hash"], name="unique_idempotency_key_per_owner")]
+        indexes = [models.Index(fields=["created_at"])]
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from apps.accounts.idempotency import purge_expired_records
+
+
+@shared_task
+def purge_idempotency_records() -> int:
+    """Run by beat every IDEMPOTENCY_PURGE_INTERVAL_SECONDS, so expired records do not pile up."""
+    return purge_expired_records()
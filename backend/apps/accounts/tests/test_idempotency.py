@@ -0,0 +1,98 @@
+import hashlib
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import IdempotencyRecord
+from apps.accounts.tasks import purge_idempotency_records
+from apps.resumes.models import Resume, ResumeVersion
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class IdempotencyKeyTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="retrier", password="StrongPass123")
+        self.client.force_authenticate(self.user)
+
+    def test_resume_create_retry_does_not_duplicate(self):
+        payload = {"title": "Backend CV", "content": {"summary": "Python"}}
+        first = self.client.post("/api/resumes", payload, format="json", HTTP_IDEMPOTENCY_KEY="create-1")
+        retry = self.client.post("/api/resumes", payload, format="json", HTTP_IDEMPOTENCY_KEY="create-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(Resume.objects.count(), 1)
+        self.assertEqual(ResumeVersion.objects.count(), 1)
+
+    def test_resume_patch_retry_does_not_add_versions(self):
+        resume = Resume.objects.create(owner=self.user, title="CV", content={})
+        for _ in range(3):
+            res = self.client.patch(
+                f"/api/resumes/{resume.id}", {"title": "CV v2"}, format="json", HTTP_IDEMPOTENCY_KEY="patch-1"
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(ResumeVersion.objects.filter(resume=resume).count(), 1)
+
+    def test_failed_request_releases_the_key(self):
+        invalid = self.client.post("/api/resumes", {"content": {}}, format="json", HTTP_IDEMPOTENCY_KEY="create-2")
+        valid = self.client.post("/api/resumes", {"title": "CV"}, format="json", HTTP_IDEMPOTENCY_KEY="create-2")
+
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(valid.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(IdempotencyRecord.objects.get().status_code, status.HTTP_201_CREATED)
+
+    def test_key_still_running_returns_conflict(self):
+        key_hash = hashlib.sha256(b"POST\x00/api/resumes\x00busy").hexdigest()
+        IdempotencyRecord.objects.create(owner=self.user, key_hash=key_hash, method="POST", path="/api/resumes")
+
+        res = self.client.post("/api/resumes", {"title": "CV"}, format="json", HTTP_IDEMPOTENCY_KEY="busy")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Resume.objects.exists())
+
+    def test_key_reused_with_a_different_body_is_rejected(self):
+        first = self.client.post("/api/resumes", {"title": "CV"}, format="json", HTTP_IDEMPOTENCY_KEY="create-3")
+        reused = self.client.post("/api/resumes", {"title": "Other"}, format="json", HTTP_IDEMPOTENCY_KEY="create-3")
+        cache.clear()
+        from_db = self.client.post("/api/resumes", {"title": "Other"}, format="json", HTTP_IDEMPOTENCY_KEY="create-3")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(reused.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(from_db.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Resume.objects.count(), 1)
+
+    def test_first_attempt_survives_losing_its_record_to_a_retry(self):
+        create_version = ResumeVersion.objects.create
+
+        def create_after_takeover(**kwargs):
+            # A retry past IDEMPOTENCY_LOCK_SECONDS took the key over while this attempt still ran.
+            IdempotencyRecord.objects.all().delete()
+            return create_version(**kwargs)
+
+        with mock.patch.object(ResumeVersion.objects, "create", side_effect=create_after_takeover):
+            res = self.client.post("/api/resumes", {"title": "CV"}, format="json", HTTP_IDEMPOTENCY_KEY="slow")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+    @override_settings(IDEMPOTENCY_TTL_SECONDS=3600)
+    def test_scheduled_purge_drops_expired_records(self):
+        expired, fresh = (
+            IdempotencyRecord.objects.create(owner=self.user, key_hash=key, method="POST", path="/api/resumes")
+            for key in ("expired", "fresh")
+        )
+        IdempotencyRecord.objects.filter(pk=expired.pk).update(created_at=timezone.now() - timedelta(hours=2))
+
+        self.assertEqual(purge_idempotency_records.apply().get(), 1)
+        self.assertEqual(list(IdempotencyRecord.objects.all()), [fresh])
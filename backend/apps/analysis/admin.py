@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from apps.analysis.models import AnalyzeJob, AnalyzeUsage
+from apps.analysis.models import AnalyzeBatch, AnalyzeJob, AnalyzeResult, AnalyzeUsage
 
 
 @admin.register(AnalyzeJob)
@@ -10,21 +10,49 @@ class AnalyzeJobAdmin(admin.ModelAdmin):
         "owner",
         "source_type",
         "status",
+        "stage",
+        "prompt_tokens_saved",
         "created_at",
         "updated_at",
     )
     list_filter = ("status", "source_type", "created_at", "updated_at")
     search_fields = ("id", "owner__username", "owner__email", "source_input", "error_message")
-    readonly_fields = ("id", "created_at", "updated_at")
+    readonly_fields = (
+        "id",
+        "batch",
+        "content_hash",
+        "stage",
+        "checkpoint",
+        "prescore",
+        "billed_at",
+        "heartbeat_at",
+        "reap_count",
+        "created_at",
+        "updated_at",
+    )
     autocomplete_fields = ("owner",)
     ordering = ("-created_at",)
     fieldsets = (
-        ("Ownership", {"fields": ("owner",)}),
-        ("Source", {"fields": ("source_type", "source_input", "source_file_key")}),
-        ("Execution", {"fields": ("status", "error_message")}),
+        ("Ownership", {"fields": ("owner", "batch")}),
+        ("Source", {"fields": ("source_type", "source_input", "source_file_key", "content_hash")}),
+        ("Execution", {"fields": ("status", "error_message", "stage", "checkpoint", "prescore", "billed_at", "heartbeat_at", "reap_count")}),
         ("Audit", {"fields": ("id", "created_at", "updated_at")}),
     )
 
+    @admin.display(description="Tokens saved")
+    def prompt_tokens_saved(self, obj):
+        return (obj.checkpoint or {}).get("prompt_budget", {}).get("tokens_saved")
+
+
+@admin.register(AnalyzeBatch)
+class AnalyzeBatchAdmin(admin.ModelAdmin):
+    list_display = ("id", "owner", "status", "total", "created_at", "finished_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("id", "owner__username", "owner__email", "error_message")
+    readonly_fields = ("id", "archive_key", "total", "ranking", "created_at", "updated_at", "finished_at")
+    autocomplete_fields = ("owner",)
+    ordering = ("-created_at",)
+
 
 @admin.register(AnalyzeUsage)
 class AnalyzeUsageAdmin(admin.ModelAdmin):
@@ -34,3 +62,17 @@ class AnalyzeUsageAdmin(admin.ModelAdmin):
     readonly_fields = ("created_at",)
     autocomplete_fields = ("owner",)
     ordering = ("-created_at",)
+
+
+@admin.register(AnalyzeResult)
+class AnalyzeResultAdmin(admin.ModelAdmin):
+    list_display = ("job", "payload_size", "created_at")
+    list_filter = ("created_at",)
+    search_fields = ("job__id", "job__owner__username", "job__owner__email")
+    readonly_fields = ("job", "payload_size", "created_at")
+    exclude = ("payload",)
+    ordering = ("-created_at",)
+
+    @admin.display(description="Compressed bytes")
+    def payload_size(self, obj):
+        return len(obj.payload or b"")
@@ -0,0 +1,87 @@
+import zipfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count
+
+from apps.analysis.models import AnalyzeJob
+from apps.analysis.results import decompress_result
+
+# Archive members with other extensions (images, __MACOSX metadata, folders) are skipped.
+BATCH_ARCHIVE_SUFFIXES = (".pdf", ".docx", ".txt")
+RANKING_KEYWORD_LIMIT = 5
+
+
+class BatchArchiveError(Exception):
+    pass
+
+
+def list_archive_members(archive) -> list:
+    """Validates a batch zip from its central directory only; nothing is decompressed here."""
+    max_member_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    try:
+        with zipfile.ZipFile(archive) as bundle:
+            members = [
+                info
+                for info in bundle.infolist()
+                if not info.is_dir()
+                and not Path(info.filename).name.startswith(".")
+                and not info.filename.startswith("__MACOSX/")
+                and Path(info.filename).suffix.lower() in BATCH_ARCHIVE_SUFFIXES
+            ]
+    except zipfile.BadZipFile as exc:
+        raise BatchArchiveError("Archive is not a valid zip file.") from exc
+    finally:
+        if hasattr(archive, "seek"):
+            archive.seek(0)
+
+    if not members:
+        raise BatchArchiveError("Archive contains no PDF, DOCX or TXT files.")
+    if len(members) > settings.ANALYZE_BATCH_MAX_FILES:
+        raise BatchArchiveError(f"Archive contains more than {settings.ANALYZE_BATCH_MAX_FILES} files.")
+    oversized = next((info.filename for info in members if info.file_size > max_member_bytes), None)
+    if oversized:
+        raise BatchArchiveError(f"File too large: {oversized}")
+    return members
+
+
+def batch_progress(batch) -> dict:
+    counts = dict(batch.jobs.order_by().values_list("status").annotate(count=Count("id")))
+    progress = {value: counts.get(value, 0) for value in AnalyzeJob.Status.values}
+    progress["total"] = batch.total
+    return progress
+
+
+def build_batch_ranking(batch) -> list:
+    """Completed CVs ordered by ATS score, followed by the ones that failed."""
+    ranked = []
+    failed = []
+    jobs = batch.jobs.select_related("result_record").order_by("source_input")
+    for job in jobs:
+        result_record = getattr(job, "result_record", None)
+        if job.status != AnalyzeJob.Status.COMPLETED or result_record is None:
+            failed.append(
+                {
+                    "job_id": str(job.id),
+                    "source_input": job.source_input,
+                    "status": job.status,
+                    "error_message": job.error_message,
+                }
+            )
+            continue
+        result = decompress_result(result_record.payload)
+        ranked.append(
+            {
+                "job_id": str(job.id),
+                "source_input": job.source_input,
+                "status": job.status,
+                "ats_score": result.get("ats_score", 0),
+                "overall_summary": result.get("overall_summary", ""),
+                "missing_keywords": result.get("missing_keywords", [])[:RANKING_KEYWORD_LIMIT],
+            }
+        )
+
+    ranked.sort(key=lambda entry: entry["ats_score"], reverse=True)
+    for position, entry in enumerate(ranked, start=1):
+        entry["rank"] = position
+    return ranked + failed
@@ -0,0 +1,66 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+from apps.analysis.models import AnalyzeJob
+from core.cache_utils import build_cache_key, get_cache_counters, increment_cache_counter
+
+IN_FLIGHT_STATUSES = (AnalyzeJob.Status.PENDING, AnalyzeJob.Status.PROCESSING)
+
+
+class AnalyzeCoalescer:
+    """Single-flight for identical submissions (same owner, source bytes or URL, and JD).
+
+    The first job claims a short-lived cache key (SET NX in Redis) holding its id;
+    identical submissions while that job is still pending or processing get the
+    same job back instead of a second Gemini call. The key is never released
+    explicitly: once the leader is finished the next submission takes it over.
+    """
+
+    prefix = "analyze_inflight"
+
+    def key(self, owner_id, source_type: str, source_identity: str, job_description: str) -> str:
+        # Whitespace-only edits to the JD still describe the same job.
+        normalized_jd = " ".join((job_description or "").split())
+        digest = hashlib.sha256(f"{source_type}\x00{source_identity}\x00{normalized_jd}".encode("utf-8")).hexdigest()
+        return build_cache_key(self.prefix, f"{owner_id}:{digest}")
+
+    def find_leader(self, key: str, owner):
+        try:
+            job_id = cache.get(key)
+        except RedisError:
+            # Coalescing is an optimisation; without Redis every submission simply runs.
+            return None
+        if not job_id:
+            return None
+        return AnalyzeJob.objects.filter(id=job_id, owner=owner, status__in=IN_FLIGHT_STATUSES).first()
+
+    def claim(self, key: str, job: AnalyzeJob):
+        """Registers ``job`` as the leader; returns the in-flight leader if another request won."""
+        ttl = settings.ANALYZE_COALESCE_TTL_SECONDS
+        try:
+            if cache.add(key, str(job.id), timeout=ttl):
+                return None
+            leader = self.find_leader(key, job.owner)
+            if leader is not None and leader.id != job.id:
+                return leader
+            # The previous leader has finished (or vanished); this job takes over.
+            cache.set(key, str(job.id), timeout=ttl)
+        except RedisError:
+            pass
+        return None
+
+    def record_hit(self) -> None:
+        try:
+            increment_cache_counter(build_cache_key(self.prefix, "stats:coalesced"))
+        except RedisError:
+            pass
+
+    def stats(self) -> dict:
+        key = build_cache_key(self.prefix, "stats:coalesced")
+        return {"coalesced": get_cache_counters([key])[key]}
+
+
+analyze_coalescer = AnalyzeCoalescer()
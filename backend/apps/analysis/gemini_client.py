@@ -1,8 +1,19 @@
 ﻿import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 
 from django.conf import settings
 
+from apps.analysis.hedging import LatencyTracker, hedge_stats
+from apps.analysis.llm_governor import LLMRateLimited, gemini_governor
+from apps.analysis.prescore import prescore
+from apps.analysis.prompt_budget import budget_source_text
+from apps.analysis.result_cache import analysis_cache
+from apps.analysis.streaming import PartialJSONObjectParser
+
 
 @dataclass
 class AnalysisResult:
@@ -18,28 +29,197 @@ class AnalysisResult:
 
 
 class GeminiClient:
+    """Per-process Gemini wrapper.
+
+    ``genai.configure()`` drops every cached service client, so it runs once per
+    process (re-run after fork) and GenerativeModel instances are kept per model
+    name; calls then reuse the same channel / HTTP session.
+    """
+
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
         self.model_name = settings.GEMINI_MODEL
+        self._lock = threading.Lock()
+        self._pid = None
+        self._models = {}
+        self._executor = None
+        self._executor_pid = None
+        self.latency_tracker = LatencyTracker()
 
-    def analyze_resume(self, resume_text: str, job_description: str = "", source_kind: str = "cv") -> dict:
-        if not self.api_key:
-            return self._mock_result(resume_text, job_description, source_kind)
+    def get_model(self, model_name: str = ""):
+        model_name = model_name or self.model_name
+        with self._lock:
+            if self._pid != os.getpid():
+                # Channels created before a prefork fork are not safe to share with children.
+                self._configure()
+                self._pid = os.getpid()
+                self._models = {}
+            model = self._models.get(model_name)
+            if model is None:
+                import google.generativeai as genai
 
+                model = genai.GenerativeModel(model_name)
+                self._models[model_name] = model
+            return model
+
+    def warm_up(self) -> None:
+        if not self.api_key:
+            return
         try:
-            import google.generativeai as genai
+            from google.generativeai import client as genai_client
+
+            self.get_model()
+            genai_client.get_default_generative_client()
+        except Exception:
+            # Warm-up is best effort; the first real call configures the client again.
+            self._pid = None
 
-            genai.configure(api_key=self.api_key)
-            model = genai.GenerativeModel(self.model_name)
+    def _configure(self) -> None:
+        import google.generativeai as genai
 
-            prompt = self._build_prompt(resume_text, job_description, source_kind)
-            response = model.generate_content(prompt)
-            payload = self._extract_json(response.text)
-            return self._normalize_payload(payload)
+        options = {"api_key": self.api_key}
+        if settings.GEMINI_TRANSPORT:
+            options["transport"] = settings.GEMINI_TRANSPORT
+        if settings.GEMINI_API_ENDPOINT:
+            options["client_options"] = {"api_endpoint": settings.GEMINI_API_ENDPOINT}
+        genai.configure(**options)
+
+    def analyze_resume(
+        self,
+        resume_text: str,
+        job_description: str = "",
+        source_kind: str = "cv",
+        cache_owner_id=None,
+        prompt: str = "",
+        on_partial=None,
+    ) -> dict:
+        if not self.api_key:
+            return self._mock_result(resume_text, job_description, source_kind)
+
+        cached = analysis_cache.get(resume_text, job_description, source_kind, self.model_name, cache_owner_id)
+        if cached is not None:
+            return cached
+
+        try:
+            prompt = prompt or self.build_prompt(budget_source_text(resume_text).text, job_description, source_kind)
+            result = self._generate(prompt, on_partial)
+        except LLMRateLimited:
+            # Capacity problems are retried later by the task, not papered over with mock output.
+            raise
         except Exception:
             return self._mock_result(resume_text, job_description, source_kind)
 
-    def _build_prompt(self, source_text: str, job_description: str, source_kind: str) -> str:
+        # Only real model output is cached; fallbacks must not mask a recovered provider. A hedge
+        # won by GEMINI_FALLBACK_MODEL is keyed under that model, not served as the primary's answer.
+        model_name = result.get("llm_meta", {}).get("model", self.model_name)
+        analysis_cache.set(resume_text, job_description, source_kind, model_name, result, cache_owner_id)
+        return result
+
+    def _generate(self, prompt: str, on_partial=None) -> dict:
+        if settings.GEMINI_HEDGE_ENABLED:
+            text, meta = self._generate_hedged(prompt, on_partial)
+        else:
+            started = time.monotonic()
+            text = self._call_model(self.model_name, prompt, on_partial)
+            meta = {"model": self.model_name, "path": "primary", "hedged": False}
+            self.latency_tracker.record(time.monotonic() - started)
+
+        payload = self._normalize_payload(self._extract_json(text))
+        payload["llm_meta"] = meta
+        return payload
+
+    def _call_model(self, model_name: str, prompt: str, on_partial=None) -> str:
+        from google.api_core.exceptions import ResourceExhausted
+
+        model = self.get_model(model_name)
+        with gemini_governor.slot(prompt):
+            try:
+                if on_partial is None or not settings.GEMINI_STREAMING_ENABLED:
+                    return model.generate_content(prompt).text
+                return self._stream_model(model, prompt, on_partial)
+            except ResourceExhausted as exc:
+                raise LLMRateLimited(retry_after=settings.GEMINI_PROVIDER_BACKOFF_SECONDS) from exc
+
+    def _stream_model(self, model, prompt: str, on_partial) -> str:
+        # Top-level fields are handed to on_partial as soon as each one is complete;
+        # the caller still parses and normalizes the full text afterwards.
+        parser = PartialJSONObjectParser()
+        parts = []
+        for chunk in model.generate_content(prompt, stream=True):
+            text = chunk.text
+            parts.append(text)
+            fields = self._normalize_partial(parser.feed(text))
+            if fields:
+                on_partial(fields)
+        return "".join(parts)
+
+    def _generate_hedged(self, prompt: str, on_partial=None):
+        """Races a second request against a slow primary and keeps whichever answers first.
+
+        The hedge fires once the primary exceeds the configured latency percentile.
+        Python threads cannot abort an in-flight HTTP call, so the loser is cancelled
+        if it has not started and otherwise left to finish with its result discarded.
+        """
+        executor = self._get_executor()
+        hedge_stats.record("calls")
+        started = time.monotonic()
+
+        def record_primary_latency(future):
+            if not future.cancelled() and future.exception() is None:
+                self.latency_tracker.record(time.monotonic() - started)
+
+        # Only the primary streams partial fields; a winning hedge is reported by the final result.
+        # Once a winner is picked the primary may still be streaming, so forwarding stops there.
+        settled = False
+        settled_lock = threading.Lock()
+
+        def forward_partial(fields):
+            with settled_lock:
+                if not settled:
+                    on_partial(fields)
+
+        primary = executor.submit(self._call_model, self.model_name, prompt, forward_partial if on_partial else None)
+        primary.add_done_callback(record_primary_latency)
+        done, _ = wait([primary], timeout=self.latency_tracker.hedge_delay())
+        if done:
+            hedge_stats.record("primary_wins")
+            return primary.result(), {"model": self.model_name, "path": "primary", "hedged": False}
+
+        hedge_model = settings.GEMINI_FALLBACK_MODEL or self.model_name
+        hedge = executor.submit(self._call_model, hedge_model, prompt)
+        hedge_stats.record("hedges_fired")
+        paths = {primary: ("primary", self.model_name), hedge: ("hedge", hedge_model)}
+
+        pending = set(paths)
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    first_error = first_error or future.exception()
+                    continue
+                with settled_lock:
+                    settled = True
+                for loser in pending:
+                    loser.cancel()
+                path, model_name = paths[future]
+                hedge_stats.record(f"{path}_wins")
+                return future.result(), {"model": model_name, "path": path, "hedged": True}
+        raise first_error
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                # Each hedged call holds up to two threads; size for threaded/gevent pools too.
+                self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="gemini-hedge")
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def hedge_stats(self) -> dict:
+        return hedge_stats.snapshot(self.latency_tracker)
+
+    def build_prompt(self, source_text: str, job_description: str, source_kind: str, skill_gap=None) -> str:
+        # source_text comes already budgeted (budget_source_text); the pipeline keeps the report.
         return (
             "You are a senior technical recruiter and ATS reviewer. "
             "Analyze the candidate source and return STRICT JSON only. "
@@ -58,8 +238,21 @@ class GeminiClient:
             "}\n\n"
             f"Source kind: {source_kind}\n"
             f"Target job description:\n{job_description or 'Not provided'}\n\n"
+            f"{self._skill_gap_section(skill_gap)}"
             "Candidate source:\n"
-            f"{source_text[:12000]}\n"
+            f"{source_text}\n"
+        )
+
+    def _skill_gap_section(self, skill_gap) -> str:
+        # Taxonomy matches are exact, so the model is told to trust them rather than re-derive the gap.
+        if not skill_gap or not skill_gap.get("required_skills"):
+            return ""
+        return (
+            "Skill gap from the taxonomy matcher (authoritative; list these missing skills first "
+            "in missing_keywords):\n"
+            f"Required: {', '.join(skill_gap['required_skills'])}\n"
+            f"Matched: {', '.join(skill_gap['matched']) or 'none'}\n"
+            f"Missing: {', '.join(skill_gap['missing']) or 'none'}\n\n"
         )
 
     def _extract_json(self, text: str) -> dict:
@@ -85,20 +278,25 @@ class GeminiClient:
             "next_actions": self._as_str_list(payload.get("next_actions", [])),
         }
 
+    def _normalize_partial(self, fields: dict) -> dict:
+        known = {}
+        for key, value in fields.items():
+            try:
+                known[key] = self._normalize_payload({key: value})[key]
+            except (KeyError, TypeError, ValueError):
+                continue
+        return known
+
     def _as_str_list(self, value):
         if not isinstance(value, list):
             return []
         return [str(item) for item in value if item is not None][:12]
 
     def _mock_result(self, source_text: str, job_description: str, source_kind: str) -> dict:
-        baseline = 60
-        if job_description:
-            baseline += 8
-        if source_kind == "github":
-            baseline += 4
-
+        # Score and keyword gaps come from the local engine; the prose stays generic.
+        local = prescore(source_text, job_description)
         return {
-            "ats_score": min(96, baseline),
+            "ats_score": local.ats_score,
             "overall_summary": "Candidate shows practical engineering impact but can improve keyword alignment and clarity.",
             "strengths": [
                 "Clear evidence of technical delivery.",
@@ -108,7 +306,7 @@ class GeminiClient:
                 "Profile needs stronger role-specific terminology.",
                 "Some achievements should include clearer scope and impact numbers.",
             ],
-            "missing_keywords": ["system design", "stakeholder management", "production reliability"],
+            "missing_keywords": local.missing_keywords,
             "feature_highlights": [
                 "Demonstrated measurable improvements in performance.",
                 "Hands-on experience with APIs and async workflows.",
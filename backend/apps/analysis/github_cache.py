@@ -0,0 +1,103 @@
+import hashlib
+import time
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from core.cache_utils import (
+    build_cache_key,
+    get_cache_counters,
+    get_json_cache,
+    increment_cache_counter,
+    set_json_cache,
+)
+
+OUTCOMES = ("fresh", "revalidated", "misses")
+
+
+class GitHubResponseCache:
+    """Conditional-request cache for GitHub API GETs, shared by all workers through Redis.
+
+    Successful responses are stored with their ETag / Last-Modified. Within
+    GITHUB_CACHE_FRESH_SECONDS an entry is served without any request; after that
+    it is revalidated with If-None-Match / If-Modified-Since, and a 304 (which
+    GitHub does not count against the rate limit) serves the stored body again.
+    """
+
+    prefix = "github_http"
+
+    @property
+    def enabled(self) -> bool:
+        return settings.GITHUB_CACHE_ENABLED
+
+    def build_key(self, url: str, accept: str) -> str:
+        # The token is left out on purpose: every worker scrapes with the same credentials,
+        # so a stored body is exactly what any of them would get back.
+        digest = hashlib.sha256(f"{url}\x00{accept}".encode("utf-8")).hexdigest()
+        return build_cache_key(self.prefix, digest)
+
+    def fetch(self, url: str, headers: dict, send) -> tuple:
+        """(status_code, body) for ``url``; ``send(headers)`` performs the actual request."""
+        if not self.enabled:
+            response = send(headers)
+            return response.status_code, response.text
+
+        key = self.build_key(url, headers.get("Accept", ""))
+        entry = self._get(key)
+        if entry is not None and time.time() - entry["fetched_at"] < settings.GITHUB_CACHE_FRESH_SECONDS:
+            self._count("fresh")
+            return entry["status"], entry["body"]
+
+        conditional = dict(headers)
+        if entry is not None:
+            if entry.get("etag"):
+                conditional["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                conditional["If-Modified-Since"] = entry["last_modified"]
+        response = send(conditional)
+
+        if response.status_code == 304 and entry is not None:
+            self._count("revalidated")
+            entry["fetched_at"] = time.time()
+            self._set(key, entry)
+            return entry["status"], entry["body"]
+
+        self._count("misses")
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        # Errors are never stored; a body without validators is still worth its fresh window.
+        if response.status_code < 300:
+            self._set(key, {**validators, "status": response.status_code, "body": response.text, "fetched_at": time.time()})
+        return response.status_code, response.text
+
+    def stats(self) -> dict:
+        keys = {outcome: self._counter_key(outcome) for outcome in OUTCOMES}
+        counters = get_cache_counters(list(keys.values()))
+        stats = {outcome: counters[key] for outcome, key in keys.items()}
+        lookups = sum(stats.values())
+        # Fresh hits make no request at all; revalidations make one that costs no rate-limit budget.
+        stats["budget_saved_rate"] = round((stats["fresh"] + stats["revalidated"]) / lookups, 4) if lookups else 0.0
+        return {"enabled": self.enabled, **stats}
+
+    def _get(self, key: str):
+        try:
+            return get_json_cache(key)
+        except RedisError:
+            return None
+
+    def _set(self, key: str, entry: dict) -> None:
+        try:
+            set_json_cache(key, entry, settings.GITHUB_CACHE_TTL_SECONDS)
+        except RedisError:
+            pass
+
+    def _count(self, outcome: str) -> None:
+        try:
+            increment_cache_counter(self._counter_key(outcome))
+        except RedisError:
+            pass
+
+    def _counter_key(self, name: str) -> str:
+        return build_cache_key(self.prefix, f"stats:{name}")
+
+
+github_response_cache = GitHubResponseCache()
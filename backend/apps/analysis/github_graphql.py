@@ -0,0 +1,122 @@
+"""GitHub GraphQL scraping: one query per source instead of a REST call per resource.
+
+The mappers return the same dicts as GitHubScraper's REST path, so
+``to_analysis_text`` and the skill gap consume either unchanged.
+"""
+
+from collections import Counter
+
+# README candidates in the order GitHub itself prefers them.
+_README_FIELDS = """
+    readmeMd: object(expression: "HEAD:README.md") { ... on Blob { text } }
+    readmeLower: object(expression: "HEAD:readme.md") { ... on Blob { text } }
+    readmeRst: object(expression: "HEAD:README.rst") { ... on Blob { text } }
+    readmePlain: object(expression: "HEAD:README") { ... on Blob { text } }
+"""
+
+_REPO_FIELDS = """
+    name
+    nameWithOwner
+    description
+    stargazerCount
+    forkCount
+    pushedAt
+    updatedAt
+    primaryLanguage { name }
+    languages(first: 10, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }
+    repositoryTopics(first: 20) { nodes { topic { name } } }
+"""
+
+REPO_QUERY = (
+    "query($owner: String!, $name: String!) {\n"
+    "  repository(owner: $owner, name: $name) {\n" + _REPO_FIELDS + _README_FIELDS + "  }\n"
+    "}"
+)
+
+USER_QUERY = (
+    "query($login: String!, $repos: Int!) {\n"
+    "  user(login: $login) {\n"
+    "    login\n"
+    "    name\n"
+    "    bio\n"
+    "    followers { totalCount }\n"
+    "    repositories(privacy: PUBLIC, ownerAffiliations: OWNER) { totalCount }\n"
+    "    topRepositories: repositories(first: $repos, privacy: PUBLIC, ownerAffiliations: OWNER, isFork: false,\n"
+    "                                  orderBy: {field: PUSHED_AT, direction: DESC}) {\n"
+    "      nodes {" + _REPO_FIELDS + "}\n"
+    "    }\n"
+    "  }\n"
+    # The <login>/<login> repository holds the profile README shown on the user's page.
+    "  profile: repository(owner: $login, name: $login) {\n" + _README_FIELDS + "  }\n"
+    "}"
+)
+
+
+def _readme(node: dict) -> str:
+    for field in ("readmeMd", "readmeLower", "readmeRst", "readmePlain"):
+        blob = (node or {}).get(field)
+        if blob and blob.get("text"):
+            return blob["text"]
+    return ""
+
+
+def _language_sizes(repo: dict) -> list:
+    return [(edge["node"]["name"], edge["size"]) for edge in (repo.get("languages") or {}).get("edges") or []]
+
+
+def _topics(repo: dict) -> list:
+    return [node["topic"]["name"] for node in (repo.get("repositoryTopics") or {}).get("nodes") or []]
+
+
+def map_repo(repo: dict, input_url: str, readme_chars: int) -> dict:
+    return {
+        "source_type": "github_repo",
+        "input": input_url,
+        "full_name": repo.get("nameWithOwner", ""),
+        "description": repo.get("description") or "",
+        "stars": repo.get("stargazerCount", 0),
+        "forks": repo.get("forkCount", 0),
+        "topics": _topics(repo),
+        "languages": [name for name, _ in _language_sizes(repo)],
+        "readme_excerpt": _readme(repo)[:readme_chars],
+        "pushed_at": repo.get("pushedAt") or "",
+    }
+
+
+def map_user(data: dict, input_url: str, readme_chars: int) -> dict:
+    user = data["user"]
+    repos = (user.get("topRepositories") or {}).get("nodes") or []
+
+    # Languages are ranked by bytes written across the top repos, not by repo count.
+    language_bytes = Counter()
+    topics = []
+    repo_summaries = []
+    for repo in repos:
+        for name, size in _language_sizes(repo):
+            language_bytes[name] += size
+        repo_topics = _topics(repo)
+        topics.extend(topic for topic in repo_topics if topic not in topics)
+        repo_summaries.append(
+            {
+                "name": repo.get("name", ""),
+                "description": repo.get("description") or "",
+                "stars": repo.get("stargazerCount", 0),
+                "language": (repo.get("primaryLanguage") or {}).get("name", ""),
+                "updated_at": repo.get("pushedAt") or repo.get("updatedAt") or "",
+                "topics": repo_topics,
+            }
+        )
+
+    return {
+        "source_type": "github_user",
+        "input": input_url,
+        "username": user.get("login", ""),
+        "name": user.get("name") or "",
+        "bio": user.get("bio") or "",
+        "followers": (user.get("followers") or {}).get("totalCount", 0),
+        "public_repos": (user.get("repositories") or {}).get("totalCount", 0),
+        "top_languages": [name for name, _ in language_bytes.most_common(10)],
+        "topics": topics,
+        "recent_repos": repo_summaries,
+        "profile_readme": _readme(data.get("profile"))[:readme_chars],
+    }
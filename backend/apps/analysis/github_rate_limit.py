@@ -0,0 +1,129 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+from core.cache_utils import build_cache_key, get_cache_counters, increment_cache_counter
+
+ANONYMOUS = ""
+
+
+class GitHubRateLimited(Exception):
+    """Raised when every configured GitHub token is out of budget until its reset."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"GitHub rate limit exhausted; retry in {retry_after:.0f}s.")
+        self.retry_after = retry_after
+
+
+class GitHubTokenPool:
+    """Shared view of each token's X-RateLimit budget, per API resource ("core", "graphql").
+
+    Every response updates Redis with the token's remaining calls and reset time,
+    so all workers see the same numbers. ``acquire`` hands out the token with the
+    most budget left, which rotates a pool of tokens; once all of them are spent,
+    it raises GitHubRateLimited with the time until the earliest reset.
+    """
+
+    prefix = "github_rate"
+
+    @property
+    def tokens(self) -> list:
+        pool = [token.strip() for token in settings.GITHUB_TOKENS.split(",") if token.strip()]
+        if not pool and settings.GITHUB_TOKEN:
+            pool = [settings.GITHUB_TOKEN]
+        return pool
+
+    def acquire(self, resource: str) -> str:
+        now = time.time()
+        best = None
+        for token, state in self._states(resource).items():
+            if state is None or state["reset"] <= now:
+                remaining = float("inf")
+            elif state["remaining"] > settings.GITHUB_RATE_LIMIT_RESERVE:
+                remaining = state["remaining"]
+            else:
+                continue
+            if best is None or remaining > best[0]:
+                best = (remaining, token)
+        if best is None:
+            self._count("deferred")
+            raise GitHubRateLimited(retry_after=self.retry_after(resource))
+        return best[1]
+
+    def record(self, token: str, resource: str, response) -> bool:
+        """Stores the budget the response reports; returns True if the response was rate-limited."""
+        headers = response.headers
+        resource = headers.get("X-RateLimit-Resource") or resource
+        retry_after = headers.get("Retry-After")
+        limited = response.status_code in (403, 429) and (
+            headers.get("X-RateLimit-Remaining") == "0" or retry_after is not None
+        )
+        if retry_after is not None and limited:
+            # Secondary (abuse) limits come with Retry-After instead of a reset time.
+            state = {"remaining": 0, "reset": time.time() + float(retry_after)}
+        elif headers.get("X-RateLimit-Remaining") is not None and headers.get("X-RateLimit-Reset") is not None:
+            state = {"remaining": int(headers["X-RateLimit-Remaining"]), "reset": float(headers["X-RateLimit-Reset"])}
+        else:
+            return limited
+
+        try:
+            timeout = max(1, int(state["reset"] - time.time()) + 5)
+            cache.set(self._state_key(token, resource), state, timeout=timeout)
+        except RedisError:
+            pass
+        if limited:
+            self._count("exhausted")
+        return limited
+
+    def retry_after(self, resource: str) -> float:
+        now = time.time()
+        resets = [state["reset"] for state in self._states(resource).values() if state is not None]
+        return max(1.0, min(resets) - now + 1) if resets else float(settings.GITHUB_RATE_LIMIT_DEFAULT_WAIT_SECONDS)
+
+    def stats(self) -> dict:
+        now = time.time()
+        budgets = {}
+        for resource in ("core", "graphql"):
+            budgets[resource] = [
+                {
+                    "token": self._token_id(token),
+                    "remaining": state["remaining"] if state else None,
+                    "reset_in": max(0, round(state["reset"] - now)) if state else None,
+                }
+                for token, state in self._states(resource).items()
+            ]
+        keys = {name: self._counter_key(name) for name in ("exhausted", "deferred")}
+        counters = get_cache_counters(list(keys.values()))
+        return {"tokens": len(self.tokens), "budgets": budgets, **{name: counters[key] for name, key in keys.items()}}
+
+    def _states(self, resource: str) -> dict:
+        tokens = self.tokens or [ANONYMOUS]
+        keys = {token: self._state_key(token, resource) for token in tokens}
+        try:
+            values = cache.get_many(list(keys.values()))
+        except RedisError:
+            # Without shared state every token looks fresh; GitHub's own 403s still stop us.
+            values = {}
+        return {token: values.get(key) for token, key in keys.items()}
+
+    def _token_id(self, token: str) -> str:
+        # Tokens never reach Redis or the metrics; a short digest tells them apart.
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()[:12] if token else "anonymous"
+
+    def _state_key(self, token: str, resource: str) -> str:
+        return build_cache_key(self.prefix, f"{resource}:{self._token_id(token)}")
+
+    def _count(self, name: str) -> None:
+        try:
+            increment_cache_counter(self._counter_key(name))
+        except RedisError:
+            pass
+
+    def _counter_key(self, name: str) -> str:
+        return build_cache_key(self.prefix, f"stats:{name}")
+
+
+github_token_pool = GitHubTokenPool()
@@ -1,31 +1,129 @@
-﻿import re
+﻿import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from apps.analysis import github_graphql
+from apps.analysis.github_cache import github_response_cache
+from apps.analysis.github_rate_limit import GitHubRateLimited, github_token_pool
+
+
+# The prompt budgeter keeps the useful README sections, so fetch enough to choose from.
+README_EXCERPT_CHARS = 16000
+# Helper threads for the independent calls of a scrape; the first call runs on the caller's thread.
+FETCH_WORKERS = 32
+# Keep-alive connections kept per host; callers plus helpers can all hold one at once.
+CONNECTION_POOL_SIZE = 64
 
 
 class GitHubScrapeError(Exception):
     pass
 
 
-class GitHubScraper:
-    base_api = "https://api.github.com"
+class GitHubNotFound(GitHubScrapeError):
+    def __init__(self):
+        super().__init__("GitHub API error (404).")
+
 
+class GitHubScraper:
     def __init__(self):
-        token = getattr(settings, "GITHUB_TOKEN", "")
+        self.base_api = getattr(settings, "GITHUB_API_URL", "https://api.github.com")
+        # Authorization is added per request from the token pool (apps/analysis/github_rate_limit.py).
         self.headers = {
             "Accept": "application/vnd.github+json",
             "User-Agent": "cv-analyzer-bot",
         }
-        if token:
-            self.headers["Authorization"] = f"Bearer {token}"
+        self._lock = threading.Lock()
+        self._pid = None
+        self._session = None
+        self._executor = None
+
+    def scrape(self, github_url: str, timings: dict | None = None) -> dict:
+        """Scraped metadata for a repo or user URL; ``timings`` receives milliseconds per API call."""
+        parsed = self._parse_github_url(github_url)
+        if self._use_graphql():
+            return self._scrape_graphql(parsed, github_url, timings)
+        if parsed["type"] == "repo":
+            return self._scrape_repo(parsed["owner"], parsed["repo"], github_url, timings)
+        return self._scrape_user(parsed["username"], github_url, timings)
 
-    def scrape(self, github_url: str) -> dict:
+    def canonical_source(self, github_url: str) -> str:
+        """Identity of the scraped source: the same repo or user however the URL was written."""
         parsed = self._parse_github_url(github_url)
+        backend = "graphql" if self._use_graphql() else "rest"
         if parsed["type"] == "repo":
-            return self._scrape_repo(parsed["owner"], parsed["repo"], github_url)
-        return self._scrape_user(parsed["username"], github_url)
+            repo = parsed["repo"].lower().removesuffix(".git")
+            return f"{backend}:repo:{parsed['owner'].lower()}/{repo}"
+        return f"{backend}:user:{parsed['username'].lower()}"
+
+    def _use_graphql(self) -> bool:
+        # GitHub's GraphQL API has no anonymous access; without a token REST is the only option.
+        return settings.GITHUB_SCRAPER_BACKEND == "graphql" and bool(github_token_pool.tokens)
+
+    def _get_session(self) -> requests.Session:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Pooled sockets opened before a prefork fork must not be shared with the children.
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_maxsize=CONNECTION_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+                self._executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="github-fetch")
+                self._pid = os.getpid()
+            return self._session
+
+    def _get(self, path: str, headers: dict):
+        session = self._get_session()
+        return self._with_token(
+            "core", lambda auth: session.get(f"{self.base_api}{path}", headers={**headers, **auth}, timeout=15)
+        )
+
+    def _post(self, url: str, payload: dict):
+        session = self._get_session()
+        return self._with_token(
+            "graphql", lambda auth: session.post(url, json=payload, headers={**self.headers, **auth}, timeout=15)
+        )
+
+    def _with_token(self, resource: str, send):
+        # A token that turns out to be spent is recorded as such, and the next one is tried.
+        for _ in range(max(1, len(github_token_pool.tokens))):
+            token = github_token_pool.acquire(resource)
+            response = send({"Authorization": f"Bearer {token}"} if token else {})
+            if not github_token_pool.record(token, resource, response):
+                return response
+        raise GitHubRateLimited(retry_after=github_token_pool.retry_after(resource))
+
+    def _fetch(self, path: str, headers: dict) -> tuple:
+        return github_response_cache.fetch(
+            f"{self.base_api}{path}", headers, lambda request_headers: self._get(path, request_headers)
+        )
+
+    def _fetch_concurrently(self, calls: dict, timings: dict | None) -> dict:
+        """Runs independent API calls at once over the pooled session; errors surface in ``calls`` order."""
+        self._get_session()
+
+        def timed(label):
+            started = time.perf_counter()
+            try:
+                return calls[label]()
+            finally:
+                if timings is not None:
+                    timings[label] = round((time.perf_counter() - started) * 1000, 1)
+
+        first, *rest = calls
+        futures = {label: self._executor.submit(timed, label) for label in rest}
+        results = {first: timed(first)}
+        for label, future in futures.items():
+            results[label] = future.result()
+        return results
 
     def _parse_github_url(self, github_url: str) -> dict:
         try:
@@ -44,23 +142,68 @@ class GitHubScraper:
             raise GitHubScrapeError("Failed to parse GitHub URL.") from exc
 
     def _request_json(self, path: str):
-        response = requests.get(f"{self.base_api}{path}", headers=self.headers, timeout=15)
-        if response.status_code >= 400:
-            raise GitHubScrapeError(f"GitHub API error ({response.status_code}).")
-        return response.json()
+        status_code, body = self._fetch(path, self.headers)
+        if status_code >= 400:
+            raise GitHubScrapeError(f"GitHub API error ({status_code}).")
+        return json.loads(body)
 
     def _request_text(self, path: str):
         headers = dict(self.headers)
         headers["Accept"] = "application/vnd.github.raw+json"
-        response = requests.get(f"{self.base_api}{path}", headers=headers, timeout=15)
-        if response.status_code >= 400:
+        status_code, body = self._fetch(path, headers)
+        if status_code >= 400:
             return ""
-        return response.text
+        return body
+
+    def _graphql(self, query: str, variables: dict, root: str, timings: dict | None = None) -> dict:
+        started = time.perf_counter()
+        try:
+            response = self._post(settings.GITHUB_GRAPHQL_URL, {"query": query, "variables": variables})
+        finally:
+            if timings is not None:
+                timings["graphql"] = round((time.perf_counter() - started) * 1000, 1)
+        if response.status_code >= 400:
+            raise GitHubScrapeError(f"GitHub API error ({response.status_code}).")
+        payload = response.json()
+        errors = payload.get("errors") or []
+        # A missing user/repo comes back as HTTP 200 with a NOT_FOUND error; report it like REST does.
+        # NOT_FOUND under any other field (the optional profile README repo) only nulls that field.
+        if any(error.get("type") == "NOT_FOUND" and (error.get("path") or [root])[0] == root for error in errors):
+            raise GitHubNotFound()
+        if not (payload.get("data") or {}).get(root):
+            raise GitHubScrapeError("GitHub GraphQL error.")
+        return payload["data"]
+
+    def _scrape_graphql(self, parsed: dict, input_url: str, timings: dict | None = None) -> dict:
+        if parsed["type"] == "repo":
+            data = self._graphql(
+                github_graphql.REPO_QUERY, {"owner": parsed["owner"], "name": parsed["repo"]}, "repository", timings
+            )
+            return github_graphql.map_repo(data["repository"], input_url, README_EXCERPT_CHARS)
+        try:
+            data = self._graphql(
+                github_graphql.USER_QUERY,
+                {"login": parsed["username"], "repos": settings.GITHUB_GRAPHQL_REPOS},
+                "user",
+                timings,
+            )
+        except GitHubNotFound:
+            # user(login:) is NOT_FOUND for organisations, which REST /users/{login} serves.
+            return self._scrape_user(parsed["username"], input_url, timings)
+        return github_graphql.map_user(data, input_url, README_EXCERPT_CHARS)
 
-    def _scrape_repo(self, owner: str, repo: str, input_url: str) -> dict:
-        repo_data = self._request_json(f"/repos/{owner}/{repo}")
-        languages_data = self._request_json(f"/repos/{owner}/{repo}/languages")
-        readme_text = self._request_text(f"/repos/{owner}/{repo}/readme")
+    def _scrape_repo(self, owner: str, repo: str, input_url: str, timings: dict | None = None) -> dict:
+        fetched = self._fetch_concurrently(
+            {
+                "repo": lambda: self._request_json(f"/repos/{owner}/{repo}"),
+                "languages": lambda: self._request_json(f"/repos/{owner}/{repo}/languages"),
+                "readme": lambda: self._request_text(f"/repos/{owner}/{repo}/readme"),
+            },
+            timings,
+        )
+        repo_data = fetched["repo"]
+        languages_data = fetched["languages"]
+        readme_text = fetched["readme"]
 
         return {
             "source_type": "github_repo",
@@ -71,13 +214,20 @@ class GitHubScraper:
             "forks": repo_data.get("forks_count", 0),
             "topics": repo_data.get("topics", []),
             "languages": list(languages_data.keys())[:10],
-            "readme_excerpt": (readme_text or "")[:5000],
+            "readme_excerpt": (readme_text or "")[:README_EXCERPT_CHARS],
             "pushed_at": repo_data.get("pushed_at", ""),
         }
 
-    def _scrape_user(self, username: str, input_url: str) -> dict:
-        profile = self._request_json(f"/users/{username}")
-        repos = self._request_json(f"/users/{username}/repos?sort=updated&per_page=8")
+    def _scrape_user(self, username: str, input_url: str, timings: dict | None = None) -> dict:
+        fetched = self._fetch_concurrently(
+            {
+                "profile": lambda: self._request_json(f"/users/{username}"),
+                "repos": lambda: self._request_json(f"/users/{username}/repos?sort=updated&per_page=8"),
+            },
+            timings,
+        )
+        profile = fetched["profile"]
+        repos = fetched["repos"]
 
         repo_summaries = []
         language_set = set()
@@ -141,17 +291,21 @@ class GitHubScraper:
                     self._format_recent_repos(scraped.get("recent_repos", [])),
                 ]
             )
+            if scraped.get("profile_readme"):
+                lines.extend(["Profile README:", scraped["profile_readme"]])
 
         text = "\n".join(lines)
-        return re.sub(r"\n{3,}", "\n\n", text)[:12000]
+        return re.sub(r"\n{3,}", "\n\n", text)
 
     def _format_recent_repos(self, repos: list) -> str:
         chunks = []
-        for repo in repos[:8]:
+        # REST returns 8 repos, GraphQL GITHUB_GRAPHQL_REPOS; the prompt budgeter trims the list.
+        for repo in repos:
+            topics = f" | topics={', '.join(repo['topics'])}" if repo.get("topics") else ""
             chunks.append(
                 "- "
                 + f"{repo.get('name', '')} | lang={repo.get('language', '')} | stars={repo.get('stars', 0)} | "
-                + f"updated={repo.get('updated_at', '')} | {repo.get('description', '')}"
+                + f"updated={repo.get('updated_at', '')}{topics} | {repo.get('description', '')}"
             )
         return "\n".join(chunks)
 
@@ -0,0 +1,105 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+from core.cache_utils import build_cache_key, get_cache_counters, increment_cache_counter
+from core.redis_client import get_redis_client
+
+
+class GitHubSourceCache:
+    """Scraped GitHub sources shared by every user, keyed by canonical owner/repo or login.
+
+    A hit gives a GitHub job the stored ``scrape()`` dict, so it only pays for the
+    LLM stage; the analysis text is rebuilt per job, since it names the submitted
+    URL. Entries expire after GITHUB_SOURCE_CACHE_TTL_SECONDS; a Redis sorted set of
+    last-use times caps them at GITHUB_SOURCE_CACHE_MAX_ENTRIES, evicting the least
+    recently used first.
+    """
+
+    prefix = "github_source"
+
+    @property
+    def enabled(self) -> bool:
+        return settings.GITHUB_SOURCE_CACHE_ENABLED
+
+    def build_key(self, identity: str) -> str:
+        return build_cache_key(self.prefix, identity)
+
+    def get(self, identity: str):
+        if not self.enabled:
+            return None
+        key = self.build_key(identity)
+        try:
+            entry = cache.get(key)
+        except RedisError:
+            return None
+        self._count("hits" if entry is not None else "misses")
+        if entry is not None:
+            self._touch(key)
+        return entry
+
+    def set(self, identity: str, scraped: dict) -> None:
+        if not self.enabled:
+            return
+        key = self.build_key(identity)
+        try:
+            cache.set(key, scraped, timeout=settings.GITHUB_SOURCE_CACHE_TTL_SECONDS)
+        except RedisError:
+            return
+        self._touch(key, evict=True)
+
+    def stats(self) -> dict:
+        keys = {name: self._counter_key(name) for name in ("hits", "misses")}
+        counters = get_cache_counters(list(keys.values()))
+        hits = counters[keys["hits"]]
+        misses = counters[keys["misses"]]
+        try:
+            entries = get_redis_client().zcard(self._index_key())
+        except RedisError:
+            entries = None
+        return {
+            "enabled": self.enabled,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "entries": entries,
+            "max_entries": settings.GITHUB_SOURCE_CACHE_MAX_ENTRIES,
+        }
+
+    def _touch(self, key: str, evict: bool = False) -> None:
+        now = time.time()
+        try:
+            client = get_redis_client()
+            if not evict:
+                client.zadd(self._index_key(), {key: now})
+                return
+            pipe = client.pipeline(transaction=False)
+            pipe.zadd(self._index_key(), {key: now})
+            # Entries unused for a whole TTL have expired from the cache already.
+            pipe.zremrangebyscore(self._index_key(), "-inf", now - settings.GITHUB_SOURCE_CACHE_TTL_SECONDS)
+            pipe.zcard(self._index_key())
+            size = pipe.execute()[-1]
+            overflow = size - settings.GITHUB_SOURCE_CACHE_MAX_ENTRIES
+            if overflow > 0:
+                evicted = [member.decode("utf-8") for member, _ in client.zpopmin(self._index_key(), overflow)]
+                cache.delete_many(evicted)
+        except RedisError:
+            # Without the index entries still expire by TTL; only the size bound is lost.
+            pass
+
+    def _index_key(self) -> str:
+        return build_cache_key(self.prefix, "index")
+
+    def _count(self, name: str) -> None:
+        try:
+            increment_cache_counter(self._counter_key(name))
+        except RedisError:
+            pass
+
+    def _counter_key(self, name: str) -> str:
+        return build_cache_key(self.prefix, f"stats:{name}")
+
+
+github_source_cache = GitHubSourceCache()
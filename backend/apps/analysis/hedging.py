@@ -0,0 +1,55 @@
+import threading
+from collections import deque
+
+from django.conf import settings
+
+from core.cache_utils import build_cache_key, get_cache_counters, increment_cache_counter
+
+# Below this many samples the percentile is noise; the configured floor is used instead.
+MIN_LATENCY_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Rolling window of primary-model latencies for this process."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float):
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def hedge_delay(self) -> float:
+        floor = settings.GEMINI_HEDGE_MIN_DELAY_SECONDS
+        observed = self.percentile(settings.GEMINI_HEDGE_PERCENTILE)
+        return floor if observed is None else max(floor, observed)
+
+
+class HedgeStats:
+    prefix = "gemini_hedge"
+    names = ("calls", "hedges_fired", "primary_wins", "hedge_wins")
+
+    def record(self, name: str) -> None:
+        increment_cache_counter(build_cache_key(self.prefix, f"stats:{name}"))
+
+    def snapshot(self, tracker: LatencyTracker) -> dict:
+        keys = [build_cache_key(self.prefix, f"stats:{name}") for name in self.names]
+        counters = get_cache_counters(keys)
+        return {
+            "enabled": settings.GEMINI_HEDGE_ENABLED,
+            "fallback_model": settings.GEMINI_FALLBACK_MODEL or settings.GEMINI_MODEL,
+            "hedge_delay_seconds": round(tracker.hedge_delay(), 3),
+            **{name: counters[key] for name, key in zip(self.names, keys)},
+        }
+
+
+hedge_stats = HedgeStats()
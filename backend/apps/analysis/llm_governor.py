@@ -0,0 +1,142 @@
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from core.cache_utils import build_cache_key, get_cache_counters, increment_cache_counter
+from core.rate_limit import Bucket, DistributedSemaphore, TokenBuckets
+
+# Rough completion size for the analysis JSON, charged to the TPM bucket up front.
+ESTIMATED_OUTPUT_TOKENS = 800
+
+
+class LLMRateLimited(Exception):
+    """Raised when LLM capacity is not available within the in-process wait budget."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Gemini capacity exhausted; retry in {retry_after:.1f}s.")
+        self.retry_after = retry_after
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting English resumes.
+    return max(1, len(text or "") // 4)
+
+
+class GeminiGovernor:
+    """Cluster-wide Gemini budget: RPM and TPM token buckets plus an in-flight semaphore.
+
+    State lives in Redis so every Celery worker process draws from the same budget.
+    Short waits happen in-process; longer ones raise LLMRateLimited so the task can
+    be re-queued with an ETA instead of holding a worker slot.
+    """
+
+    prefix = "gemini_governor"
+
+    def _buckets(self) -> TokenBuckets:
+        rpm = settings.GEMINI_RATE_LIMIT_RPM
+        tpm = settings.GEMINI_RATE_LIMIT_TPM
+        return TokenBuckets(
+            [
+                Bucket("rpm", build_cache_key(self.prefix, "rpm"), rpm, rpm / 60),
+                Bucket("tpm", build_cache_key(self.prefix, "tpm"), tpm, tpm / 60),
+            ]
+        )
+
+    def _semaphore(self) -> DistributedSemaphore:
+        return DistributedSemaphore(
+            build_cache_key(self.prefix, "in_flight"),
+            settings.GEMINI_MAX_IN_FLIGHT,
+            settings.GEMINI_IN_FLIGHT_LEASE_SECONDS,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.GEMINI_RATE_LIMIT_RPM or settings.GEMINI_RATE_LIMIT_TPM or settings.GEMINI_MAX_IN_FLIGHT)
+
+    @contextmanager
+    def slot(self, prompt: str):
+        if not self.enabled:
+            yield
+            return
+
+        try:
+            token = self._acquire(estimate_tokens(prompt) + ESTIMATED_OUTPUT_TOKENS)
+        except RedisError:
+            # Fail open: a Redis outage should not stop analyses outright.
+            self._count("redis_errors")
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            try:
+                self._semaphore().release(token)
+            except RedisError:
+                pass
+
+    def _acquire(self, tokens: int) -> str:
+        buckets = self._buckets()
+        semaphore = self._semaphore()
+        deadline = time.monotonic() + settings.GEMINI_RATE_LIMIT_MAX_WAIT_SECONDS
+        waited = False
+
+        while True:
+            # Concurrency first: a rate token is only spent once a slot is held.
+            token = semaphore.try_acquire()
+            if token is None:
+                wait = 0.25
+                self._count("saturated_in_flight")
+            else:
+                allowed, wait = buckets.try_acquire({"rpm": 1, "tpm": tokens})
+                if allowed:
+                    self._count("granted")
+                    if waited:
+                        self._count("granted_after_wait")
+                    return token
+                semaphore.release(token)
+                self._count("saturated_rate")
+
+            remaining = deadline - time.monotonic()
+            if wait > remaining:
+                self._count("deferred")
+                raise LLMRateLimited(retry_after=max(wait, 1.0))
+            waited = True
+            time.sleep(wait)
+
+    def stats(self) -> dict:
+        names = ["granted", "granted_after_wait", "saturated_in_flight", "saturated_rate", "deferred", "redis_errors"]
+        keys = [self._counter_key(name) for name in names]
+        counters = get_cache_counters(keys)
+        stats = {
+            "enabled": self.enabled,
+            "limits": {
+                "rpm": settings.GEMINI_RATE_LIMIT_RPM,
+                "tpm": settings.GEMINI_RATE_LIMIT_TPM,
+                "in_flight": settings.GEMINI_MAX_IN_FLIGHT,
+            },
+            **{name: counters[key] for name, key in zip(names, keys)},
+        }
+        if not self.enabled:
+            return stats
+
+        try:
+            stats["in_flight"] = self._semaphore().in_use()
+            stats["available"] = {name: round(level, 1) for name, level in self._buckets().levels().items()}
+        except RedisError:
+            stats["in_flight"] = None
+        return stats
+
+    def _count(self, name: str) -> None:
+        try:
+            increment_cache_counter(self._counter_key(name))
+        except RedisError:
+            pass
+
+    def _counter_key(self, name: str) -> str:
+        return build_cache_key(self.prefix, f"stats:{name}")
+
+
+gemini_governor = GeminiGovernor()
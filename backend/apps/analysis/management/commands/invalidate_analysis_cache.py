@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analysis.result_cache import analysis_cache
+
+
+class Command(BaseCommand):
+    help = "Invalidate cached analysis results for a Gemini model and/or prompt version."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", default="", help="Model name, e.g. gemini-1.5-flash.")
+        parser.add_argument("--prompt-version", default="", help="Prompt version, e.g. 1.")
+        parser.add_argument("--current", action="store_true", help="Use the configured model and prompt version.")
+
+    def handle(self, *args, **options):
+        model_name = options["model"]
+        prompt_version = options["prompt_version"]
+        if options["current"]:
+            model_name = model_name or settings.GEMINI_MODEL
+            prompt_version = prompt_version or settings.ANALYSIS_PROMPT_VERSION
+
+        if not model_name and not prompt_version:
+            raise CommandError("Pass --model, --prompt-version or --current.")
+
+        analysis_cache.invalidate(model_name=model_name, prompt_version=prompt_version)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Invalidated analysis cache (model={model_name or '-'}, prompt_version={prompt_version or '-'})."
+            )
+        )
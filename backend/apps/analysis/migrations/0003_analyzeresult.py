@@ -0,0 +1,22 @@
+# Generated by Django 5.1.5 on 2026-10-18 05:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0002_analyzejob_source_input_analyzejob_source_type_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyzeResult',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='result_record', serialize=False, to='analysis.analyzejob')),
+                ('payload', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
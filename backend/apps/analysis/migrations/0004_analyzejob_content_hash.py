@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 05:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0003_analyzeresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyzejob',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
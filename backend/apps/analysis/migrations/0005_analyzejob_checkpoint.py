@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 05:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0004_analyzejob_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyzejob',
+            name='billed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analyzejob',
+            name='checkpoint',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='analyzejob',
+            name='stage',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
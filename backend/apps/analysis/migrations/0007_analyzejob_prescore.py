@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0006_analyzebatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyzejob',
+            name='prescore',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
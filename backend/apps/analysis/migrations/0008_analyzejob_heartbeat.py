@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0007_analyzejob_prescore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyzejob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analyzejob',
+            name='reap_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -3,6 +3,32 @@ from django.db import models
 import uuid
 
 
+class AnalyzeBatch(models.Model):
+    """Many CVs analyzed against one job description; jobs link back through ``AnalyzeJob.batch``."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        COMPLETED = "completed", "Completed"
+        FAILED = "failed", "Failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="analyze_batches")
+    job_description = models.TextField(blank=True, default="")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    # Raw zip upload, expanded into per-CV jobs by the worker.
+    archive_key = models.CharField(max_length=500, blank=True, default="")
+    total = models.PositiveIntegerField(default=0)
+    ranking = models.JSONField(default=list, blank=True)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["owner", "created_at"])]
+
+
 class AnalyzeJob(models.Model):
     class SourceType(models.TextChoices):
         CV = "cv", "CV"
@@ -16,11 +42,23 @@ class AnalyzeJob(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="analyze_jobs")
+    batch = models.ForeignKey(AnalyzeBatch, on_delete=models.CASCADE, null=True, blank=True, related_name="jobs")
     source_type = models.CharField(max_length=20, choices=SourceType.choices, default=SourceType.CV)
     source_input = models.TextField(blank=True, default="")
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     source_file_key = models.CharField(max_length=500, blank=True, default="")
+    content_hash = models.CharField(max_length=64, blank=True, default="")
     error_message = models.TextField(blank=True)
+    # Last completed pipeline stage and its intermediate outputs; retries resume from here.
+    stage = models.CharField(max_length=20, blank=True, default="")
+    checkpoint = models.JSONField(default=dict, blank=True)
+    billed_at = models.DateTimeField(null=True, blank=True)
+    # Local keyword/BM25 score computed before the LLM stage; shown while the model is still running.
+    prescore = models.JSONField(default=dict, blank=True)
+    # Written when processing starts and at every stage boundary; a PROCESSING job whose
+    # heartbeat goes stale lost its worker and is picked up by reap_stale_analyze_jobs.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    reap_count = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -38,3 +76,11 @@ class AnalyzeUsage(models.Model):
 
     class Meta:
         indexes = [models.Index(fields=["owner", "created_at"])]
+
+
+class AnalyzeResult(models.Model):
+    """Durable copy of a finished analysis, stored as zlib-compressed JSON."""
+
+    job = models.OneToOneField(AnalyzeJob, on_delete=models.CASCADE, primary_key=True, related_name="result_record")
+    payload = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
@@ -1,30 +1,151 @@
+import codecs
+import zipfile
 from pathlib import Path
+from xml.etree import ElementTree
 
-MAX_ANALYSIS_TEXT_CHARS = 12000
+# Extraction cap; the prompt budgeter, not this cut, decides what reaches the model.
+MAX_ANALYSIS_TEXT_CHARS = 40000
+READ_CHUNK_SIZE = 64 * 1024
 
+DOCX_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
 
-def _decode_content(raw_bytes: bytes) -> str:
-    return raw_bytes.decode("utf-8", errors="ignore")[:MAX_ANALYSIS_TEXT_CHARS]
+
+class DocumentParseError(Exception):
+    pass
+
+
+class _TextBudget:
+    """Collects extracted text and reports when MAX_ANALYSIS_TEXT_CHARS is reached."""
+
+    def __init__(self, limit: int = MAX_ANALYSIS_TEXT_CHARS):
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+
+    @property
+    def full(self) -> bool:
+        return self.size >= self.limit
+
+    def add(self, text: str) -> bool:
+        if text and not self.full:
+            text = text[: self.limit - self.size]
+            self.parts.append(text)
+            self.size += len(text)
+        return self.full
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def _read_text_stream(stream) -> str:
+    # Incremental decoding keeps multi-byte characters intact across chunk boundaries.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    budget = _TextBudget()
+    while not budget.full:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            budget.add(decoder.decode(b"", final=True))
+            break
+        budget.add(decoder.decode(chunk))
+    return budget.text()
+
+
+def _load_pypdf():
+    try:
+        from pypdf import PageObject, PdfReader
+        from pypdf.errors import PdfReadError
+
+        return {"PageObject": PageObject, "PdfReader": PdfReader, "PdfReadError": PdfReadError}
+    except ModuleNotFoundError as exc:
+        raise DocumentParseError("PDF parsing dependency missing: pypdf is not installed.") from exc
+
+
+def _iter_pdf_pages(reader, page_class, node=None, inherited=None, depth=0):
+    """Walk the page tree lazily.
+
+    ``reader.pages`` flattens (and parses) every page object up front, which costs
+    seconds on long documents even when only the first few pages are needed.
+    """
+    if node is None:
+        node = reader.trailer["/Root"]["/Pages"].get_object()
+    if depth > 64:
+        raise ValueError("PDF page tree is too deep.")
+
+    inherited = dict(inherited or {})
+    for attr in ("/Resources", "/MediaBox", "/CropBox", "/Rotate"):
+        if attr in node:
+            inherited[attr] = node[attr]
+
+    for kid_ref in node.get("/Kids", []):
+        kid = kid_ref.get_object()
+        if kid.get("/Type") == "/Pages" or "/Kids" in kid:
+            yield from _iter_pdf_pages(reader, page_class, kid, inherited, depth + 1)
+            continue
+        page = page_class(reader, kid.indirect_reference)
+        page.update(inherited)
+        page.update(kid)
+        yield page
+
+
+def _extract_pdf(stream) -> str:
+    pypdf = _load_pypdf()
+    PdfReadError = pypdf["PdfReadError"]
+    budget = _TextBudget()
+    try:
+        # Pages are decoded one at a time, so only the current page's content stream is inflated.
+        reader = pypdf["PdfReader"](stream, strict=False)
+        if reader.is_encrypted:
+            raise DocumentParseError("Encrypted PDF documents are not supported.")
+        for page in _iter_pdf_pages(reader, pypdf["PageObject"]):
+            if budget.add((page.extract_text() or "") + "\n"):
+                break
+    except (PdfReadError, ValueError, KeyError, AttributeError) as exc:
+        raise DocumentParseError("Could not read PDF document.") from exc
+    return budget.text().strip()
+
+
+def _extract_docx(stream) -> str:
+    budget = _TextBudget()
+    try:
+        with zipfile.ZipFile(stream) as archive, archive.open("word/document.xml") as document:
+            # iterparse consumes the decompressing stream incrementally; finished elements are cleared.
+            for _event, element in ElementTree.iterparse(document, events=("end",)):
+                tag = element.tag
+                if tag == f"{DOCX_NAMESPACE}t":
+                    stop = budget.add(element.text or "")
+                elif tag == f"{DOCX_NAMESPACE}tab":
+                    stop = budget.add("\t")
+                elif tag in (f"{DOCX_NAMESPACE}p", f"{DOCX_NAMESPACE}br"):
+                    stop = budget.add("\n")
+                    element.clear()
+                else:
+                    continue
+                if stop:
+                    break
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as exc:
+        raise DocumentParseError("Could not read DOCX document.") from exc
+    return budget.text().strip()
+
+
+def _extract_from_stream(stream, suffix: str) -> str:
+    if suffix == ".pdf":
+        return _extract_pdf(stream)
+    if suffix == ".docx":
+        return _extract_docx(stream)
+    # Plain text, plus best-effort decoding for formats without a dedicated extractor.
+    return _read_text_stream(stream)
 
 
 def extract_text_from_upload(upload_file) -> str:
     suffix = Path(getattr(upload_file, "name", "")).suffix.lower()
-    raw_bytes = upload_file.read()
     upload_file.seek(0)
-
-    if suffix in {".txt", ".md", ".csv"}:
-        return raw_bytes.decode("utf-8", errors="ignore")[:MAX_ANALYSIS_TEXT_CHARS]
-
-    # MVP fallback: binary files are decoded best-effort.
-    return _decode_content(raw_bytes)
+    try:
+        return _extract_from_stream(upload_file, suffix)
+    finally:
+        upload_file.seek(0)
 
 
 def extract_text_from_file(file_path: str) -> str:
     path = Path(file_path)
-    suffix = path.suffix.lower()
-
-    if suffix in {".txt", ".md", ".csv"}:
-        return path.read_text(encoding="utf-8", errors="ignore")[:MAX_ANALYSIS_TEXT_CHARS]
-
-    # MVP fallback: binary files are decoded best-effort.
-    return _decode_content(path.read_bytes())
+    with path.open("rb") as stream:
+        return _extract_from_stream(stream, path.suffix.lower())
@@ -0,0 +1,158 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.analysis.gemini_client import gemini_client
+from apps.analysis.github_scraper import github_scraper
+from apps.analysis.github_source_cache import github_source_cache
+from apps.analysis.models import AnalyzeJob, AnalyzeUsage
+from apps.analysis.prescore import prescore
+from apps.analysis.prompt_budget import budget_source_text, prompt_budget_stats
+from apps.analysis.results import store_analysis_result
+from apps.analysis.skills import MAX_GAP_SKILLS, github_skill_text, skill_gap
+from apps.analysis.streaming import EVENT_PARTIAL, publish_event
+from apps.billing.models import Subscription
+from core.storage import storage_service
+
+# Stages run in order; each one checkpoints its output on the job before the next
+# starts, so a retry resumes after the last completed stage.
+STAGES = ("source", "prescore", "prompt", "llm", "persist")
+
+
+def _save_checkpoint(job: AnalyzeJob, stage: str, checkpoint: dict) -> None:
+    job.stage = stage
+    job.checkpoint = checkpoint
+    # The end of one stage is the start of the next, so this doubles as the stage heartbeat.
+    job.heartbeat_at = timezone.now()
+    job.save(update_fields=["stage", "checkpoint", "source_file_key", "prescore", "heartbeat_at", "updated_at"])
+
+
+def _scrape_github(github_url: str, checkpoint: dict) -> tuple:
+    identity = github_scraper.canonical_source(github_url)
+    cached = github_source_cache.get(identity)
+    if cached is not None:
+        checkpoint["github_source_cache"] = "hit"
+        # The text names the submitted URL, so it is rebuilt rather than shared between users.
+        scraped = {**cached, "input": github_url}
+        return scraped, github_scraper.to_analysis_text(scraped)
+
+    timings = {}
+    scraped = github_scraper.scrape(github_url, timings=timings)
+    github_source_cache.set(identity, scraped)
+    checkpoint["github_fetch_ms"] = timings
+    return scraped, github_scraper.to_analysis_text(scraped)
+
+
+def _fetch_source(job: AnalyzeJob, checkpoint: dict, source_payload, job_description: str) -> None:
+    if job.source_type == AnalyzeJob.SourceType.GITHUB:
+        scraped, text = _scrape_github(str(source_payload), checkpoint)
+        # Scraped text joins the claim-check flow, so later stages read it like CV text.
+        stored = storage_service.save_temp_text(text)
+        job.source_file_key = stored.key
+        checkpoint["source_meta"] = {
+            "source": "github",
+            "input": str(source_payload),
+            "scraped": scraped,
+        }
+        return
+
+    if not job.source_file_key:
+        # Messages enqueued before the claim-check rollout still carry the text inline.
+        job.source_file_key = storage_service.save_temp_text(str(source_payload)).key
+    checkpoint["source_meta"] = {
+        "source": "cv",
+        "input": job.source_input,
+    }
+
+
+def _prescore(job: AnalyzeJob, checkpoint: dict, source_payload, job_description: str) -> None:
+    source_text = storage_service.read_text(job.source_file_key)
+    job.prescore = prescore(source_text, job_description).to_dict()
+    # GitHub languages and topics count as evidence even when the README never names them.
+    scraped = checkpoint["source_meta"].get("scraped") or {}
+    checkpoint["skill_gap"] = skill_gap(source_text, job_description, github_skill_text(scraped))
+    publish_event(job.id, EVENT_PARTIAL, {"prescore": job.prescore, "skill_gap": checkpoint["skill_gap"]})
+
+
+def _build_prompt(job: AnalyzeJob, checkpoint: dict, source_payload, job_description: str) -> None:
+    budgeted = budget_source_text(storage_service.read_text(job.source_file_key))
+    prompt = gemini_client.build_prompt(
+        budgeted.text, job_description, job.source_type, skill_gap=checkpoint.get("skill_gap")
+    )
+    checkpoint["prompt_budget"] = budgeted.to_dict()
+    prompt_budget_stats.record(budgeted)
+    checkpoint["prompt_key"] = storage_service.save_temp_text(prompt, "prompt.txt").key
+
+
+def _call_llm(job: AnalyzeJob, checkpoint: dict, source_payload, job_description: str) -> None:
+    checkpoint["llm_result"] = gemini_client.analyze_resume(
+        storage_service.read_text(job.source_file_key),
+        job_description,
+        source_kind=job.source_type,
+        cache_owner_id=job.owner_id,
+        prompt=storage_service.read_text(checkpoint["prompt_key"]),
+        on_partial=lambda fields: publish_event(job.id, EVENT_PARTIAL, fields),
+    )
+
+
+def _merge_missing_keywords(deterministic: list, generated: list) -> list:
+    merged = []
+    seen = set()
+    for keyword in [*deterministic, *generated]:
+        if keyword.lower() not in seen:
+            seen.add(keyword.lower())
+            merged.append(keyword)
+    return merged[:MAX_GAP_SKILLS]
+
+
+def _persist_and_bill(job: AnalyzeJob, checkpoint: dict, source_payload, job_description: str) -> None:
+    result = {**checkpoint["llm_result"], "source_meta": checkpoint["source_meta"]}
+    gap = checkpoint.get("skill_gap")
+    if gap:
+        result["skill_gap"] = gap
+        result["missing_keywords"] = _merge_missing_keywords(gap["missing"], result.get("missing_keywords") or [])
+    store_analysis_result(job, result)
+    bill_job_once(job)
+
+
+STAGE_HANDLERS = {
+    "source": _fetch_source,
+    "prescore": _prescore,
+    "prompt": _build_prompt,
+    "llm": _call_llm,
+    "persist": _persist_and_bill,
+}
+
+
+def bill_job_once(job: AnalyzeJob) -> bool:
+    """Charges usage for ``job`` exactly once, however many times persistence is retried."""
+    with transaction.atomic():
+        claimed = AnalyzeJob.objects.filter(id=job.id, billed_at__isnull=True).update(billed_at=timezone.now())
+        if not claimed:
+            return False
+        AnalyzeUsage.objects.create(owner=job.owner)
+        subscription, _ = Subscription.objects.get_or_create(owner=job.owner)
+        subscription.register_analysis()
+    return True
+
+
+def _waits_on_network(job: AnalyzeJob, stage: str) -> bool:
+    return stage == "llm" or (stage == "source" and job.source_type == AnalyzeJob.SourceType.GITHUB)
+
+
+def run_analysis_pipeline(job: AnalyzeJob, source_payload="", job_description: str = "") -> None:
+    checkpoint = dict(job.checkpoint or {})
+    start = STAGES.index(job.stage) + 1 if job.stage in STAGES else 0
+    for stage in STAGES[start:]:
+        if settings.ANALYZE_RELEASE_DB_DURING_IO and _waits_on_network(job, stage):
+            # Scraping and generation take seconds without touching the database; the
+            # checkpoint save afterwards reconnects.
+            connection.close()
+        STAGE_HANDLERS[stage](job, checkpoint, source_payload, job_description)
+        _save_checkpoint(job, stage, checkpoint)
+
+
+def release_pipeline_blobs(job: AnalyzeJob) -> None:
+    # Claim-check blobs only live until the job reaches a terminal state.
+    storage_service.delete(job.source_file_key)
+    storage_service.delete((job.checkpoint or {}).get("prompt_key", ""))
@@ -0,0 +1,145 @@
+import math
+import re
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+
+# BM25 term-frequency saturation and length normalization.
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_MISSING_KEYWORDS = 12
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+CHUNK_PATTERN = re.compile(r"\n\s*\n|(?<=[.!?])\s+|\n[\s\-*•]*")
+
+STOPWORDS = frozenset(
+    """
+    a about above after again all also am an and any are as at be been being below between both but by can could did do
+    does doing down during each etc few for from further had has have having he her here hers him his how i if in into
+    is it its itself just like looking me more most must my no nor not now of off on once only or other our ours out
+    over own per plus same she should so some such than that the their theirs them then there these they this those
+    through to too under until up using very via was we were what when where which while who whom why will with within
+    would you your yours ability able across based candidate candidates company etc experience experienced including
+    join knowledge preferred required requirements responsibilities role skills strong team work working years year
+    """.split()
+)
+
+# Target used when no job description is given: what any engineering CV is screened for.
+GENERIC_ROLE_TERMS = (
+    "api design testing architecture performance scalability cloud databases continuous integration code review "
+    "mentoring production reliability monitoring security agile collaboration delivery ownership impact metrics"
+)
+
+
+@dataclass
+class PreScore:
+    ats_score: int
+    missing_keywords: list
+    matched_keywords: list = field(default_factory=list)
+    keyword_coverage: float = 0.0
+    similarity: float = 0.0
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def tokenize(text: str) -> list:
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS and not token.isdigit()]
+
+
+def _stem(token: str) -> str:
+    # Plural folding only ("apis" -> "api"); anything smarter belongs in a skill taxonomy.
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    # "class", "status", "analysis" and "redis" are left alone.
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us")):
+        if not (token.endswith("is") and len(token) > 4):
+            return token[:-1]
+    return token
+
+
+def _terms(text: str, labels: dict | None = None) -> list:
+    terms = []
+    for token in tokenize(text):
+        term = _stem(token)
+        if labels is not None:
+            labels.setdefault(term, token)
+        terms.append(term)
+    return terms
+
+
+def _chunks(text: str) -> list:
+    return [chunk for chunk in CHUNK_PATTERN.split(text or "") if chunk and chunk.strip()]
+
+
+def _idf(documents: list) -> dict:
+    # BM25 idf over the sentences/bullets of both texts: boilerplate repeated everywhere is discounted.
+    frequencies = Counter()
+    for document in documents:
+        frequencies.update(set(document))
+    total = len(documents)
+    return {term: math.log(1 + (total - count + 0.5) / (count + 0.5)) for term, count in frequencies.items()}
+
+
+def _bm25_vector(terms: list, idf: dict, average_length: float) -> dict:
+    counts = Counter(terms)
+    length_norm = 1 - BM25_B + BM25_B * (len(terms) / average_length if average_length else 1)
+    return {
+        term: idf.get(term, 0.0) * count * (BM25_K1 + 1) / (count + BM25_K1 * length_norm)
+        for term, count in counts.items()
+    }
+
+
+def _cosine(left: dict, right: dict) -> float:
+    if len(left) > len(right):
+        left, right = right, left
+    dot = sum(weight * right.get(term, 0.0) for term, weight in left.items())
+    norm = math.sqrt(sum(w * w for w in left.values())) * math.sqrt(sum(w * w for w in right.values()))
+    return dot / norm if norm else 0.0
+
+
+def prescore(source_text: str, job_description: str = "") -> PreScore:
+    """Scores ``source_text`` against ``job_description`` with sparse BM25 vectors.
+
+    Keyword coverage is the share of the job description's BM25 weight that also
+    appears in the source; similarity is the cosine of the two vectors. Vectors are
+    plain dicts keyed by term, so a CV/JD pair scores in about a millisecond.
+    """
+    started = time.perf_counter()
+    target = job_description if (job_description or "").strip() else GENERIC_ROLE_TERMS
+    labels = {}
+    source_terms = _terms(source_text)
+    target_terms = _terms(target, labels)
+
+    chunk_terms = [_terms(chunk) for chunk in _chunks(source_text) + _chunks(target)]
+    chunk_terms = [terms for terms in chunk_terms if terms] or [source_terms, target_terms]
+    idf = _idf(chunk_terms)
+    average_length = (len(source_terms) + len(target_terms)) / 2
+
+    source_vector = _bm25_vector(source_terms, idf, average_length)
+    target_vector = _bm25_vector(target_terms, idf, average_length)
+
+    total_weight = sum(target_vector.values())
+    matched_weight = sum(weight for term, weight in target_vector.items() if term in source_vector)
+    coverage = matched_weight / total_weight if total_weight else 0.0
+    similarity = _cosine(source_vector, target_vector)
+
+    missing = []
+    matched = []
+    for term, _weight in sorted(target_vector.items(), key=lambda item: (-item[1], item[0])):
+        bucket = matched if term in source_vector else missing
+        if len(bucket) < MAX_MISSING_KEYWORDS:
+            bucket.append(labels.get(term, term))
+
+    # Coverage dominates, as it does in keyword-matching ATS filters; similarity rewards emphasis.
+    blended = 0.7 * coverage + 0.3 * min(1.0, similarity * 2)
+    ats_score = round(30 + 65 * blended) if source_terms else 0
+    return PreScore(
+        ats_score=max(0, min(100, ats_score)),
+        missing_keywords=missing,
+        matched_keywords=matched,
+        keyword_coverage=round(coverage, 4),
+        similarity=round(similarity, 4),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
@@ -0,0 +1,241 @@
+import re
+from dataclasses import asdict, dataclass, field
+
+from django.conf import settings
+
+from core.cache_utils import build_cache_key, get_cache_counters, increment_cache_counter
+
+# Gemini tokenizes English prose at roughly four characters per token; close enough to budget with.
+CHARS_PER_TOKEN = 4
+# Sections squeezed below this are dropped instead of being cut to a heading and a fragment.
+MIN_SECTION_TOKENS = 20
+
+# Share of the budget each kind of section gets relative to the others. Recent experience and
+# skills carry most of the ATS signal; references, licences and install steps carry almost none.
+SECTION_WEIGHTS = {
+    "header": 4.0,
+    "experience": 5.0,
+    "skills": 4.0,
+    "summary": 3.0,
+    "projects": 3.0,
+    "education": 2.0,
+    "certifications": 1.5,
+    "other": 1.0,
+    "low": 0.25,
+}
+
+SECTION_ALIASES = {
+    "summary": (
+        "summary", "professional summary", "career summary", "profile", "professional profile", "about",
+        "about me", "objective", "career objective", "overview", "introduction", "description", "bio",
+        "profile readme",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "relevant experience", "employment",
+        "employment history", "work history", "career history", "positions",
+    ),
+    "skills": (
+        "skills", "technical skills", "core skills", "key skills", "skills and tools", "technologies",
+        "tech stack", "stack", "competencies", "core competencies", "tools", "built with", "languages",
+    ),
+    "projects": (
+        "projects", "personal projects", "side projects", "selected projects", "open source", "features",
+        "key features", "architecture", "how it works", "highlights", "achievements", "accomplishments",
+        "recent repositories",
+    ),
+    "education": ("education", "academic background", "qualifications", "education and training"),
+    "certifications": (
+        "certifications", "certificates", "licenses and certifications", "courses", "training", "awards",
+        "honors", "honors and awards", "publications",
+    ),
+    "low": (
+        "references", "hobbies", "interests", "hobbies and interests", "personal details", "personal information",
+        "license", "licence", "contributing", "contributors", "acknowledgements", "acknowledgments",
+        "code of conduct", "changelog", "support", "sponsors", "installation", "install", "getting started",
+        "setup", "prerequisites", "requirements", "table of contents", "contents", "faq",
+    ),
+}
+_HEADING_CATEGORIES = {alias: category for category, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+_FENCED_CODE = re.compile(r"^\s*(```|~~~).*?^\s*\1[^\n]*$", re.MULTILINE | re.DOTALL)
+_MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+_HTML_TAG = re.compile(r"<[^>\n]+>")
+_WHITESPACE = re.compile(r"[ \t\f\v\u00a0]+")
+_MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+(.+?)\s*#*$")
+# Page footers ("Page 2 of 3", "2/3", "- 2 -") and separator rules carry no content.
+_NOISE_LINE = re.compile(
+    r"^(?:page\s+\d+(?:\s+of\s+\d+)?|\d+\s*(?:/|of)\s*\d+|-\s*\d+\s*-|[-–—•*·|_=~.#\s]+)$", re.IGNORECASE
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text or "") // CHARS_PER_TOKEN)
+
+
+@dataclass
+class Section:
+    name: str
+    category: str
+    lines: list = field(default_factory=list)
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens("\n".join(self.lines))
+
+
+@dataclass
+class BudgetedSource:
+    text: str
+    source_tokens: int
+    prompt_tokens: int
+    sections: list = field(default_factory=list)
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.source_tokens - self.prompt_tokens)
+
+    def to_dict(self) -> dict:
+        report = asdict(self)
+        del report["text"]
+        return {**report, "tokens_saved": self.tokens_saved}
+
+
+def clean_source_text(text: str) -> str:
+    """Strips markup, page furniture and repeated lines (headers/footers on every page)."""
+    text = _FENCED_CODE.sub("", text or "")
+    text = _MARKDOWN_IMAGE.sub("", text)
+    text = _MARKDOWN_LINK.sub(r"\1", text)
+    text = _HTML_TAG.sub(" ", text)
+
+    lines = []
+    seen = set()
+    for raw_line in text.splitlines():
+        line = _WHITESPACE.sub(" ", raw_line).strip()
+        if not line:
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        if _NOISE_LINE.match(line):
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def _heading_category(line: str):
+    markdown = _MARKDOWN_HEADING.match(line)
+    if not markdown and len(line) > 40:
+        return None
+    title = markdown.group(1) if markdown else line
+    normalized = " ".join(re.sub(r"[^a-z]+", " ", title.lower().replace("&", " and ")).split())
+    category = _HEADING_CATEGORIES.get(normalized)
+    if category is None and normalized.endswith(" excerpt"):
+        category = "other"
+    # Any markdown heading opens a section; plain lines only do when they name a known one.
+    return category or ("other" if markdown else None)
+
+
+def split_sections(text: str) -> list:
+    sections = [Section("header", "header")]
+    for line in text.splitlines():
+        category = _heading_category(line) if line else None
+        if category is not None:
+            sections.append(Section(line.lstrip("#").strip().rstrip(":"), category, [line]))
+        else:
+            sections[-1].lines.append(line)
+    return [section for section in sections if any(section.lines)]
+
+
+def _allocate(sections: list, budget: int) -> list:
+    # Water-filling: each section gets a weighted share, sections smaller than their share
+    # keep everything and hand the surplus back to the rest.
+    allocation = [0] * len(sections)
+    pending = [index for index, section in enumerate(sections) if section.tokens]
+    remaining = budget
+    while pending and remaining > 0:
+        total_weight = sum(SECTION_WEIGHTS[sections[index].category] for index in pending)
+        share = {index: remaining * SECTION_WEIGHTS[sections[index].category] / total_weight for index in pending}
+        fitting = [index for index in pending if sections[index].tokens <= share[index]]
+        if not fitting:
+            for index in pending:
+                allocation[index] = int(share[index])
+            break
+        for index in fitting:
+            allocation[index] = sections[index].tokens
+            remaining -= sections[index].tokens
+            pending.remove(index)
+    return allocation
+
+
+def _report(section: Section, lines: list) -> dict:
+    kept = estimate_tokens("\n".join(lines))
+    return {"name": section.name, "category": section.category, "tokens": section.tokens, "kept_tokens": kept}
+
+
+def _trim(section: Section, tokens: int) -> list:
+    # Lines are kept from the top: CVs list the most recent role first, READMEs lead with the point.
+    limit = tokens * CHARS_PER_TOKEN
+    kept = []
+    used = 0
+    for line in section.lines:
+        if used + len(line) > limit:
+            room = limit - used
+            if room > 40 and line:
+                kept.append(line[: room - 2].rsplit(" ", 1)[0] + " …")
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return kept
+
+
+def budget_source_text(text: str, max_tokens: int | None = None) -> BudgetedSource:
+    """Fits a CV or GitHub source into ``max_tokens`` by section priority instead of a blind cut.
+
+    The text is cleaned first; if it still does not fit, every section gets a share of
+    the budget by its weight and is cut on line boundaries. Sections keep their order.
+    """
+    max_tokens = max_tokens or settings.ANALYSIS_PROMPT_SOURCE_TOKENS
+    source_tokens = estimate_tokens(text)
+    cleaned = clean_source_text(text)
+    sections = split_sections(cleaned)
+    if estimate_tokens(cleaned) <= max_tokens:
+        report = [_report(section, section.lines) for section in sections]
+        return BudgetedSource(cleaned, source_tokens, estimate_tokens(cleaned), report)
+
+    parts = []
+    report = []
+    for section, tokens in zip(sections, _allocate(sections, max_tokens)):
+        lines = _trim(section, tokens) if tokens >= min(MIN_SECTION_TOKENS, section.tokens) else []
+        if any(lines):
+            parts.append("\n".join(lines).strip())
+        report.append(_report(section, lines))
+    budgeted = "\n\n".join(part for part in parts if part)
+    return BudgetedSource(budgeted, source_tokens, estimate_tokens(budgeted), report)
+
+
+class PromptBudgetStats:
+    prefix = "prompt_budget"
+
+    def record(self, budgeted: BudgetedSource) -> None:
+        increment_cache_counter(self._counter_key("jobs"))
+        increment_cache_counter(self._counter_key("source_tokens"), budgeted.source_tokens)
+        increment_cache_counter(self._counter_key("prompt_tokens"), budgeted.prompt_tokens)
+
+    def snapshot(self) -> dict:
+        keys = {name: self._counter_key(name) for name in ("jobs", "source_tokens", "prompt_tokens")}
+        counters = get_cache_counters(list(keys.values()))
+        values = {name: counters[key] for name, key in keys.items()}
+        saved = max(0, values["source_tokens"] - values["prompt_tokens"])
+        values["tokens_saved"] = saved
+        values["saved_ratio"] = round(saved / values["source_tokens"], 4) if values["source_tokens"] else 0.0
+        return values
+
+    def _counter_key(self, name: str) -> str:
+        return build_cache_key(self.prefix, f"stats:{name}")
+
+
+prompt_budget_stats = PromptBudgetStats()
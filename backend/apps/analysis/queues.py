@@ -0,0 +1,101 @@
+import time
+from datetime import datetime
+
+from celery import current_app
+from celery.signals import before_task_publish, task_prerun
+from django.conf import settings
+from kombu.exceptions import OperationalError
+from redis.exceptions import RedisError
+
+from apps.billing.models import Subscription
+from core.cache_utils import build_cache_key
+from core.redis_client import get_redis_client
+
+ENQUEUED_AT_HEADER = "enqueued_at"
+WAIT_SAMPLE_SIZE = 500
+_TIMED_TASKS = ("apps.analysis.tasks.process_analyze_job", "apps.analysis.tasks.extract_analyze_source")
+
+
+def analysis_queues() -> list:
+    return [settings.ANALYZE_QUEUE_PRO, settings.ANALYZE_QUEUE_FREE]
+
+
+def analyze_queue_for(owner_id) -> str:
+    """Queue for an owner's analysis work: Pro jobs never wait behind a free-plan backlog."""
+    plan = Subscription.objects.filter(owner_id=owner_id).values_list("plan", flat=True).first()
+    return settings.ANALYZE_QUEUE_PRO if plan == Subscription.Plan.PRO else settings.ANALYZE_QUEUE_FREE
+
+
+def _wait_samples_key(queue: str) -> str:
+    return build_cache_key("queue_wait", queue)
+
+
+@before_task_publish.connect
+def _stamp_enqueued_at(sender=None, headers=None, **kwargs):
+    # Custom headers surface as attributes of task.request on the worker side.
+    if sender in _TIMED_TASKS and headers is not None:
+        headers[ENQUEUED_AT_HEADER] = time.time()
+
+
+@task_prerun.connect
+def _record_queue_wait(sender=None, task=None, **kwargs):
+    enqueued_at = getattr(task.request, ENQUEUED_AT_HEADER, None) if task is not None else None
+    if enqueued_at is None or task.name not in _TIMED_TASKS:
+        return
+    # Countdown/ETA time is scheduled delay, not queueing, so it is left out.
+    eta = task.request.eta
+    started_from = max(float(enqueued_at), _eta_timestamp(eta)) if eta else float(enqueued_at)
+    queue = (task.request.delivery_info or {}).get("routing_key") or "default"
+    wait_ms = max(0.0, (time.time() - started_from) * 1000)
+    try:
+        client = get_redis_client()
+        pipe = client.pipeline(transaction=False)
+        pipe.lpush(_wait_samples_key(queue), round(wait_ms, 1))
+        pipe.ltrim(_wait_samples_key(queue), 0, WAIT_SAMPLE_SIZE - 1)
+        pipe.execute()
+    except RedisError:
+        pass
+
+
+def _eta_timestamp(eta) -> float:
+    if isinstance(eta, str):
+        eta = datetime.fromisoformat(eta)
+    return eta.timestamp()
+
+
+def _queue_depths(queues: list) -> dict:
+    depths = {queue: None for queue in queues}
+    with current_app.connection_for_read() as connection:
+        try:
+            # One attempt only: a metrics request must not hang on an unreachable broker.
+            connection.ensure_connection(max_retries=1)
+            channel = connection.default_channel
+        except (OperationalError, *connection.connection_errors):
+            return depths
+        for queue in queues:
+            try:
+                depths[queue] = channel.queue_declare(queue=queue, passive=True).message_count
+            except connection.channel_errors:
+                # Redis drops the list key once it is drained, so a missing queue is an empty one.
+                depths[queue] = 0
+    return depths
+
+
+def queue_stats() -> dict:
+    """Depth and recent wait time (last WAIT_SAMPLE_SIZE starts) for every analysis queue."""
+    queues = analysis_queues() + [settings.ANALYZE_EXTRACTION_QUEUE]
+    queues = list(dict.fromkeys(queues))
+    depths = _queue_depths(queues)
+    stats = {}
+    for queue in queues:
+        try:
+            samples = sorted(float(value) for value in get_redis_client().lrange(_wait_samples_key(queue), 0, -1))
+        except RedisError:
+            samples = []
+        stats[queue] = {
+            "depth": depths[queue],
+            "wait_samples": len(samples),
+            "wait_mean_ms": round(sum(samples) / len(samples), 1) if samples else None,
+            "wait_p95_ms": samples[max(0, int(len(samples) * 0.95) - 1)] if samples else None,
+        }
+    return stats
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from apps.analysis.models import AnalyzeJob
+from core.cache_utils import build_cache_key, get_cache_counters, increment_cache_counter
+
+REAP_BATCH_SIZE = 100
+OUTCOMES = ("requeued", "failed")
+
+
+def stale_processing_jobs(limit: int = REAP_BATCH_SIZE):
+    """PROCESSING jobs whose heartbeat is older than ANALYZE_STALE_AFTER_SECONDS, oldest first."""
+    cutoff = timezone.now() - timedelta(seconds=settings.ANALYZE_STALE_AFTER_SECONDS)
+    # created_at bounds the scan to the (status, created_at) index: a job cannot have been
+    # silent for longer than it has existed.
+    return (
+        AnalyzeJob.objects.filter(status=AnalyzeJob.Status.PROCESSING, created_at__lt=cutoff)
+        .filter(Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True))
+        .order_by("created_at")[:limit]
+    )
+
+
+def abandoned_pending_jobs(limit: int = REAP_BATCH_SIZE):
+    """PENDING jobs silent for ANALYZE_PENDING_STALE_AFTER_SECONDS that never wrote a checkpoint."""
+    cutoff = timezone.now() - timedelta(seconds=settings.ANALYZE_PENDING_STALE_AFTER_SECONDS)
+    # Jobs deferred by a rate limit or requeued by the reaper went through PROCESSING and
+    # carry a checkpoint; only jobs lost before (or during) extraction have none. heartbeat_at
+    # is moved forward when extraction finishes and to the start time of a staggered batch job.
+    return (
+        AnalyzeJob.objects.filter(status=AnalyzeJob.Status.PENDING, created_at__lt=cutoff, checkpoint={})
+        .filter(Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True))
+        .order_by("created_at")[:limit]
+    )
+
+
+def _counter_key(outcome: str) -> str:
+    return build_cache_key("analyze_reaper", f"stats:{outcome}")
+
+
+def record_reaped(outcome: str) -> None:
+    try:
+        increment_cache_counter(_counter_key(outcome))
+    except RedisError:
+        pass
+
+
+def reaper_stats() -> dict:
+    keys = {outcome: _counter_key(outcome) for outcome in OUTCOMES}
+    counters = get_cache_counters(list(keys.values()))
+    stats = {outcome: counters[key] for outcome, key in keys.items()}
+    stats["stale_now"] = stale_processing_jobs().count()
+    stats["abandoned_now"] = abandoned_pending_jobs().count()
+    return stats
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache_utils import (
+    build_cache_key,
+    get_cache_counters,
+    get_json_cache,
+    increment_cache_counter,
+    set_json_cache,
+)
+
+
+class AnalysisResultCache:
+    """Content-addressed cache for LLM analysis results.
+
+    Keys hash the normalized source text, job description, source kind, model name
+    and prompt version. Invalidation bumps a generation counter for a model or a
+    prompt version, which orphans every key built under the previous generation.
+    """
+
+    SCOPE_USER = "user"
+    SCOPE_GLOBAL = "global"
+
+    prefix = "analysis_cache"
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ANALYSIS_CACHE_ENABLED
+
+    @property
+    def scope(self) -> str:
+        if settings.ANALYSIS_CACHE_SCOPE == self.SCOPE_GLOBAL:
+            return self.SCOPE_GLOBAL
+        return self.SCOPE_USER
+
+    def build_key(self, source_text: str, job_description: str, source_kind: str, model_name: str, owner_id=None):
+        prompt_version = settings.ANALYSIS_PROMPT_VERSION
+        fingerprint = json.dumps(
+            [
+                self._normalize(source_text),
+                self._normalize(job_description),
+                source_kind,
+                model_name,
+                prompt_version,
+            ]
+        )
+        digest = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+        generation = self._generation(model_name, prompt_version)
+
+        if self.scope == self.SCOPE_USER:
+            if owner_id is None:
+                return None
+            scope_part = f"user:{owner_id}"
+        else:
+            scope_part = "global"
+        return build_cache_key(self.prefix, f"{scope_part}:{generation}:{digest}")
+
+    def get(self, source_text: str, job_description: str, source_kind: str, model_name: str, owner_id=None):
+        if not self.enabled:
+            return None
+        key = self.build_key(source_text, job_description, source_kind, model_name, owner_id)
+        if key is None:
+            return None
+
+        payload = get_json_cache(key)
+        increment_cache_counter(self._counter_key("hits" if payload is not None else "misses"))
+        return payload
+
+    def set(self, source_text: str, job_description: str, source_kind: str, model_name: str, payload: dict, owner_id=None):
+        if not self.enabled:
+            return
+        key = self.build_key(source_text, job_description, source_kind, model_name, owner_id)
+        if key is None:
+            return
+        set_json_cache(key, payload, settings.ANALYSIS_CACHE_TTL_SECONDS)
+
+    def invalidate(self, model_name: str = "", prompt_version: str = "") -> None:
+        if model_name:
+            increment_cache_counter(self._generation_key("model", model_name))
+        if prompt_version:
+            increment_cache_counter(self._generation_key("prompt", prompt_version))
+
+    def stats(self) -> dict:
+        hits_key = self._counter_key("hits")
+        misses_key = self._counter_key("misses")
+        counters = get_cache_counters([hits_key, misses_key])
+        hits = counters[hits_key]
+        misses = counters[misses_key]
+        lookups = hits + misses
+        return {
+            "enabled": self.enabled,
+            "scope": self.scope,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _generation(self, model_name: str, prompt_version: str) -> str:
+        model_key = self._generation_key("model", model_name)
+        prompt_key = self._generation_key("prompt", prompt_version)
+        values = cache.get_many([model_key, prompt_key])
+        return f"{int(values.get(model_key) or 0)}.{int(values.get(prompt_key) or 0)}"
+
+    def _generation_key(self, kind: str, value: str) -> str:
+        return build_cache_key(self.prefix, f"generation:{kind}:{value}")
+
+    def _counter_key(self, name: str) -> str:
+        return build_cache_key(self.prefix, f"stats:{name}")
+
+    def _normalize(self, text: str) -> str:
+        # Whitespace-only edits (re-exported PDFs, trailing newlines) should still hit.
+        return re.sub(r"\s+", " ", text or "").strip()
+
+
+analysis_cache = AnalysisResultCache()
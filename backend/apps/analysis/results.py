@@ -0,0 +1,41 @@
+import json
+import zlib
+
+from django.conf import settings
+
+from apps.analysis.models import AnalyzeResult
+from core.cache_utils import build_cache_key, get_json_cache, set_json_cache
+
+
+def _result_cache_key(job_id) -> str:
+    return build_cache_key("analyze_result", str(job_id))
+
+
+def compress_result(result: dict) -> bytes:
+    raw = json.dumps(result, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return zlib.compress(raw, 6)
+
+
+def decompress_result(payload) -> dict:
+    return json.loads(zlib.decompress(bytes(payload)).decode("utf-8"))
+
+
+def store_analysis_result(job, result: dict) -> None:
+    AnalyzeResult.objects.update_or_create(job=job, defaults={"payload": compress_result(result)})
+    set_json_cache(_result_cache_key(job.id), result, settings.ANALYZE_RESULT_TTL_SECONDS)
+
+
+def load_analysis_result(job):
+    """Read-through lookup: Redis hot tier first, then the durable table."""
+    cache_key = _result_cache_key(job.id)
+    result = get_json_cache(cache_key)
+    if result is not None:
+        return result
+
+    payload = AnalyzeResult.objects.filter(job_id=job.id).values_list("payload", flat=True).first()
+    if payload is None:
+        return None
+
+    result = decompress_result(payload)
+    set_json_cache(cache_key, result, settings.ANALYZE_RESULT_TTL_SECONDS)
+    return result
@@ -1,6 +1,7 @@
-﻿from rest_framework import serializers
+﻿from django.conf import settings
+from rest_framework import serializers
 
-from apps.analysis.models import AnalyzeJob
+from apps.analysis.models import AnalyzeBatch, AnalyzeJob
 
 
 class AnalyzeCreateSerializer(serializers.Serializer):
@@ -24,6 +25,21 @@ class AnalyzeCreateSerializer(serializers.Serializer):
         return attrs
 
 
+class AnalyzeBatchCreateSerializer(serializers.Serializer):
+    files = serializers.ListField(child=serializers.FileField(), required=False, allow_empty=True)
+    archive = serializers.FileField(required=False)
+    job_description = serializers.CharField()
+
+    def validate(self, attrs):
+        files = attrs.get("files") or []
+        archive = attrs.get("archive")
+        if bool(files) == bool(archive):
+            raise serializers.ValidationError({"files": "Upload either CV files or one zip archive."})
+        if len(files) > settings.ANALYZE_BATCH_MAX_FILES:
+            raise serializers.ValidationError({"files": f"At most {settings.ANALYZE_BATCH_MAX_FILES} files per batch."})
+        return attrs
+
+
 class AnalyzeJobStatusSerializer(serializers.ModelSerializer):
     result = serializers.JSONField(required=False)
 
@@ -35,7 +51,22 @@ class AnalyzeJobStatusSerializer(serializers.ModelSerializer):
             "source_input",
             "status",
             "error_message",
+            "prescore",
             "created_at",
             "updated_at",
             "result",
         )
+
+
+class AnalyzeBatchStatusSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AnalyzeBatch
+        fields = (
+            "id",
+            "status",
+            "total",
+            "error_message",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        )
@@ -0,0 +1,157 @@
+import threading
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent / "data" / "skill_taxonomy.txt"
+MAX_GAP_SKILLS = 12
+
+# ASCII-only lowering keeps character offsets identical to the original text, so
+# case-sensitive terms can be checked against the source slice.
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+# Characters that continue a term: "C" must not match inside "C++", "C#" or "R&D".
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789+#&_")
+
+
+@dataclass(frozen=True)
+class Skill:
+    name: str
+    category: str
+
+
+class SkillTaxonomy:
+    """Aho-Corasick automaton over every skill name and alias in the taxonomy.
+
+    ``extract`` walks the text once regardless of the number of terms; hits are
+    kept only on word boundaries, and overlapping hits resolve to the longest term
+    (so "React Native" does not also report "React").
+    """
+
+    def __init__(self, entries):
+        self.skills = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for name, category, terms in entries:
+            index = len(self.skills)
+            self.skills.append(Skill(name, category))
+            for term in terms:
+                case_sensitive = term.startswith("=")
+                term = term.lstrip("=").strip()
+                if term:
+                    self._insert(term.translate(_ASCII_LOWER), (len(term), index, term if case_sensitive else ""))
+        self._build_failure_links()
+
+    @classmethod
+    def from_file(cls, path) -> "SkillTaxonomy":
+        entries = []
+        category = ""
+        for raw_line in Path(path).read_text(encoding="utf-8").splitlines():
+            line = raw_line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                category = line[1:-1].strip()
+                continue
+            name, _, aliases = line.partition("|")
+            terms = [name.strip()] + [alias.strip() for alias in aliases.split(",")]
+            entries.append((name.strip().lstrip("="), category, [term for term in terms if term]))
+        return cls(entries)
+
+    def _insert(self, term: str, output) -> None:
+        node = 0
+        for char in term:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = next_node
+        self._output[node] = self._output[node] + (output,)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                # Outputs of the suffix state are reachable from here without re-walking fail links.
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def extract(self, text: str) -> list:
+        """Skill names found in ``text``, in order of first appearance."""
+        text = text or ""
+        lowered = text.translate(_ASCII_LOWER)
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        hits = []
+        node = 0
+        for position, char in enumerate(lowered):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, index, exact in output[node]:
+                start = position - length + 1
+                if start and lowered[start - 1] in _WORD_CHARS:
+                    continue
+                if position + 1 < len(lowered) and lowered[position + 1] in _WORD_CHARS:
+                    continue
+                if exact and text[start : position + 1] != exact:
+                    continue
+                hits.append((start, -length, index))
+
+        found = []
+        seen = set()
+        covered_until = -1
+        for start, negative_length, index in sorted(hits):
+            if start < covered_until:
+                continue
+            covered_until = start - negative_length
+            if index not in seen:
+                seen.add(index)
+                found.append(self.skills[index].name)
+        return found
+
+
+_lock = threading.Lock()
+_taxonomy = None
+
+
+def get_skill_taxonomy() -> SkillTaxonomy:
+    # Compiled once per process; the automaton is read-only afterwards and safe to share.
+    global _taxonomy
+    with _lock:
+        if _taxonomy is None:
+            _taxonomy = SkillTaxonomy.from_file(settings.SKILL_TAXONOMY_PATH or DEFAULT_TAXONOMY_PATH)
+        return _taxonomy
+
+
+def github_skill_text(scraped: dict) -> str:
+    # Topics are slugs ("machine-learning"); languages and topics become plain phrases.
+    values = []
+    for key in ("languages", "top_languages", "topics"):
+        values.extend(str(value).replace("-", " ") for value in scraped.get(key) or [])
+    return "\n".join(values)
+
+
+def skill_gap(source_text: str, job_description: str, extra_source_text: str = "") -> dict:
+    """Deterministic gap between the skills a job asks for and those the source shows."""
+    taxonomy = get_skill_taxonomy()
+    source_skills = taxonomy.extract(f"{source_text}\n{extra_source_text}")
+    required = taxonomy.extract(job_description)
+    present = set(source_skills)
+    return {
+        "source_skills": source_skills,
+        "required_skills": required,
+        "matched": [name for name in required if name in present],
+        "missing": [name for name in required if name not in present][:MAX_GAP_SKILLS],
+    }
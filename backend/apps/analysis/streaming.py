@@ -0,0 +1,207 @@
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+from apps.analysis.models import AnalyzeJob
+from apps.analysis.results import load_analysis_result
+from apps.analysis.serializers import AnalyzeJobStatusSerializer
+from core.cache_utils import build_cache_key
+from core.redis_client import get_redis_client
+
+EVENT_PARTIAL = "partial"
+EVENT_COMPLETED = "completed"
+EVENT_FAILED = "failed"
+TERMINAL_EVENTS = (EVENT_COMPLETED, EVENT_FAILED)
+
+
+class PartialJSONObjectParser:
+    """Incrementally picks completed top-level members out of a streamed JSON object.
+
+    Text is fed chunk by chunk; once a member's value is closed (the scanner sees a
+    ``,`` or the final ``}`` at depth one) it is decoded and returned, so
+    ``ats_score`` is available long before ``next_actions`` has been generated.
+    Anything before the first ``{`` (markdown fences, preamble) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.member_start = None
+        self.closed = False
+
+    def feed(self, text: str) -> dict:
+        self.buffer += text or ""
+        completed = {}
+        while self.pos < len(self.buffer) and not self.closed:
+            char = self.buffer[self.pos]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                if self.depth:
+                    self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+                if self.depth == 1:
+                    self.member_start = self.pos + 1
+            elif char in "}]" and self.depth:
+                if self.depth == 1:
+                    completed.update(self._decode_member(self.pos))
+                    self.closed = True
+                self.depth -= 1
+            elif char == "," and self.depth == 1:
+                completed.update(self._decode_member(self.pos))
+                self.member_start = self.pos + 1
+            self.pos += 1
+        return completed
+
+    def _decode_member(self, end: int) -> dict:
+        member = self.buffer[self.member_start : end].strip()
+        if not member:
+            return {}
+        try:
+            return json.loads("{" + member + "}")
+        except ValueError:
+            # A malformed member is dropped here; the final parse of the full text decides.
+            return {}
+
+
+def stream_channel(job_id) -> str:
+    return build_cache_key("analyze_stream", str(job_id))
+
+
+def _snapshot_key(job_id) -> str:
+    return build_cache_key("analyze_partial", str(job_id))
+
+
+def get_partial_snapshot(job_id) -> dict:
+    return cache.get(_snapshot_key(job_id)) or {}
+
+
+def publish_event(job_id, event: str, fields: dict | None = None) -> None:
+    """Best effort: streaming only speeds up first paint, polling still has the full result."""
+    message = {"event": event, "fields": fields or {}}
+    try:
+        if event == EVENT_PARTIAL:
+            # Late subscribers start from the snapshot, then follow the channel.
+            snapshot = {**get_partial_snapshot(job_id), **message["fields"]}
+            cache.set(_snapshot_key(job_id), snapshot, timeout=settings.ANALYZE_RESULT_TTL_SECONDS)
+        else:
+            cache.delete(_snapshot_key(job_id))
+        get_redis_client().publish(stream_channel(job_id), json.dumps(message))
+    except RedisError:
+        pass
+
+
+def format_sse(event: str, data) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8")
+
+
+SSE_KEEPALIVE = b": keep-alive\n\n"
+
+
+class AnalyzeEventStream:
+    """Relays one job's stream channel to a client as server-sent events.
+
+    The channel is subscribed before the job is re-read, so an event published in
+    between is never lost. A finished job yields its final status at once; if Redis
+    is unavailable, the stream outlives ANALYZE_STREAM_MAX_SECONDS or the server runs
+    under WSGI, a ``poll`` event sends the client back to ``GET /api/analyze/<job_id>``.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.channel = stream_channel(job_id)
+
+    def __iter__(self):
+        """WSGI variant: what is known now, then ``poll``.
+
+        A sync worker blocked on a waiting stream cannot serve any other request, so
+        under WSGI the stream never waits: it yields the final status, or the partial
+        snapshot followed by a ``poll`` event.
+        """
+        try:
+            frames, done = self._opening_frames()
+        except RedisError:
+            frames, done = [], False
+        yield from frames
+        if not done:
+            yield self._poll_frame("Live updates need the ASGI server.")
+
+    async def aiter_frames(self):
+        """ASGI variant: relays the channel, waiting on Redis without tying up a thread per stream."""
+        import redis.asyncio as aioredis
+
+        frame = await sync_to_async(self._terminal_frame)()
+        if frame:
+            yield frame
+            return
+
+        client = aioredis.from_url(settings.REDIS_URL)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self.channel)
+            frames, done = await sync_to_async(self._opening_frames)()
+            for frame in frames:
+                yield frame
+            if done:
+                return
+
+            deadline = time.monotonic() + settings.ANALYZE_STREAM_MAX_SECONDS
+            while (remaining := deadline - time.monotonic()) > 0:
+                message = await pubsub.get_message(timeout=min(settings.ANALYZE_STREAM_KEEPALIVE_SECONDS, remaining))
+                event = self._decode(message)
+                if event is None:
+                    yield SSE_KEEPALIVE
+                elif event["event"] in TERMINAL_EVENTS:
+                    yield await sync_to_async(self._terminal_frame)() or self._poll_frame("Job state changed.")
+                    return
+                elif event["fields"]:
+                    yield format_sse(EVENT_PARTIAL, event["fields"])
+            yield self._poll_frame("Stream timed out.")
+        except RedisError:
+            yield self._poll_frame("Live updates are unavailable.")
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+    def _opening_frames(self):
+        frame = self._terminal_frame()
+        if frame:
+            return [frame], True
+        snapshot = get_partial_snapshot(self.job_id)
+        return ([format_sse(EVENT_PARTIAL, snapshot)] if snapshot else []), False
+
+    def _terminal_frame(self):
+        job = AnalyzeJob.objects.filter(id=self.job_id).first()
+        if job is None:
+            return self._poll_frame("Job not found.")
+        if job.status not in (AnalyzeJob.Status.COMPLETED, AnalyzeJob.Status.FAILED):
+            return None
+        data = AnalyzeJobStatusSerializer(job).data
+        if job.status == AnalyzeJob.Status.COMPLETED:
+            data["result"] = load_analysis_result(job)
+        return format_sse(job.status, data)
+
+    def _poll_frame(self, detail: str) -> bytes:
+        return format_sse("poll", {"detail": detail, "status_url": f"/api/analyze/{self.job_id}"})
+
+    def _decode(self, message):
+        if not message or message.get("type") != "message":
+            return None
+        try:
+            event = json.loads(message["data"])
+        except ValueError:
+            return None
+        return {"event": event.get("event", ""), "fields": event.get("fields") or {}}
@@ -1,63 +1,293 @@
-﻿import json
+﻿import zipfile
+from datetime import timedelta
+from pathlib import Path
 
-from celery import shared_task
+from celery import chain, group, shared_task
+from celery.exceptions import Ignore
+from celery.concurrency import get_implementation
+from celery.signals import worker_init, worker_process_init
 from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
 
+from apps.analysis.batches import BatchArchiveError, build_batch_ranking, list_archive_members
 from apps.analysis.gemini_client import gemini_client
-from apps.analysis.github_scraper import GitHubScrapeError, github_scraper
-from apps.analysis.models import AnalyzeJob, AnalyzeUsage
-from apps.billing.models import Subscription
-from core.cache_utils import build_cache_key, set_json_cache
+from apps.analysis.github_rate_limit import GitHubRateLimited
+from apps.analysis.github_scraper import GitHubScrapeError
+from apps.analysis.llm_governor import LLMRateLimited
+from apps.analysis.models import AnalyzeBatch, AnalyzeJob
+from apps.analysis.parser import DocumentParseError, extract_text_from_file
+from apps.analysis.pipeline import release_pipeline_blobs, run_analysis_pipeline
+from apps.analysis.queues import analyze_queue_for
+from apps.analysis.reaper import abandoned_pending_jobs, record_reaped, stale_processing_jobs
+from apps.analysis.streaming import EVENT_COMPLETED, EVENT_FAILED, publish_event
+from core.storage import storage_service
 
 
-@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 3})
-def process_analyze_job(self, job_id: str, source_type: str, source_payload, job_description: str = ""):
+MAX_ANALYZE_RETRIES = 3
+
+
+@worker_process_init.connect
+def _warm_gemini_client(**kwargs):
+    # Build the Gemini client once per pool process, after the prefork fork.
+    gemini_client.warm_up()
+
+
+@worker_init.connect
+def _warm_gemini_client_in_process(sender=None, **kwargs):
+    # gevent/threads/solo pools run tasks in the worker process itself, where
+    # worker_process_init never fires.
+    pool = get_implementation(getattr(sender, "pool_cls", None) or "prefork")
+    if pool.__module__ != "celery.concurrency.prefork":
+        gemini_client.warm_up()
+
+
+def _fail_job(job: AnalyzeJob, message: str) -> None:
+    job.status = AnalyzeJob.Status.FAILED
+    job.error_message = message
+    job.save(update_fields=["status", "error_message", "updated_at"])
+
+
+def _defer_task(task, countdown: float) -> None:
+    # A fresh message rather than task.retry(): waiting for capacity must not use up retries.
+    delivery_info = task.request.delivery_info or {}
+    task.apply_async(
+        args=task.request.args,
+        kwargs=task.request.kwargs,
+        countdown=countdown,
+        queue=delivery_info.get("routing_key"),
+    )
+
+
+def _job_settled(job: AnalyzeJob, event: str) -> None:
+    publish_event(job.id, event)
+    if job.batch_id and not AnalyzeJob.objects.filter(
+        batch_id=job.batch_id, status__in=(AnalyzeJob.Status.PENDING, AnalyzeJob.Status.PROCESSING)
+    ).exists():
+        # Fan-in: whichever job settles last triggers the ranking. A chord would never
+        # fire here because failed members are expected, and finalizing twice is harmless.
+        finalize_analyze_batch.delay(str(job.batch_id))
+
+
+def analyze_job_signature(job: AnalyzeJob, source_payload="", job_description: str = "", queue: str = ""):
+    # Extraction keeps its own (CPU-bound) queue; the network-bound stage is routed by plan.
+    analyze = process_analyze_job.si(str(job.id), job.source_type, source_payload, job_description).set(
+        queue=queue or analyze_queue_for(job.owner_id)
+    )
+    if job.source_type == AnalyzeJob.SourceType.CV:
+        # Uploads are stored raw by the web tier; text extraction runs as its own stage.
+        return chain(extract_analyze_source.si(str(job.id)), analyze)
+    return analyze
+
+
+def enqueue_analyze_job(job: AnalyzeJob, source_payload="", job_description: str = ""):
+    return analyze_job_signature(job, source_payload, job_description).apply_async()
+
+
+def dispatch_analyze_batch(batch: AnalyzeBatch, jobs) -> None:
+    signatures = []
+    # With an RPM budget configured, start times are spread over it so the governor
+    # is not flooded with requests it can only defer.
+    spacing = 60 / settings.GEMINI_RATE_LIMIT_RPM if settings.GEMINI_RATE_LIMIT_RPM else 0
+    queue = analyze_queue_for(batch.owner_id)
+    now = timezone.now()
+    for index, job in enumerate(jobs):
+        signature = analyze_job_signature(job, "", batch.job_description, queue=queue)
+        if spacing:
+            signature.set(countdown=index * spacing)
+            # The reaper measures a PENDING job's silence from here, not from created_at.
+            job.heartbeat_at = now + timedelta(seconds=index * spacing)
+        signatures.append(signature)
+    if spacing:
+        AnalyzeJob.objects.bulk_update(jobs, ["heartbeat_at"])
+    group(signatures).apply_async()
+
+
+@shared_task(bind=True, autoretry_for=(OSError,), retry_backoff=True, retry_kwargs={"max_retries": MAX_ANALYZE_RETRIES})
+def extract_analyze_source(self, job_id: str):
     job = AnalyzeJob.objects.get(id=job_id)
-    job.status = AnalyzeJob.Status.PROCESSING
-    job.save(update_fields=["status", "updated_at"])
+    upload_key = job.source_file_key
+    if job.status != AnalyzeJob.Status.PENDING or not upload_key:
+        return
 
     try:
-        source_text = ""
-        source_meta = {}
-
-        if source_type == AnalyzeJob.SourceType.GITHUB:
-            scraped = github_scraper.scrape(str(source_payload))
-            source_text = github_scraper.to_analysis_text(scraped)
-            source_meta = {
-                "source": "github",
-                "input": str(source_payload),
-                "scraped": scraped,
-            }
-        else:
-            source_text = str(source_payload)
-            source_meta = {
-                "source": "cv",
-                "input": job.source_input,
-            }
+        with storage_service.local_copy(upload_key) as upload_path:
+            source_text = extract_text_from_file(str(upload_path))
+        stored = storage_service.save_temp_text(source_text)
+    except Exception as exc:
+        if isinstance(exc, OSError) and self.request.retries < MAX_ANALYZE_RETRIES:
+            # autoretry_for picks transient storage errors up again.
+            raise
+        # Anything else (retries used up, a parser crash) would leave the job PENDING for good.
+        message = str(exc) if isinstance(exc, DocumentParseError) else "Could not read the uploaded document."
+        _fail_job(job, message)
+        storage_service.delete(upload_key)
+        _job_settled(job, EVENT_FAILED)
+        # Ignore stops the chain, so the LLM stage never runs for unreadable documents.
+        raise Ignore() from exc
 
-        ai_result = gemini_client.analyze_resume(source_text, job_description, source_kind=source_type)
-        result = {
-            **ai_result,
-            "source_meta": source_meta,
-        }
+    job.source_file_key = stored.key
+    # Queued for analysis from now on; the reaper should not count the extraction wait against it.
+    job.heartbeat_at = timezone.now()
+    job.save(update_fields=["source_file_key", "heartbeat_at", "updated_at"])
+    storage_service.delete(upload_key)
 
-        cache_key = build_cache_key("analyze_result", str(job.id))
-        set_json_cache(cache_key, result, settings.ANALYZE_RESULT_TTL_SECONDS)
 
-        AnalyzeUsage.objects.create(owner=job.owner)
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": MAX_ANALYZE_RETRIES},
+    soft_time_limit=settings.ANALYZE_TASK_SOFT_TIME_LIMIT,
+    time_limit=settings.ANALYZE_TASK_TIME_LIMIT,
+)
+def process_analyze_job(self, job_id: str, source_type: str, source_payload="", job_description: str = ""):
+    job = AnalyzeJob.objects.get(id=job_id)
+    terminal = (AnalyzeJob.Status.COMPLETED, AnalyzeJob.Status.FAILED)
+    if job.status in terminal and not self.request.retries:
+        # An earlier stage already settled the job (or this is a duplicate delivery).
+        return
+
+    job.status = AnalyzeJob.Status.PROCESSING
+    job.heartbeat_at = timezone.now()
+    # Kept on the job so the reaper can re-enqueue it if this worker dies mid-task.
+    job.checkpoint = {
+        **(job.checkpoint or {}),
+        "task_inputs": {"source_payload": str(source_payload or ""), "job_description": job_description},
+    }
+    job.save(update_fields=["status", "heartbeat_at", "checkpoint", "updated_at"])
 
-        subscription, _ = Subscription.objects.get_or_create(owner=job.owner)
-        subscription.register_analysis()
+    try:
+        run_analysis_pipeline(job, source_payload, job_description)
 
         job.status = AnalyzeJob.Status.COMPLETED
         job.error_message = ""
         job.save(update_fields=["status", "error_message", "updated_at"])
+        release_pipeline_blobs(job)
+        _job_settled(job, EVENT_COMPLETED)
+    except (LLMRateLimited, GitHubRateLimited) as exc:
+        # Out of Gemini capacity or GitHub budget: wait for it (until the X-RateLimit reset for
+        # GitHub) instead of failing the job.
+        job.status = AnalyzeJob.Status.PENDING
+        job.save(update_fields=["status", "updated_at"])
+        _defer_task(self, exc.retry_after)
     except GitHubScrapeError as exc:
-        job.status = AnalyzeJob.Status.FAILED
-        job.error_message = str(exc)
-        job.save(update_fields=["status", "error_message", "updated_at"])
+        _fail_job(job, str(exc))
+        release_pipeline_blobs(job)
+        _job_settled(job, EVENT_FAILED)
     except Exception as exc:
-        job.status = AnalyzeJob.Status.FAILED
-        job.error_message = str(exc)
-        job.save(update_fields=["status", "error_message", "updated_at"])
+        _fail_job(job, str(exc))
+        if self.request.retries >= MAX_ANALYZE_RETRIES:
+            release_pipeline_blobs(job)
+            _job_settled(job, EVENT_FAILED)
         raise
+
+
+@shared_task(bind=True, autoretry_for=(OSError,), retry_backoff=True, retry_kwargs={"max_retries": MAX_ANALYZE_RETRIES})
+def expand_analyze_batch(self, batch_id: str):
+    batch = AnalyzeBatch.objects.get(id=batch_id)
+    if batch.status != AnalyzeBatch.Status.PENDING or not batch.archive_key:
+        return
+
+    try:
+        with storage_service.local_copy(batch.archive_key) as archive_path, archive_path.open("rb") as archive:
+            members = list_archive_members(archive)
+            with zipfile.ZipFile(archive) as bundle:
+                jobs = []
+                for info in members:
+                    name = Path(info.filename).name
+                    with bundle.open(info) as member:
+                        stored = storage_service.save_temp_upload(File(member, name=name))
+                    jobs.append(
+                        AnalyzeJob(
+                            owner_id=batch.owner_id,
+                            batch=batch,
+                            source_input=name,
+                            source_file_key=stored.key,
+                        )
+                    )
+    except (BatchArchiveError, zipfile.BadZipFile) as exc:
+        batch.status = AnalyzeBatch.Status.FAILED
+        batch.error_message = str(exc)
+        batch.finished_at = timezone.now()
+        batch.save(update_fields=["status", "error_message", "finished_at", "updated_at"])
+        storage_service.delete(batch.archive_key)
+        return
+
+    AnalyzeJob.objects.bulk_create(jobs)
+    storage_service.delete(batch.archive_key)
+    batch.status = AnalyzeBatch.Status.PROCESSING
+    batch.total = len(jobs)
+    batch.archive_key = ""
+    batch.save(update_fields=["status", "total", "archive_key", "updated_at"])
+    dispatch_analyze_batch(batch, jobs)
+
+
+@shared_task
+def finalize_analyze_batch(batch_id: str):
+    batch = AnalyzeBatch.objects.get(id=batch_id)
+    active = (AnalyzeJob.Status.PENDING, AnalyzeJob.Status.PROCESSING)
+    if batch.jobs.filter(status__in=active).exists():
+        return
+
+    batch.ranking = build_batch_ranking(batch)
+    batch.status = AnalyzeBatch.Status.COMPLETED
+    batch.finished_at = timezone.now()
+    batch.save(update_fields=["ranking", "status", "finished_at", "updated_at"])
+
+
+@shared_task
+def reap_stale_analyze_jobs() -> dict:
+    """Re-enqueues PROCESSING jobs whose worker died (OOM kill, hard time limit), or fails them.
+
+    PENDING jobs that never reached the analysis stage within ANALYZE_PENDING_STALE_AFTER_SECONDS
+    are failed as well, which also releases their upload and lets their batch finish.
+    """
+    reaped = {"requeued": 0, "failed": 0}
+    for job in stale_processing_jobs():
+        inputs = (job.checkpoint or {}).get("task_inputs")
+        requeue = inputs is not None and job.reap_count < settings.ANALYZE_REAP_MAX_REQUEUES
+        now = timezone.now()
+        # Conditional on the heartbeat just read: a worker that was only slow and checkpoints now wins.
+        claimed = AnalyzeJob.objects.filter(
+            id=job.id, status=AnalyzeJob.Status.PROCESSING, heartbeat_at=job.heartbeat_at
+        ).update(
+            status=AnalyzeJob.Status.PENDING if requeue else AnalyzeJob.Status.FAILED,
+            error_message="" if requeue else "Analysis timed out.",
+            reap_count=job.reap_count + 1,
+            heartbeat_at=now,
+            updated_at=now,
+        )
+        if not claimed:
+            continue
+
+        outcome = "requeued" if requeue else "failed"
+        reaped[outcome] += 1
+        record_reaped(outcome)
+        if requeue:
+            # Extraction finished before the job went PROCESSING; only the analysis stage is re-run,
+            # resuming after its last checkpoint.
+            process_analyze_job.apply_async(
+                args=(str(job.id), job.source_type, inputs["source_payload"], inputs["job_description"]),
+                queue=analyze_queue_for(job.owner_id),
+            )
+        else:
+            job.refresh_from_db()
+            release_pipeline_blobs(job)
+            _job_settled(job, EVENT_FAILED)
+
+    for job in abandoned_pending_jobs():
+        # Never started analysing (e.g. the extraction worker was OOM-killed). Conditional on
+        # updated_at, so a job whose extraction is only now finishing is left alone.
+        claimed = AnalyzeJob.objects.filter(
+            id=job.id, status=AnalyzeJob.Status.PENDING, updated_at=job.updated_at
+        ).update(status=AnalyzeJob.Status.FAILED, error_message="Analysis timed out.", updated_at=timezone.now())
+        if not claimed:
+            continue
+
+        reaped["failed"] += 1
+        record_reaped("failed")
+        job.refresh_from_db()
+        release_pipeline_blobs(job)
+        _job_settled(job, EVENT_FAILED)
+    return reaped
@@ -0,0 +1,103 @@
+import io
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.analysis.models import AnalyzeBatch, AnalyzeJob, AnalyzeUsage
+from apps.analysis.tasks import expand_analyze_batch
+from config.celery import app as celery_app
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+SCORES = {"Go developer": 55, "Senior Python engineer": 91, "Junior Python developer": 72}
+
+
+def _fake_analysis(source_text, job_description="", **kwargs):
+    return {"ats_score": SCORES.get(source_text, 10), "overall_summary": source_text, "missing_keywords": []}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GEMINI_API_KEY="", FREE_PLAN_ANALYSIS_LIMIT=10)
+class AnalyzeBatchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
+        analyze = mock.patch("apps.analysis.pipeline.gemini_client.analyze_resume", side_effect=_fake_analysis)
+        analyze.start()
+        self.addCleanup(analyze.stop)
+
+        self.user = User.objects.create_user(username="recruiter", password="StrongPass123")
+        self.client.force_authenticate(self.user)
+
+    def test_multi_file_batch_ranks_completed_cvs_and_lists_failures(self):
+        files = [
+            SimpleUploadedFile("go.txt", b"Go developer"),
+            SimpleUploadedFile("senior.txt", b"Senior Python engineer"),
+            SimpleUploadedFile("broken.pdf", b"not a pdf"),
+        ]
+        res = self.client.post(
+            "/api/analyze/batch",
+            {"job_description": "Python backend role", "files": files},
+            format="multipart",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["total"], 3)
+
+        res = self.client.get(f"/api/analyze/batch/{res.data['batch_id']}")
+        self.assertEqual(res.data["status"], AnalyzeBatch.Status.COMPLETED)
+        self.assertEqual(res.data["progress"]["completed"], 2)
+        self.assertEqual(res.data["progress"]["failed"], 1)
+        ranking = res.data["ranking"]
+        self.assertEqual([entry["source_input"] for entry in ranking], ["senior.txt", "go.txt", "broken.pdf"])
+        self.assertEqual([entry.get("rank") for entry in ranking], [1, 2, None])
+        self.assertEqual(AnalyzeUsage.objects.filter(owner=self.user).count(), 2)
+
+    def test_zip_archive_is_expanded_by_the_worker(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("cvs/junior.txt", "Junior Python developer")
+            archive.writestr("cvs/senior.txt", "Senior Python engineer")
+            archive.writestr("__MACOSX/cvs/._senior.txt", "metadata")
+            archive.writestr("cvs/photo.png", "binary")
+
+        with mock.patch("apps.analysis.views.expand_analyze_batch.delay") as expand:
+            res = self.client.post(
+                "/api/analyze/batch",
+                {"job_description": "Python backend role", "archive": SimpleUploadedFile("cvs.zip", buffer.getvalue())},
+                format="multipart",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["total"], 2)
+        self.assertFalse(AnalyzeJob.objects.exists())
+        expand_analyze_batch.apply(args=expand.call_args.args)
+
+        batch = AnalyzeBatch.objects.get(id=res.data["batch_id"])
+        self.assertEqual((batch.status, batch.total, batch.archive_key), (AnalyzeBatch.Status.COMPLETED, 2, ""))
+        self.assertEqual([entry["source_input"] for entry in batch.ranking], ["senior.txt", "junior.txt"])
+
+    @override_settings(FREE_PLAN_ANALYSIS_LIMIT=2)
+    def test_batch_larger_than_remaining_quota_is_rejected(self):
+        files = [SimpleUploadedFile(f"cv{index}.txt", b"Python") for index in range(3)]
+        res = self.client.post(
+            "/api/analyze/batch",
+            {"job_description": "Python backend role", "files": files},
+            format="multipart",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_402_PAYMENT_REQUIRED)
+        self.assertFalse(AnalyzeJob.objects.exists())
@@ -0,0 +1,131 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.analysis.gemini_client import GeminiClient
+
+
+@override_settings(GEMINI_API_KEY="test-key", GEMINI_TRANSPORT="rest", GEMINI_API_ENDPOINT="")
+class GeminiClientLifecycleTests(SimpleTestCase):
+    def test_configures_once_and_reuses_models_per_name(self):
+        client = GeminiClient()
+        with mock.patch("google.generativeai.configure") as configure, mock.patch(
+            "google.generativeai.GenerativeModel", side_effect=lambda name: object()
+        ) as model_cls:
+            first = client.get_model()
+            self.assertIs(client.get_model(), first)
+            other = client.get_model("gemini-1.5-pro")
+
+        self.assertIsNot(other, first)
+        configure.assert_called_once_with(api_key="test-key", transport="rest")
+        self.assertEqual(model_cls.call_count, 2)
+
+    def test_reconfigures_after_fork(self):
+        client = GeminiClient()
+        with mock.patch("google.generativeai.configure") as configure, mock.patch(
+            "google.generativeai.GenerativeModel", side_effect=lambda name: object()
+        ):
+            with mock.patch("apps.analysis.gemini_client.os.getpid", return_value=100):
+                parent_model = client.get_model()
+            with mock.patch("apps.analysis.gemini_client.os.getpid", return_value=200):
+                child_model = client.get_model()
+
+        self.assertIsNot(child_model, parent_model)
+        self.assertEqual(configure.call_count, 2)
+
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+ANALYSIS_JSON = '{"ats_score": 80}'
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    GEMINI_HEDGE_ENABLED=True,
+    GEMINI_HEDGE_MIN_DELAY_SECONDS=0.05,
+    GEMINI_HEDGE_PERCENTILE=95,
+    GEMINI_FALLBACK_MODEL="gemini-fallback",
+)
+class GeminiHedgingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _fake_call(self, latencies):
+        def call(model_name, prompt, on_partial=None):
+            time.sleep(latencies[model_name])
+            return ANALYSIS_JSON
+
+        return call
+
+    def test_fast_primary_never_fires_hedge(self):
+        client = GeminiClient()
+        latencies = {client.model_name: 0.0, "gemini-fallback": 0.0}
+        with mock.patch.object(client, "_call_model", side_effect=self._fake_call(latencies)) as call:
+            result = client._generate("prompt")
+        self.assertEqual(call.call_count, 1)
+        self.assertEqual(result["llm_meta"]["path"], "primary")
+
+    def test_slow_primary_loses_to_hedge(self):
+        client = GeminiClient()
+        latencies = {client.model_name: 0.5, "gemini-fallback": 0.0}
+        with mock.patch.object(client, "_call_model", side_effect=self._fake_call(latencies)):
+            started = time.monotonic()
+            result = client._generate("prompt")
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual(result["ats_score"], 80)
+        self.assertEqual(result["llm_meta"], {"model": "gemini-fallback", "path": "hedge", "hedged": True})
+        self.assertEqual(client.hedge_stats()["hedge_wins"], 1)
+
+    def test_losing_primary_stops_streaming_partials(self):
+        client = GeminiClient()
+        primary_done = threading.Event()
+
+        def call(model_name, prompt, on_partial=None):
+            if model_name == "gemini-fallback":
+                return ANALYSIS_JSON
+            on_partial({"ats_score": 10})
+            time.sleep(0.2)
+            # Still streaming after the hedge has won.
+            on_partial({"strengths": ["stale"]})
+            primary_done.set()
+            return ANALYSIS_JSON
+
+        partials = []
+        with mock.patch.object(client, "_call_model", side_effect=call):
+            result = client._generate("prompt", on_partial=partials.append)
+            self.assertTrue(primary_done.wait(1))
+
+        self.assertEqual(result["llm_meta"]["path"], "hedge")
+        self.assertEqual(partials, [{"ats_score": 10}])
+
+    def test_fallback_model_answer_is_not_cached_for_the_primary(self):
+        client = GeminiClient()
+        client.api_key = "test-key"
+        latencies = {client.model_name: 0.5, "gemini-fallback": 0.0}
+        with override_settings(ANALYSIS_CACHE_ENABLED=True), mock.patch.object(
+            client, "_call_model", side_effect=self._fake_call(latencies)
+        ) as call:
+            client.analyze_resume("Python engineer", "Backend role", cache_owner_id=1)
+            call.reset_mock()
+            latencies[client.model_name] = 0.0
+            result = client.analyze_resume("Python engineer", "Backend role", cache_owner_id=1)
+
+        self.assertEqual(call.call_args.args[0], client.model_name)
+        self.assertEqual(result["llm_meta"]["model"], client.model_name)
+
+    def test_hedge_error_still_waits_for_primary(self):
+        client = GeminiClient()
+
+        def call(model_name, prompt, on_partial=None):
+            if model_name == "gemini-fallback":
+                raise RuntimeError("fallback down")
+            time.sleep(0.15)
+            return ANALYSIS_JSON
+
+        with mock.patch.object(client, "_call_model", side_effect=call):
+            result = client._generate("prompt")
+        self.assertEqual(result["llm_meta"]["path"], "primary")
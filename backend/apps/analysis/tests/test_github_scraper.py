@@ -0,0 +1,277 @@
+import json
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.analysis.github_cache import github_response_cache
+from apps.analysis.github_rate_limit import GitHubRateLimited, github_token_pool
+from apps.analysis.github_scraper import GitHubScrapeError, GitHubScraper
+from apps.analysis.github_source_cache import github_source_cache
+
+REPO_RESPONSES = {
+    "/repos/octo/tool": {"full_name": "octo/tool", "description": "CLI", "stargazers_count": 5, "topics": ["cli"]},
+    "/repos/octo/tool/languages": {"Go": 1200, "Shell": 40},
+    "/repos/octo/tool/readme": "# Tool\nFast CLI.",
+}
+
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def _response(payload, status=200, headers=None):
+    return mock.Mock(
+        status_code=status,
+        text=payload if isinstance(payload, str) else json.dumps(payload),
+        headers=headers or {},
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GITHUB_CACHE_FRESH_SECONDS=300)
+class GitHubScraperTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_repo_calls_run_concurrently_and_report_timings(self):
+        # Every call waits for the other two: a serial scraper would break the barrier.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_get(path, headers):
+            barrier.wait()
+            return _response(REPO_RESPONSES[path])
+
+        scraper = GitHubScraper()
+        timings = {}
+        with mock.patch.object(scraper, "_get", side_effect=fake_get):
+            scraped = scraper.scrape("https://github.com/octo/tool", timings=timings)
+
+        self.assertEqual(scraped["full_name"], "octo/tool")
+        self.assertEqual(scraped["languages"], ["Go", "Shell"])
+        self.assertEqual(scraped["readme_excerpt"], "# Tool\nFast CLI.")
+        self.assertEqual(set(timings), {"repo", "languages", "readme"})
+
+    def test_api_error_is_raised_from_concurrent_fetch(self):
+        scraper = GitHubScraper()
+        with mock.patch.object(scraper, "_get", return_value=_response({}, status=404)):
+            with self.assertRaisesMessage(GitHubScrapeError, "GitHub API error (404)."):
+                scraper.scrape("https://github.com/octo")
+
+    def test_session_is_reused_across_scrapes(self):
+        scraper = GitHubScraper()
+        self.assertIs(scraper._get_session(), scraper._get_session())
+
+    def test_fresh_response_is_served_without_a_request(self):
+        scraper = GitHubScraper()
+        response = _response({"login": "octo"}, headers={"ETag": '"v1"'})
+        with mock.patch.object(scraper, "_get", return_value=response) as get:
+            self.assertEqual(scraper._request_json("/users/octo"), {"login": "octo"})
+            self.assertEqual(scraper._request_json("/users/octo"), {"login": "octo"})
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(github_response_cache.stats()["fresh"], 1)
+
+    def test_stale_response_is_revalidated_with_etag(self):
+        scraper = GitHubScraper()
+        with mock.patch.object(scraper, "_get", return_value=_response({"login": "octo"}, headers={"ETag": '"v1"'})):
+            scraper._request_json("/users/octo")
+
+        with override_settings(GITHUB_CACHE_FRESH_SECONDS=0), mock.patch.object(
+            scraper, "_get", return_value=_response("", status=304)
+        ) as get:
+            self.assertEqual(scraper._request_json("/users/octo"), {"login": "octo"})
+
+        self.assertEqual(get.call_args.args[1]["If-None-Match"], '"v1"')
+        self.assertEqual(github_response_cache.stats()["revalidated"], 1)
+
+
+def _graphql_repo(name, languages, topics=(), readme=None):
+    return {
+        "name": name,
+        "nameWithOwner": f"octo/{name}",
+        "description": f"{name} description",
+        "stargazerCount": 3,
+        "forkCount": 1,
+        "pushedAt": "2026-01-02T00:00:00Z",
+        "primaryLanguage": {"name": languages[0][0]} if languages else None,
+        "languages": {"edges": [{"size": size, "node": {"name": lang}} for lang, size in languages]},
+        "repositoryTopics": {"nodes": [{"topic": {"name": topic}} for topic in topics]},
+        "readmeMd": None,
+        "readmeLower": {"text": readme} if readme else None,
+    }
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES, GITHUB_SCRAPER_BACKEND="graphql", GITHUB_GRAPHQL_REPOS=20, GITHUB_TOKENS="test-token"
+)
+class GitHubGraphQLScraperTests(SimpleTestCase):
+    def _scraper(self):
+        return GitHubScraper()
+
+    def test_user_profile_is_one_query_with_language_sizes(self):
+        data = {
+            "user": {
+                "login": "octo",
+                "name": "Octo Cat",
+                "bio": "Builds things",
+                "followers": {"totalCount": 9},
+                "repositories": {"totalCount": 30},
+                "topRepositories": {
+                    "nodes": [
+                        _graphql_repo("api", [("Go", 500), ("Python", 100)], ["grpc"]),
+                        _graphql_repo("ml", [("Python", 900)], ["machine-learning"]),
+                    ]
+                },
+            },
+            "profile": {"readmeMd": {"text": "Hi, I build distributed systems."}},
+        }
+        scraper = self._scraper()
+        timings = {}
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {"data": data}
+        with mock.patch.object(scraper, "_post", return_value=response) as post, mock.patch.object(scraper, "_get") as get:
+            scraped = scraper.scrape("https://github.com/octo", timings=timings)
+
+        self.assertEqual(post.call_count, 1)
+        get.assert_not_called()
+        self.assertEqual(post.call_args.args[1]["variables"], {"login": "octo", "repos": 20})
+        self.assertEqual(scraped["top_languages"], ["Python", "Go"])
+        self.assertEqual(scraped["topics"], ["grpc", "machine-learning"])
+        self.assertEqual(scraped["public_repos"], 30)
+        self.assertEqual(set(timings), {"graphql"})
+        text = scraper.to_analysis_text(scraped)
+        self.assertIn("topics=machine-learning", text)
+        self.assertIn("Profile README:\nHi, I build distributed systems.", text)
+
+    def test_repo_readme_and_missing_repo(self):
+        scraper = self._scraper()
+        found = mock.Mock(status_code=200)
+        found.json.return_value = {"data": {"repository": _graphql_repo("tool", [("Rust", 10)], readme="# Tool")}}
+        with mock.patch.object(scraper, "_post", return_value=found):
+            scraped = scraper.scrape("https://github.com/octo/tool")
+        self.assertEqual(scraped["full_name"], "octo/tool")
+        self.assertEqual(scraped["languages"], ["Rust"])
+        self.assertEqual(scraped["readme_excerpt"], "# Tool")
+
+        missing = mock.Mock(status_code=200)
+        missing.json.return_value = {"data": {"repository": None}, "errors": [{"type": "NOT_FOUND"}]}
+        with mock.patch.object(scraper, "_post", return_value=missing):
+            with self.assertRaisesMessage(GitHubScrapeError, "GitHub API error (404)."):
+                scraper.scrape("https://github.com/octo/gone")
+
+    def test_user_without_profile_readme_repo_is_scraped(self):
+        scraper = self._scraper()
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {
+            "data": {"user": {"login": "octo", "topRepositories": {"nodes": []}}, "profile": None},
+            "errors": [{"type": "NOT_FOUND", "path": ["profile"], "message": "Could not resolve to a Repository"}],
+        }
+        with mock.patch.object(scraper, "_post", return_value=response):
+            scraped = scraper.scrape("https://github.com/octo")
+
+        self.assertEqual(scraped["username"], "octo")
+        self.assertEqual(scraped["profile_readme"], "")
+
+    def test_organisation_falls_back_to_rest(self):
+        scraper = self._scraper()
+        not_a_user = mock.Mock(status_code=200)
+        not_a_user.json.return_value = {
+            "data": {"user": None, "profile": None},
+            "errors": [{"type": "NOT_FOUND", "path": ["user"]}, {"type": "NOT_FOUND", "path": ["profile"]}],
+        }
+        rest = {"/users/octo-org": {"login": "octo-org", "public_repos": 4}, "/users/octo-org/repos": []}
+
+        def get(path, headers):
+            return _response(rest[path.split("?")[0]])
+
+        with mock.patch.object(scraper, "_post", return_value=not_a_user), mock.patch.object(
+            scraper, "_get", side_effect=get
+        ):
+            scraped = scraper.scrape("https://github.com/octo-org")
+
+        self.assertEqual(scraped["username"], "octo-org")
+        self.assertEqual(scraped["public_repos"], 4)
+
+    @override_settings(GITHUB_TOKENS="", GITHUB_TOKEN="")
+    def test_without_token_rest_is_used(self):
+        self.assertFalse(GitHubScraper()._use_graphql())
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GITHUB_CACHE_ENABLED=False, GITHUB_TOKENS="token-a,token-b")
+class GitHubRateLimitTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.reset = int(time.time()) + 600
+        self.calls = []
+
+    def _scraper(self, exhausted_tokens):
+        def fake_get(url, headers, timeout):
+            token = headers["Authorization"].split()[-1]
+            self.calls.append(token)
+            if token in exhausted_tokens:
+                limit_headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(self.reset)}
+                return _response({"message": "API rate limit exceeded"}, status=403, headers=limit_headers)
+            budget_headers = {"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": str(self.reset)}
+            return _response({"login": "octo"}, headers=budget_headers)
+
+        scraper = GitHubScraper()
+        session = mock.Mock(get=mock.Mock(side_effect=fake_get))
+        mock.patch.object(scraper, "_get_session", return_value=session).start()
+        self.addCleanup(mock.patch.stopall)
+        return scraper
+
+    def test_spent_token_is_rotated_out(self):
+        scraper = self._scraper(exhausted_tokens={"token-a"})
+        self.assertEqual(scraper._request_json("/users/octo"), {"login": "octo"})
+        self.assertEqual(scraper._request_json("/users/octo"), {"login": "octo"})
+
+        # token-a is tried once, reports zero budget, and is skipped from then on.
+        self.assertEqual(self.calls.count("token-a"), 1)
+        self.assertEqual(self.calls.count("token-b"), 2)
+        budgets = {entry["remaining"] for entry in github_token_pool.stats()["budgets"]["core"]}
+        self.assertEqual(budgets, {0, 4999})
+
+    def test_all_tokens_spent_raises_with_time_until_reset(self):
+        scraper = self._scraper(exhausted_tokens={"token-a", "token-b"})
+        with self.assertRaises(GitHubRateLimited) as raised:
+            scraper._request_json("/users/octo")
+        self.assertAlmostEqual(raised.exception.retry_after, 601, delta=5)
+
+        # Later jobs are deferred without spending a request.
+        with self.assertRaises(GitHubRateLimited):
+            scraper._request_json("/users/octo")
+        self.assertEqual(len(self.calls), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GITHUB_SOURCE_CACHE_MAX_ENTRIES=2)
+class GitHubSourceCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = mock.Mock()
+        patcher = mock.patch("apps.analysis.github_source_cache.get_redis_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_least_recently_used_entry_is_evicted_past_the_bound(self):
+        self.client.pipeline.return_value.execute.return_value = [1, 0, 2]
+        github_source_cache.set("rest:repo:octo/old", {"full_name": "octo/old"})
+        self.client.zpopmin.assert_not_called()
+
+        # A third entry puts the index over the bound of two; the oldest is popped and deleted.
+        self.client.pipeline.return_value.execute.return_value = [1, 0, 3]
+        self.client.zpopmin.return_value = [(github_source_cache.build_key("rest:repo:octo/old").encode(), 1.0)]
+        github_source_cache.set("rest:repo:octo/new", {"full_name": "octo/new"})
+
+        self.client.zpopmin.assert_called_once_with(github_source_cache.build_key("index"), 1)
+        self.assertIsNone(github_source_cache.get("rest:repo:octo/old"))
+        self.assertEqual(github_source_cache.get("rest:repo:octo/new"), {"full_name": "octo/new"})
+        stats = github_source_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_canonical_source_ignores_url_spelling(self):
+        scraper = GitHubScraper()
+        self.assertEqual(
+            scraper.canonical_source("https://github.com/Octo/Tool.git"),
+            scraper.canonical_source("https://www.github.com/octo/tool/tree/main"),
+        )
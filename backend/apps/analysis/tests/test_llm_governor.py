@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from redis.exceptions import RedisError
+
+from apps.analysis.llm_governor import GeminiGovernor, LLMRateLimited
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    GEMINI_RATE_LIMIT_RPM=60,
+    GEMINI_RATE_LIMIT_TPM=0,
+    GEMINI_MAX_IN_FLIGHT=4,
+    GEMINI_RATE_LIMIT_MAX_WAIT_SECONDS=1,
+)
+class GeminiGovernorTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.governor = GeminiGovernor()
+        self.semaphore = mock.Mock()
+        self.semaphore.try_acquire.return_value = "holder"
+        self.semaphore.in_use.return_value = 0
+        self.buckets = mock.Mock()
+        self.buckets.levels.return_value = {"rpm": 60.0}
+        patches = [
+            mock.patch.object(GeminiGovernor, "_semaphore", return_value=self.semaphore),
+            mock.patch.object(GeminiGovernor, "_buckets", return_value=self.buckets),
+            mock.patch("apps.analysis.llm_governor.time.sleep"),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_slot_is_released_after_call(self):
+        self.buckets.try_acquire.return_value = (True, 0.0)
+        with self.governor.slot("prompt"):
+            pass
+        self.semaphore.release.assert_called_once_with("holder")
+        self.assertEqual(self.governor.stats()["granted"], 1)
+
+    def test_short_wait_happens_in_process(self):
+        self.buckets.try_acquire.side_effect = [(False, 0.5), (True, 0.0)]
+        with self.governor.slot("prompt"):
+            pass
+        self.assertEqual(self.governor.stats()["granted_after_wait"], 1)
+
+    def test_long_wait_defers_with_retry_after(self):
+        self.buckets.try_acquire.return_value = (False, 12.0)
+        with self.assertRaises(LLMRateLimited) as ctx:
+            with self.governor.slot("prompt"):
+                self.fail("LLM call must not run without capacity.")
+        self.assertEqual(ctx.exception.retry_after, 12.0)
+        # The concurrency slot is handed back when the rate bucket refuses.
+        self.semaphore.release.assert_called_with("holder")
+        self.assertEqual(self.governor.stats()["deferred"], 1)
+
+    def test_redis_outage_fails_open(self):
+        self.semaphore.try_acquire.side_effect = RedisError("connection refused")
+        ran = False
+        counter = mock.patch("apps.analysis.llm_governor.increment_cache_counter", side_effect=RedisError("down"))
+        with counter:
+            with self.governor.slot("prompt"):
+                ran = True
+        self.assertTrue(ran)
+        self.semaphore.release.assert_not_called()
@@ -0,0 +1,60 @@
+import io
+import zipfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from apps.analysis.parser import MAX_ANALYSIS_TEXT_CHARS, DocumentParseError, extract_text_from_upload
+
+DOCX_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>{}</w:body></w:document>'
+)
+
+
+def build_docx(paragraphs) -> bytes:
+    body = "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", DOCX_TEMPLATE.format(body))
+    return buffer.getvalue()
+
+
+def build_pdf(pages) -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    for text in pages:
+        pdf.drawString(72, 720, text)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+class ExtractTextFromUploadTests(SimpleTestCase):
+    def test_plain_text_stops_at_limit(self):
+        upload = SimpleUploadedFile("resume.txt", ("é" * (MAX_ANALYSIS_TEXT_CHARS * 3)).encode("utf-8"))
+        text = extract_text_from_upload(upload)
+        self.assertEqual(text, "é" * MAX_ANALYSIS_TEXT_CHARS)
+        self.assertEqual(upload.tell(), 0)
+
+    def test_docx_paragraphs_are_extracted(self):
+        upload = SimpleUploadedFile("resume.docx", build_docx(["Jane Doe", "Senior Django Engineer"]))
+        self.assertEqual(extract_text_from_upload(upload), "Jane Doe\nSenior Django Engineer")
+
+    def test_docx_stops_at_limit(self):
+        upload = SimpleUploadedFile("resume.docx", build_docx(["x" * 1000] * 100))
+        self.assertEqual(len(extract_text_from_upload(upload)), MAX_ANALYSIS_TEXT_CHARS)
+
+    def test_pdf_pages_are_extracted(self):
+        upload = SimpleUploadedFile("resume.pdf", build_pdf(["Jane Doe", "Kubernetes and Terraform"]))
+        text = extract_text_from_upload(upload)
+        self.assertIn("Jane Doe", text)
+        self.assertIn("Kubernetes and Terraform", text)
+
+    def test_corrupt_docx_raises_parse_error(self):
+        upload = SimpleUploadedFile("resume.docx", b"not a zip archive")
+        with self.assertRaises(DocumentParseError):
+            extract_text_from_upload(upload)
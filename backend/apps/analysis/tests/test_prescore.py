@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.analysis.gemini_client import GeminiClient
+from apps.analysis.models import AnalyzeJob
+from apps.analysis.prescore import prescore
+from apps.analysis.tasks import process_analyze_job
+from config.celery import app as celery_app
+from core.storage import storage_service
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+BACKEND_CV = (
+    "Senior Python engineer. Built Django REST APIs and Celery pipelines on PostgreSQL and Redis.\n"
+    "Led migration to Kubernetes on AWS, cutting p95 latency by 35%.\n"
+    "Skills: Python, Django, Celery, Redis, PostgreSQL, Docker, Kubernetes, AWS"
+)
+DESIGNER_CV = "Graphic designer with Photoshop, Illustrator and branding experience for print campaigns."
+BACKEND_JD = (
+    "We are looking for a Backend Engineer with strong Python and Django experience. "
+    "You will design REST APIs, work with PostgreSQL and Redis, and deploy with Docker and Kubernetes. "
+    "Experience with Terraform and GraphQL is a plus."
+)
+
+
+class PreScoreTests(SimpleTestCase):
+    def test_matching_cv_outscores_unrelated_cv(self):
+        matching = prescore(BACKEND_CV, BACKEND_JD)
+        unrelated = prescore(DESIGNER_CV, BACKEND_JD)
+
+        self.assertGreater(matching.ats_score, unrelated.ats_score + 20)
+        self.assertGreater(matching.keyword_coverage, unrelated.keyword_coverage)
+        self.assertIn("kubernetes", matching.matched_keywords)
+
+    def test_missing_keywords_are_job_terms_absent_from_cv(self):
+        result = prescore(BACKEND_CV, BACKEND_JD)
+
+        self.assertIn("terraform", result.missing_keywords)
+        self.assertIn("graphql", result.missing_keywords)
+        self.assertNotIn("django", result.missing_keywords)
+        self.assertNotIn("looking", result.missing_keywords)
+
+    def test_plural_forms_match(self):
+        self.assertIn("apis", prescore("Designed public API for payments", "REST APIs").matched_keywords)
+
+    def test_empty_source_scores_zero(self):
+        self.assertEqual(prescore("", BACKEND_JD).ats_score, 0)
+
+    @override_settings(GEMINI_API_KEY="")
+    def test_fallback_without_api_key_uses_local_score(self):
+        result = GeminiClient().analyze_resume(BACKEND_CV, BACKEND_JD)
+
+        self.assertEqual(result["ats_score"], prescore(BACKEND_CV, BACKEND_JD).ats_score)
+        self.assertIn("terraform", result["missing_keywords"])
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GEMINI_API_KEY="")
+class PreScoreStageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
+    def test_prescore_is_stored_on_the_job_before_the_llm_stage(self):
+        owner = User.objects.create_user(username="prescorer", password="StrongPass123")
+        stored = storage_service.save_temp_text(BACKEND_CV)
+        self.addCleanup(storage_service.delete, stored.key)
+        job = AnalyzeJob.objects.create(owner=owner, source_input="cv.txt", source_file_key=stored.key)
+
+        process_analyze_job.apply(args=(str(job.id), AnalyzeJob.SourceType.CV, "", BACKEND_JD))
+
+        job.refresh_from_db()
+        self.assertEqual(job.prescore["ats_score"], prescore(BACKEND_CV, BACKEND_JD).ats_score)
+        self.assertIn("terraform", job.prescore["missing_keywords"])
@@ -0,0 +1,64 @@
+from django.test import SimpleTestCase
+
+from apps.analysis.github_scraper import github_scraper
+from apps.analysis.prompt_budget import budget_source_text, clean_source_text, estimate_tokens
+
+
+def build_cv(roles: int) -> str:
+    lines = ["Jane Doe", "jane@example.com", "", "SUMMARY", "Backend engineer building Python APIs.", "", "EXPERIENCE"]
+    for index in range(roles):
+        lines += [
+            f"Engineer, Company {index}",
+            f"- Built service {index} on Python and Redis serving {index + 1}k requests per second.",
+            "Page 2 of 4",
+            "Jane Doe - Resume",
+        ]
+    lines += ["", "SKILLS", "Python, Django, PostgreSQL, Kubernetes", "", "EDUCATION", "BSc Computer Science", ""]
+    lines += ["REFERENCES"] + [f"Referee {index}, phone 555-01{index:02d}, available on request" for index in range(30)]
+    return "\n".join(lines)
+
+
+class PromptBudgetTests(SimpleTestCase):
+    def test_noise_and_repeated_lines_are_removed(self):
+        cleaned = clean_source_text(build_cv(3))
+
+        self.assertNotIn("Page 2 of 4", cleaned)
+        self.assertEqual(cleaned.count("Jane Doe - Resume"), 1)
+
+    def test_short_source_is_kept_whole(self):
+        budgeted = budget_source_text(build_cv(2), max_tokens=2000)
+
+        self.assertIn("Company 1", budgeted.text)
+        self.assertIn("Referee 29", budgeted.text)
+        self.assertEqual(budgeted.prompt_tokens, estimate_tokens(budgeted.text))
+
+    def test_long_cv_keeps_every_priority_section_and_recent_roles(self):
+        source = build_cv(80)
+        budgeted = budget_source_text(source, max_tokens=600)
+
+        self.assertLessEqual(budgeted.prompt_tokens, 600)
+        self.assertGreater(budgeted.tokens_saved, estimate_tokens(source) // 2)
+        for kept in ("Backend engineer", "Company 0", "Kubernetes", "BSc Computer Science"):
+            self.assertIn(kept, budgeted.text)
+        self.assertNotIn("Company 79", budgeted.text)
+        report = {section["category"]: section for section in budgeted.to_dict()["sections"]}
+        self.assertLess(report["low"]["kept_tokens"], report["low"]["tokens"])
+
+    def test_readme_boilerplate_is_cut_before_features(self):
+        readme = "\n".join(
+            ["# tool", "![build](https://ci/badge.svg)", "## Features", "Fast incremental indexing in Rust."]
+            + ["## Installation", "```sh", "cargo install tool", "```"]
+            + [f"Step {index}: run the installer on platform {index} and follow the prompts." for index in range(60)]
+            + ["## License", "MIT"]
+        )
+        source = github_scraper.to_analysis_text(
+            {"source_type": "github_repo", "full_name": "octo/tool", "languages": ["Rust"], "readme_excerpt": readme}
+        )
+
+        budgeted = budget_source_text(source, max_tokens=250)
+
+        self.assertIn("Repository: octo/tool", budgeted.text)
+        self.assertIn("Fast incremental indexing", budgeted.text)
+        self.assertNotIn("badge.svg", budgeted.text)
+        self.assertNotIn("cargo install", budgeted.text)
+        self.assertNotIn("Step 59", budgeted.text)
@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.analysis.gemini_client import GeminiClient
+from apps.analysis.result_cache import analysis_cache
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GEMINI_API_KEY="test-key", ANALYSIS_CACHE_SCOPE="user")
+class AnalysisResultCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client_ = GeminiClient()
+        self.generated = {"ats_score": 81, "missing_keywords": ["kubernetes"]}
+
+    def test_repeat_analysis_hits_cache_without_llm_call(self):
+        with mock.patch.object(GeminiClient, "_generate", return_value=self.generated) as generate:
+            first = self.client_.analyze_resume("Python  engineer\n", "Backend role", "cv", cache_owner_id=1)
+            second = self.client_.analyze_resume("Python engineer", "Backend role", "cv", cache_owner_id=1)
+
+        self.assertEqual(first, second)
+        self.assertEqual(generate.call_count, 1)
+        stats = analysis_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_user_scope_isolates_owners(self):
+        with mock.patch.object(GeminiClient, "_generate", return_value=self.generated) as generate:
+            self.client_.analyze_resume("Python engineer", "", "cv", cache_owner_id=1)
+            self.client_.analyze_resume("Python engineer", "", "cv", cache_owner_id=2)
+        self.assertEqual(generate.call_count, 2)
+
+    @override_settings(ANALYSIS_CACHE_SCOPE="global")
+    def test_global_scope_shares_entries(self):
+        with mock.patch.object(GeminiClient, "_generate", return_value=self.generated) as generate:
+            self.client_.analyze_resume("Python engineer", "", "cv", cache_owner_id=1)
+            self.client_.analyze_resume("Python engineer", "", "cv", cache_owner_id=2)
+        self.assertEqual(generate.call_count, 1)
+
+    def test_invalidate_by_model_forces_fresh_call(self):
+        with mock.patch.object(GeminiClient, "_generate", return_value=self.generated) as generate:
+            self.client_.analyze_resume("Python engineer", "", "cv", cache_owner_id=1)
+            analysis_cache.invalidate(model_name=self.client_.model_name)
+            self.client_.analyze_resume("Python engineer", "", "cv", cache_owner_id=1)
+        self.assertEqual(generate.call_count, 2)
+
+    def test_fallback_result_is_not_cached(self):
+        with mock.patch.object(GeminiClient, "_generate", side_effect=RuntimeError("provider down")):
+            self.client_.analyze_resume("Python engineer", "", "cv", cache_owner_id=1)
+        with mock.patch.object(GeminiClient, "_generate", return_value=self.generated) as generate:
+            result = self.client_.analyze_resume("Python engineer", "", "cv", cache_owner_id=1)
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(result, self.generated)
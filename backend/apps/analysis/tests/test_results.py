@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.analysis.models import AnalyzeJob, AnalyzeResult
+from apps.analysis.results import load_analysis_result, store_analysis_result
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnalysisResultStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user(username="owner", password="StrongPass123")
+        self.job = AnalyzeJob.objects.create(owner=owner, status=AnalyzeJob.Status.COMPLETED)
+        self.result = {"ats_score": 77, "strengths": ["Clear impact metrics."]}
+
+    def test_result_survives_cache_eviction(self):
+        store_analysis_result(self.job, self.result)
+        cache.clear()
+
+        self.assertEqual(load_analysis_result(self.job), self.result)
+        # The durable read repopulates the hot tier.
+        with self.assertNumQueries(0):
+            self.assertEqual(load_analysis_result(self.job), self.result)
+
+    def test_payload_is_compressed(self):
+        store_analysis_result(self.job, {"overall_summary": "x" * 5000})
+        record = AnalyzeResult.objects.get(job=self.job)
+        self.assertLess(len(bytes(record.payload)), 500)
+
+    def test_missing_result_returns_none(self):
+        self.assertIsNone(load_analysis_result(self.job))
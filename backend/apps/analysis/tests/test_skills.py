@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.analysis.models import AnalyzeJob
+from apps.analysis.results import load_analysis_result
+from apps.analysis.skills import SkillTaxonomy, get_skill_taxonomy, github_skill_text, skill_gap
+from apps.analysis.tasks import process_analyze_job
+from config.celery import app as celery_app
+from core.storage import storage_service
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+CV_TEXT = (
+    "Backend engineer. Python-based services on K8s and AWS; REST APIs with Django and DRF.\n"
+    "Skills: postgres, Redis, C/C++"
+)
+JOB_DESCRIPTION = "Looking for Python, Django, PostgreSQL, Kubernetes, Terraform and Go experience."
+
+
+class SkillTaxonomyTests(SimpleTestCase):
+    def test_aliases_resolve_to_canonical_names(self):
+        found = get_skill_taxonomy().extract(CV_TEXT)
+
+        self.assertIn("Kubernetes", found)
+        self.assertIn("PostgreSQL", found)
+        self.assertIn("C++", found)
+        self.assertIn("C", found)
+
+    def test_longest_match_wins_and_boundaries_are_respected(self):
+        taxonomy = SkillTaxonomy(
+            [
+                ("React", "frameworks", ["React"]),
+                ("React Native", "frameworks", ["React Native"]),
+                ("Java", "languages", ["Java"]),
+                ("Go", "languages", ["=Go", "golang"]),
+            ]
+        )
+
+        self.assertEqual(taxonomy.extract("Shipped React Native apps"), ["React Native"])
+        self.assertEqual(taxonomy.extract("JavaScript only"), [])
+        self.assertEqual(taxonomy.extract("go to market, golang and Go"), ["Go"])
+        self.assertEqual(taxonomy.extract("let's go"), [])
+
+    def test_gap_uses_github_languages_and_topics(self):
+        scraped = {"languages": ["Go"], "topics": ["infrastructure-as-code", "terraform"]}
+
+        gap = skill_gap(CV_TEXT, JOB_DESCRIPTION, github_skill_text(scraped))
+
+        self.assertEqual(gap["missing"], [])
+        self.assertIn("Terraform", skill_gap(CV_TEXT, JOB_DESCRIPTION)["missing"])
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GEMINI_API_KEY="")
+class SkillGapStageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
+    def test_gap_is_stored_and_leads_missing_keywords(self):
+        owner = User.objects.create_user(username="skillgap", password="StrongPass123")
+        stored = storage_service.save_temp_text(CV_TEXT)
+        self.addCleanup(storage_service.delete, stored.key)
+        job = AnalyzeJob.objects.create(owner=owner, source_input="cv.txt", source_file_key=stored.key)
+
+        process_analyze_job.apply(args=(str(job.id), AnalyzeJob.SourceType.CV, "", JOB_DESCRIPTION))
+
+        result = load_analysis_result(job)
+        self.assertEqual(result["skill_gap"]["missing"], ["Terraform", "Go"])
+        self.assertEqual(result["missing_keywords"][:2], ["Terraform", "Go"])
+        self.assertLessEqual(len(result["missing_keywords"]), 12)
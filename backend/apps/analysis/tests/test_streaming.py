@@ -0,0 +1,142 @@
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from apps.analysis.gemini_client import GeminiClient
+from apps.analysis.models import AnalyzeJob
+from apps.analysis.results import store_analysis_result
+from apps.analysis.streaming import AnalyzeEventStream, PartialJSONObjectParser, publish_event
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+STREAMED_CHUNKS = [
+    '```json\n{"ats_score": 8',
+    '4, "strengths": ["Led {migrations}", "Wrote \\"fast\\" code"',
+    '], "overall_summary": "Strong backend',
+    ' engineer"}\n```',
+]
+
+
+def _sse_events(body: bytes):
+    events = []
+    for frame in body.decode("utf-8").split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines() if not line.startswith(":"))
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class PartialJSONObjectParserTests(SimpleTestCase):
+    def test_fields_are_emitted_as_soon_as_they_close(self):
+        parser = PartialJSONObjectParser()
+        emitted = [parser.feed(chunk) for chunk in STREAMED_CHUNKS]
+
+        self.assertEqual(emitted[0], {})
+        self.assertEqual(emitted[1], {"ats_score": 84})
+        self.assertEqual(emitted[2], {"strengths": ["Led {migrations}", 'Wrote "fast" code']})
+        self.assertEqual(emitted[3], {"overall_summary": "Strong backend engineer"})
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GEMINI_API_KEY="test-key", GEMINI_STREAMING_ENABLED=True)
+class GeminiStreamingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_partial_fields_are_reported_before_the_final_result(self):
+        model = mock.Mock()
+        model.generate_content.return_value = [SimpleNamespace(text=chunk) for chunk in STREAMED_CHUNKS]
+        partials = []
+
+        client = GeminiClient()
+        with mock.patch.object(GeminiClient, "get_model", return_value=model):
+            result = client.analyze_resume("Python engineer", cache_owner_id=1, on_partial=partials.append)
+
+        model.generate_content.assert_called_once_with(mock.ANY, stream=True)
+        self.assertEqual(partials[0], {"ats_score": 84})
+        self.assertEqual(len(partials), 3)
+        self.assertEqual(result["ats_score"], 84)
+        self.assertEqual(result["overall_summary"], "Strong backend engineer")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnalyzeStreamViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="streamer", password="StrongPass123")
+        self.client.force_authenticate(self.user)
+
+    def test_completed_job_streams_final_result_without_redis(self):
+        job = AnalyzeJob.objects.create(owner=self.user, source_input="cv.txt", status=AnalyzeJob.Status.COMPLETED)
+        store_analysis_result(job, {"ats_score": 77})
+
+        res = self.client.get(f"/api/analyze/{job.id}/stream", HTTP_ACCEPT="text/event-stream")
+
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        events = _sse_events(b"".join(res.streaming_content))
+        self.assertEqual([name for name, _ in events], ["completed"])
+        self.assertEqual(events[0][1]["result"], {"ats_score": 77})
+
+    def test_pending_job_under_wsgi_gets_snapshot_then_poll_without_waiting(self):
+        job = AnalyzeJob.objects.create(owner=self.user, source_input="cv.txt")
+        redis_client = mock.Mock()
+        with mock.patch("apps.analysis.streaming.get_redis_client", return_value=redis_client):
+            publish_event(job.id, "partial", {"ats_score": 84})
+            res = self.client.get(f"/api/analyze/{job.id}/stream")
+            events = _sse_events(b"".join(res.streaming_content))
+
+        redis_client.pubsub.assert_not_called()
+        self.assertEqual([name for name, _ in events], ["partial", "poll"])
+        self.assertEqual(events[0][1], {"ats_score": 84})
+        self.assertEqual(events[1][1]["status_url"], f"/api/analyze/{job.id}")
+
+    def test_pending_job_relays_snapshot_then_channel_until_completion(self):
+        job = AnalyzeJob.objects.create(owner=self.user, source_input="cv.txt")
+        with mock.patch("apps.analysis.streaming.get_redis_client", return_value=mock.Mock()):
+            publish_event(job.id, "partial", {"ats_score": 84})
+
+        def complete_job():
+            AnalyzeJob.objects.filter(id=job.id).update(status=AnalyzeJob.Status.COMPLETED)
+            store_analysis_result(job, {"ats_score": 84, "strengths": ["APIs"]})
+
+        messages = iter([{"type": "message", "data": json.dumps({"event": "partial", "fields": {"strengths": ["APIs"]}})}])
+
+        async def get_message(timeout):
+            message = next(messages, None)
+            if message is None:
+                await sync_to_async(complete_job)()
+                message = {"type": "message", "data": json.dumps({"event": "completed", "fields": {}})}
+            return message
+
+        redis_client = mock.Mock(aclose=mock.AsyncMock())
+        pubsub = redis_client.pubsub.return_value = mock.AsyncMock()
+        pubsub.get_message.side_effect = get_message
+
+        async def collect():
+            return [frame async for frame in AnalyzeEventStream(job.id).aiter_frames()]
+
+        with mock.patch("redis.asyncio.from_url", return_value=redis_client):
+            events = _sse_events(b"".join(async_to_sync(collect)()))
+
+        pubsub.subscribe.assert_awaited_once()
+        self.assertEqual(
+            events,
+            [
+                ("partial", {"ats_score": 84}),
+                ("partial", {"strengths": ["APIs"]}),
+                ("completed", mock.ANY),
+            ],
+        )
+        self.assertEqual(events[-1][1]["result"]["strengths"], ["APIs"])
+
+    def test_other_users_jobs_are_not_streamed(self):
+        other = User.objects.create_user(username="other", password="StrongPass123")
+        job = AnalyzeJob.objects.create(owner=other, source_input="cv.txt")
+
+        res = self.client.get(f"/api/analyze/{job.id}/stream", HTTP_ACCEPT="text/event-stream")
+
+        self.assertEqual(res.status_code, 404)
@@ -0,0 +1,369 @@
+import io
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.analysis.gemini_client import gemini_client
+from apps.analysis.github_rate_limit import GitHubRateLimited
+from apps.analysis.llm_governor import LLMRateLimited
+from apps.analysis.models import AnalyzeBatch, AnalyzeJob, AnalyzeUsage
+from apps.analysis.pipeline import bill_job_once
+from apps.analysis.prompt_budget import budget_source_text
+from apps.analysis.results import load_analysis_result, store_analysis_result
+from apps.analysis.queues import _record_queue_wait, _stamp_enqueued_at
+from apps.analysis.tasks import (
+    analyze_job_signature,
+    dispatch_analyze_batch,
+    enqueue_analyze_job,
+    process_analyze_job,
+    reap_stale_analyze_jobs,
+)
+from apps.analysis.tests.test_parser import build_docx
+from apps.billing.models import Subscription
+from config.celery import app as celery_app
+from core.storage import S3StorageService, storage_service
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class InMemoryS3Client:
+    """The slice of the boto3 S3 client that S3StorageService uses."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[Key] = Body
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def download_file(self, Bucket, Key, Filename):
+        Path(Filename).write_bytes(self.objects[Key])
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GEMINI_API_KEY="")
+class ProcessAnalyzeJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.owner = User.objects.create_user(username="worker", password="StrongPass123")
+
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
+    def _stored_upload(self, name: str, content: bytes):
+        return storage_service.save_temp_upload(SimpleUploadedFile(name, content))
+
+    def test_cv_text_is_read_from_storage_and_blob_released(self):
+        stored = storage_service.save_temp_text("Senior Python engineer with Django and Celery.")
+        job = AnalyzeJob.objects.create(owner=self.owner, source_input="cv.txt", source_file_key=stored.key)
+
+        process_analyze_job.apply(args=(str(job.id), AnalyzeJob.SourceType.CV, "", "Backend role"))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalyzeJob.Status.COMPLETED)
+        self.assertFalse(Path(stored.path).exists())
+        self.assertEqual(load_analysis_result(job)["source_meta"]["input"], "cv.txt")
+        self.assertIsNotNone(job.heartbeat_at)
+
+    def test_source_is_budgeted_once_per_job(self):
+        stored = storage_service.save_temp_text("Senior Python engineer with Django and Celery.")
+        job = AnalyzeJob.objects.create(owner=self.owner, source_input="cv.txt", source_file_key=stored.key)
+
+        with mock.patch("apps.analysis.pipeline.budget_source_text", wraps=budget_source_text) as budget, mock.patch(
+            "apps.analysis.gemini_client.budget_source_text", wraps=budget_source_text
+        ) as client_budget:
+            process_analyze_job.apply(args=(str(job.id), AnalyzeJob.SourceType.CV, "", "Backend role"))
+
+        self.assertEqual(budget.call_count, 1)
+        client_budget.assert_not_called()
+
+    def test_extraction_stage_runs_before_analysis(self):
+        stored = self._stored_upload("cv.docx", build_docx(["Platform engineer", "Kubernetes, Terraform"]))
+        job = AnalyzeJob.objects.create(owner=self.owner, source_input="cv.docx", source_file_key=stored.key)
+
+        enqueue_analyze_job(job, "", "")
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalyzeJob.Status.COMPLETED)
+        self.assertFalse(Path(stored.path).exists())
+        self.assertFalse(storage_service.path_for(job.source_file_key).exists())
+
+    @override_settings(STORAGE_S3_BUCKET="cv-analyzer")
+    def test_cv_job_runs_on_s3_storage(self):
+        # Web and worker without a shared disk: every blob goes through the bucket.
+        client = InMemoryS3Client()
+        s3_storage = S3StorageService(client=client)
+        stored = s3_storage.save_temp_upload(SimpleUploadedFile("cv.docx", build_docx(["Platform engineer"])))
+        job = AnalyzeJob.objects.create(owner=self.owner, source_input="cv.docx", source_file_key=stored.key)
+
+        with mock.patch("apps.analysis.tasks.storage_service", s3_storage), mock.patch(
+            "apps.analysis.pipeline.storage_service", s3_storage
+        ):
+            enqueue_analyze_job(job, "", "")
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalyzeJob.Status.COMPLETED)
+        self.assertEqual(client.objects, {})
+
+    def test_unreadable_document_fails_without_analysis(self):
+        stored = self._stored_upload("cv.docx", b"not a zip archive")
+        job = AnalyzeJob.objects.create(owner=self.owner, source_input="cv.docx", source_file_key=stored.key)
+
+        enqueue_analyze_job(job, "", "")
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalyzeJob.Status.FAILED)
+        self.assertEqual(job.error_message, "Could not read DOCX document.")
+        self.assertFalse(Path(stored.path).exists())
+
+    def test_extraction_crash_fails_job_and_releases_upload(self):
+        for error in (MemoryError(), OSError("disk gone")):
+            with self.subTest(error=type(error).__name__):
+                stored = self._stored_upload("cv.pdf", b"%PDF-1.7")
+                job = AnalyzeJob.objects.create(owner=self.owner, source_input="cv.pdf", source_file_key=stored.key)
+                with mock.patch("apps.analysis.tasks.extract_text_from_file", side_effect=error) as extract:
+                    enqueue_analyze_job(job, "", "")
+
+                job.refresh_from_db()
+                self.assertEqual(job.status, AnalyzeJob.Status.FAILED)
+                self.assertEqual(job.error_message, "Could not read the uploaded document.")
+                self.assertFalse(Path(stored.path).exists())
+                # OSError is retried first; the job only fails once the retries are used up.
+                self.assertEqual(extract.call_count, 1 if isinstance(error, MemoryError) else 4)
+
+    def test_rate_limited_job_is_requeued_without_failing(self):
+        stored = storage_service.save_temp_text("Senior Python engineer.")
+        job = AnalyzeJob.objects.create(owner=self.owner, source_input="cv.txt", source_file_key=stored.key)
+
+        with mock.patch(
+            "apps.analysis.tasks.gemini_client.analyze_resume", side_effect=LLMRateLimited(retry_after=7)
+        ), mock.patch.object(process_analyze_job, "apply_async") as requeue:
+            process_analyze_job.apply(args=(str(job.id), AnalyzeJob.SourceType.CV, "", ""))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalyzeJob.Status.PENDING)
+        self.assertEqual(requeue.call_args.kwargs["countdown"], 7)
+        self.assertTrue(Path(stored.path).exists())
+
+    def test_github_job_out_of_rate_limit_waits_for_reset(self):
+        job = AnalyzeJob.objects.create(
+            owner=self.owner, source_type=AnalyzeJob.SourceType.GITHUB, source_input="https://github.com/octo"
+        )
+
+        with mock.patch(
+            "apps.analysis.pipeline.github_scraper.scrape", side_effect=GitHubRateLimited(retry_after=1200)
+        ), mock.patch.object(process_analyze_job, "apply_async") as requeue:
+            process_analyze_job.apply(args=(str(job.id), AnalyzeJob.SourceType.GITHUB, "https://github.com/octo", ""))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalyzeJob.Status.PENDING)
+        self.assertEqual(requeue.call_args.kwargs["countdown"], 1200)
+
+    def test_repeat_github_source_is_served_from_the_source_cache(self):
+        scraped = {"source_type": "github_repo", "input": "", "full_name": "octo/tool", "languages": ["Go"]}
+        urls = ["https://github.com/octo/tool", "https://github.com/Octo/Tool.git/"]
+        jobs = [
+            AnalyzeJob.objects.create(owner=self.owner, source_type=AnalyzeJob.SourceType.GITHUB, source_input=url)
+            for url in urls
+        ]
+
+        with mock.patch("apps.analysis.pipeline.github_scraper.scrape", return_value=scraped) as scrape, mock.patch(
+            "apps.analysis.github_source_cache.get_redis_client"
+        ), mock.patch("apps.analysis.pipeline.budget_source_text", wraps=budget_source_text) as budget:
+            for job, url in zip(jobs, urls):
+                process_analyze_job.apply(args=(str(job.id), AnalyzeJob.SourceType.GITHUB, url, ""))
+
+        self.assertEqual(scrape.call_count, 1)
+        for job in jobs:
+            job.refresh_from_db()
+            self.assertEqual(job.status, AnalyzeJob.Status.COMPLETED)
+        self.assertEqual(jobs[1].checkpoint["github_source_cache"], "hit")
+        self.assertEqual(load_analysis_result(jobs[1])["source_meta"]["scraped"]["input"], urls[1])
+        # The prompt source names this job's URL, not the one the cached scrape was made for.
+        self.assertIn(f"Input: {urls[1]}", budget.call_args_list[1].args[0])
+
+    def test_retry_resumes_at_failed_stage_and_bills_once(self):
+        stored = storage_service.save_temp_text("Senior Python engineer.")
+        job = AnalyzeJob.objects.create(owner=self.owner, source_input="cv.txt", source_file_key=stored.key)
+        store_calls = []
+
+        def flaky_store(job_obj, result):
+            store_calls.append(result)
+            if len(store_calls) == 1:
+                raise RuntimeError("database hiccup")
+            return store_analysis_result(job_obj, result)
+
+        with mock.patch("apps.analysis.pipeline.store_analysis_result", side_effect=flaky_store), mock.patch.object(
+            gemini_client, "analyze_resume", wraps=gemini_client.analyze_resume
+        ) as analyze:
+            process_analyze_job.apply(args=(str(job.id), AnalyzeJob.SourceType.CV, "", ""))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalyzeJob.Status.COMPLETED)
+        self.assertEqual(job.stage, "persist")
+        self.assertEqual(analyze.call_count, 1)
+        self.assertEqual(len(store_calls), 2)
+        self.assertEqual(AnalyzeUsage.objects.filter(owner=self.owner).count(), 1)
+        self.assertEqual(Subscription.objects.get(owner=self.owner).monthly_analysis_used, 1)
+
+    def test_io_profile_releases_db_connection_before_llm_stage(self):
+        stored = storage_service.save_temp_text("Senior Python engineer.")
+        job = AnalyzeJob.objects.create(owner=self.owner, source_input="cv.txt", source_file_key=stored.key)
+
+        # The test transaction must survive, so the close itself is only observed.
+        with override_settings(ANALYZE_RELEASE_DB_DURING_IO=True), mock.patch(
+            "apps.analysis.pipeline.connection.close"
+        ) as close:
+            process_analyze_job.apply(args=(str(job.id), AnalyzeJob.SourceType.CV, "", ""))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalyzeJob.Status.COMPLETED)
+        # CV sources are already in storage; only the Gemini call waits on the network.
+        self.assertEqual(close.call_count, 1)
+
+    def test_billing_is_idempotent(self):
+        job = AnalyzeJob.objects.create(owner=self.owner)
+        self.assertTrue(bill_job_once(job))
+        self.assertFalse(bill_job_once(job))
+        self.assertEqual(AnalyzeUsage.objects.filter(owner=self.owner).count(), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, ANALYZE_STALE_AFTER_SECONDS=300, ANALYZE_REAP_MAX_REQUEUES=1)
+class StaleJobReaperTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username="reaped", password="StrongPass123")
+
+    def _processing_job(self, heartbeat_age: int, **fields):
+        job = AnalyzeJob.objects.create(
+            owner=self.owner,
+            status=AnalyzeJob.Status.PROCESSING,
+            stage="prompt",
+            checkpoint={"task_inputs": {"source_payload": "", "job_description": "Backend role"}},
+            **fields,
+        )
+        past = timezone.now() - timedelta(seconds=heartbeat_age)
+        AnalyzeJob.objects.filter(id=job.id).update(created_at=past - timedelta(minutes=1), heartbeat_at=past)
+        return job
+
+    def test_stale_job_is_requeued_once_then_failed(self):
+        stale = self._processing_job(heartbeat_age=600)
+        live = self._processing_job(heartbeat_age=30)
+
+        with mock.patch.object(process_analyze_job, "apply_async") as requeue:
+            self.assertEqual(reap_stale_analyze_jobs(), {"requeued": 1, "failed": 0})
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, AnalyzeJob.Status.PENDING)
+        self.assertEqual(stale.reap_count, 1)
+        self.assertEqual(requeue.call_args.kwargs["args"], (str(stale.id), "cv", "", "Backend role"))
+        self.assertEqual(requeue.call_args.kwargs["queue"], "analysis.free")
+        live.refresh_from_db()
+        self.assertEqual(live.status, AnalyzeJob.Status.PROCESSING)
+
+        # The re-run died as well: the job is failed instead of looping forever.
+        AnalyzeJob.objects.filter(id=stale.id).update(
+            status=AnalyzeJob.Status.PROCESSING, heartbeat_at=timezone.now() - timedelta(seconds=600)
+        )
+        with mock.patch.object(process_analyze_job, "apply_async") as requeue:
+            self.assertEqual(reap_stale_analyze_jobs(), {"requeued": 0, "failed": 1})
+
+        requeue.assert_not_called()
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, AnalyzeJob.Status.FAILED)
+        self.assertEqual(stale.error_message, "Analysis timed out.")
+
+    @override_settings(ANALYZE_PENDING_STALE_AFTER_SECONDS=3600)
+    def test_abandoned_pending_job_is_failed_and_upload_released(self):
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        with override_settings(MEDIA_ROOT=media_dir.name):
+            stored = storage_service.save_temp_upload(SimpleUploadedFile("cv.pdf", b"%PDF-1.7"))
+            abandoned = AnalyzeJob.objects.create(owner=self.owner, source_file_key=stored.key)
+            queued = AnalyzeJob.objects.create(owner=self.owner)
+            deferred = AnalyzeJob.objects.create(owner=self.owner, checkpoint={"task_inputs": {}})
+            # Extracted a few minutes ago and still waiting on a backed-up analysis queue.
+            extracted = AnalyzeJob.objects.create(
+                owner=self.owner, heartbeat_at=timezone.now() - timedelta(minutes=5)
+            )
+            AnalyzeJob.objects.filter(id__in=(abandoned.id, deferred.id, extracted.id)).update(
+                created_at=timezone.now() - timedelta(hours=2)
+            )
+
+            self.assertEqual(reap_stale_analyze_jobs(), {"requeued": 0, "failed": 1})
+
+            self.assertFalse(Path(stored.path).exists())
+        abandoned.refresh_from_db()
+        self.assertEqual(abandoned.status, AnalyzeJob.Status.FAILED)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, AnalyzeJob.Status.PENDING)
+        deferred.refresh_from_db()
+        self.assertEqual(deferred.status, AnalyzeJob.Status.PENDING)
+        extracted.refresh_from_db()
+        self.assertEqual(extracted.status, AnalyzeJob.Status.PENDING)
+
+    @override_settings(ANALYZE_PENDING_STALE_AFTER_SECONDS=3600, GEMINI_RATE_LIMIT_RPM=1)
+    def test_staggered_batch_job_is_not_reaped_before_its_start(self):
+        batch = AnalyzeBatch.objects.create(owner=self.owner, status=AnalyzeBatch.Status.PROCESSING)
+        jobs = AnalyzeJob.objects.bulk_create(
+            [AnalyzeJob(owner=self.owner, batch=batch, source_file_key=f"uploads/{index}.pdf") for index in range(62)]
+        )
+        with mock.patch("apps.analysis.tasks.group"):
+            dispatch_analyze_batch(batch, jobs)
+        AnalyzeJob.objects.filter(batch=batch).update(created_at=timezone.now() - timedelta(hours=2))
+
+        last = AnalyzeJob.objects.get(id=jobs[-1].id)
+        self.assertGreater(last.heartbeat_at, timezone.now() + timedelta(hours=1))
+        self.assertEqual(reap_stale_analyze_jobs(), {"requeued": 0, "failed": 0})
+        self.assertEqual(AnalyzeJob.objects.filter(status=AnalyzeJob.Status.PENDING).count(), 62)
+
+
+class PlanRoutingTests(TestCase):
+    def test_analysis_stage_is_routed_by_owner_plan(self):
+        pro = User.objects.create_user(username="pro-owner", password="StrongPass123")
+        Subscription.objects.filter(owner=pro).update(plan=Subscription.Plan.PRO)
+        free = User.objects.create_user(username="free-owner", password="StrongPass123")
+
+        pro_job = AnalyzeJob.objects.create(owner=pro, source_type=AnalyzeJob.SourceType.GITHUB)
+        free_job = AnalyzeJob.objects.create(owner=free, source_input="cv.pdf", source_file_key="uploads/cv.pdf")
+
+        self.assertEqual(analyze_job_signature(pro_job).options["queue"], "analysis.pro")
+        # CV jobs chain extraction (its own queue) into the plan-routed analysis task.
+        extract, analyze = analyze_job_signature(free_job).tasks
+        self.assertNotIn("queue", extract.options)
+        self.assertEqual(analyze.options["queue"], "analysis.free")
+
+    def test_queue_wait_is_sampled_per_queue(self):
+        headers = {}
+        _stamp_enqueued_at(sender="apps.analysis.tasks.process_analyze_job", headers=headers)
+        task = mock.Mock()
+        task.name = "apps.analysis.tasks.process_analyze_job"
+        task.request.enqueued_at = headers["enqueued_at"] - 2
+        task.request.eta = None
+        task.request.delivery_info = {"routing_key": "analysis.pro"}
+        pipe = mock.Mock()
+
+        with mock.patch("apps.analysis.queues.get_redis_client") as client:
+            client.return_value.pipeline.return_value = pipe
+            _record_queue_wait(task=task)
+
+        key, wait_ms = pipe.lpush.call_args.args
+        self.assertEqual(key, "cv_analyzer:queue_wait:analysis.pro")
+        self.assertGreaterEqual(wait_ms, 2000)
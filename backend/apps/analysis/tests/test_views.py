@@ -0,0 +1,109 @@
+import hashlib
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.analysis.models import AnalyzeJob
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnalyzeCreateViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        enqueue = mock.patch("apps.analysis.views.enqueue_analyze_job")
+        self.enqueue = enqueue.start()
+        self.addCleanup(enqueue.stop)
+
+        self.user = User.objects.create_user(username="uploader", password="StrongPass123")
+        self.client.force_authenticate(self.user)
+
+    def test_upload_is_hashed_while_streaming(self):
+        content = b"Senior Python engineer"
+        res = self.client.post(
+            "/api/analyze",
+            {"source_type": "cv", "file": SimpleUploadedFile("cv.txt", content)},
+            format="multipart",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        job = AnalyzeJob.objects.get(id=res.data["job_id"])
+        self.assertEqual(job.content_hash, hashlib.sha256(content).hexdigest())
+        self.enqueue.assert_called_once()
+
+    @override_settings(MAX_UPLOAD_SIZE_MB=1)
+    def test_oversized_upload_is_rejected_while_streaming(self):
+        content = b"x" * (2 * 1024 * 1024)
+        res = self.client.post(
+            "/api/analyze",
+            {"source_type": "cv", "file": SimpleUploadedFile("cv.txt", content)},
+            format="multipart",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["detail"], "File too large.")
+        self.assertFalse(AnalyzeJob.objects.exists())
+        self.enqueue.assert_not_called()
+
+    def post_cv(self, content=b"Senior Python engineer", job_description="Backend engineer"):
+        return self.client.post(
+            "/api/analyze",
+            {"source_type": "cv", "file": SimpleUploadedFile("cv.txt", content), "job_description": job_description},
+            format="multipart",
+        )
+
+    def test_identical_submission_joins_the_job_in_flight(self):
+        first = self.post_cv()
+        second = self.post_cv(job_description="  Backend   engineer ")
+
+        self.assertEqual(second.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(second.data["job_id"], first.data["job_id"])
+        self.assertTrue(second.data["coalesced"])
+        self.assertEqual(AnalyzeJob.objects.count(), 1)
+        self.enqueue.assert_called_once()
+
+    def test_different_job_description_or_finished_leader_runs_again(self):
+        first = self.post_cv()
+        other_jd = self.post_cv(job_description="Data engineer")
+        AnalyzeJob.objects.filter(id=first.data["job_id"]).update(status=AnalyzeJob.Status.COMPLETED)
+        rerun = self.post_cv()
+
+        self.assertNotEqual(other_jd.data["job_id"], first.data["job_id"])
+        self.assertNotEqual(rerun.data["job_id"], first.data["job_id"])
+        self.assertNotIn("coalesced", rerun.data)
+        self.assertEqual(self.enqueue.call_count, 3)
+
+    def test_retry_with_idempotency_key_replays_the_first_response(self):
+        def post(content):
+            return self.client.post(
+                "/api/analyze",
+                {"source_type": "cv", "file": SimpleUploadedFile("cv.txt", content), "job_description": "Backend"},
+                format="multipart",
+                HTTP_IDEMPOTENCY_KEY="retry-1",
+            )
+
+        first = post(b"Senior Python engineer")
+        cache.clear()  # the replay must also work from the database copy
+        retry = post(b"Senior Python engineer")
+        reused = post(b"Junior Go engineer")
+
+        self.assertEqual(retry.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        # The same key with a different upload is a client bug, not a retry.
+        self.assertEqual(reused.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(AnalyzeJob.objects.count(), 1)
+        self.enqueue.assert_called_once()
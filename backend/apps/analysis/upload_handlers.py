@@ -0,0 +1,49 @@
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+
+class LimitedUploadHandler(FileUploadHandler):
+    """Counts upload bytes as they stream in and aborts once MAX_UPLOAD_SIZE_MB is exceeded.
+
+    Installed ahead of Django's default handlers, it passes every chunk through
+    unchanged and optionally hashes the file content on the fly so the digest is
+    available without re-reading the upload.
+    """
+
+    def __init__(self, request=None, max_bytes=None, hash_content=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes or settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+        if hash_content is None:
+            hash_content = settings.UPLOAD_CONTENT_HASH_ENABLED
+        self.hash_content = hash_content
+        self.received_bytes = 0
+        self.exceeded = False
+        self.content_hash = ""
+        self._hasher = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # A declared body that can never fit is rejected on the first file chunk.
+        if content_length and content_length > self.max_bytes + self.chunk_size:
+            self.exceeded = True
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._hasher = hashlib.sha256() if self.hash_content else None
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received_bytes += len(raw_data)
+        if self.exceeded or self.received_bytes > self.max_bytes:
+            self.exceeded = True
+            # connection_reset skips draining the rest of the request body.
+            raise StopUpload(connection_reset=True)
+        if self._hasher is not None:
+            self._hasher.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self._hasher is not None:
+            self.content_hash = self._hasher.hexdigest()
+        # Returning None lets the next handler build the UploadedFile.
+        return None
@@ -1,8 +1,17 @@
 ﻿from django.urls import path
 
-from apps.analysis.views import AnalyzeCreateView, AnalyzeStatusView
+from apps.analysis.views import (
+    AnalyzeBatchCreateView,
+    AnalyzeBatchStatusView,
+    AnalyzeCreateView,
+    AnalyzeStatusView,
+    AnalyzeStreamView,
+)
 
 urlpatterns = [
     path("", AnalyzeCreateView.as_view(), name="analyze-create"),
     path("<uuid:job_id>", AnalyzeStatusView.as_view(), name="analyze-status"),
+    path("<uuid:job_id>/stream", AnalyzeStreamView.as_view(), name="analyze-stream"),
+    path("batch", AnalyzeBatchCreateView.as_view(), name="analyze-batch-create"),
+    path("batch/<uuid:batch_id>", AnalyzeBatchStatusView.as_view(), name="analyze-batch-status"),
 ]
@@ -1,61 +1,107 @@
-﻿from django.conf import settings
+﻿import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from rest_framework import permissions, status
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.analysis.models import AnalyzeJob
-from apps.analysis.parser import extract_text_from_upload
-from apps.analysis.serializers import AnalyzeCreateSerializer, AnalyzeJobStatusSerializer
-from apps.analysis.tasks import process_analyze_job
+from apps.accounts.idempotency import idempotent
+from apps.analysis.batches import BatchArchiveError, batch_progress, list_archive_members
+from apps.analysis.coalescing import analyze_coalescer
+from apps.analysis.models import AnalyzeBatch, AnalyzeJob
+from apps.analysis.results import load_analysis_result
+from apps.analysis.serializers import (
+    AnalyzeBatchCreateSerializer,
+    AnalyzeBatchStatusSerializer,
+    AnalyzeCreateSerializer,
+    AnalyzeJobStatusSerializer,
+)
+from apps.analysis.streaming import AnalyzeEventStream
+from apps.analysis.tasks import dispatch_analyze_batch, enqueue_analyze_job, expand_analyze_batch
+from apps.analysis.upload_handlers import LimitedUploadHandler
 from apps.billing.models import Subscription
-from core.cache_utils import build_cache_key, get_json_cache
+from core.storage import storage_service
 
 
 class AnalyzeCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Must run before request.data is touched (@idempotent parses it first) so the handler
+        # sees the body as it streams in.
+        self.upload_handler = LimitedUploadHandler(request)
+        request.upload_handlers.insert(0, self.upload_handler)
+
+    @idempotent
     def post(self, request):
-        serializer = AnalyzeCreateSerializer(data=request.data)
+        upload_handler = self.upload_handler
+        data = request.data
+        if upload_handler.exceeded:
+            return Response({"detail": "File too large."}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = AnalyzeCreateSerializer(data=data)
         serializer.is_valid(raise_exception=True)
 
         source_type = serializer.validated_data.get("source_type", AnalyzeJob.SourceType.CV)
-        subscription, _ = Subscription.objects.get_or_create(owner=request.user)
-        if not subscription.can_run_analysis():
-            return Response({"detail": "Plan limit reached."}, status=status.HTTP_402_PAYMENT_REQUIRED)
-
+        job_description = serializer.validated_data.get("job_description", "")
+        upload = None
         source_payload = ""
-        source_input = ""
-        source_file_key = ""
 
         if source_type == AnalyzeJob.SourceType.CV:
             upload = serializer.validated_data["file"]
             max_size = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
             if upload.size > max_size:
                 return Response({"detail": "File too large."}, status=status.HTTP_400_BAD_REQUEST)
+            source_identity = upload_handler.content_hash
+        else:
+            source_payload = serializer.validated_data["github_url"].strip()
+            source_identity = source_payload.rstrip("/").lower()
+
+        # Double clicks and client retries join the identical job already in flight.
+        coalesce_key = ""
+        if settings.ANALYZE_COALESCE_ENABLED and source_identity:
+            coalesce_key = analyze_coalescer.key(request.user.id, source_type, source_identity, job_description)
+            leader = analyze_coalescer.find_leader(coalesce_key, request.user)
+            if leader is not None:
+                return self._coalesced(leader)
+
+        subscription, _ = Subscription.objects.get_or_create(owner=request.user)
+        if not subscription.can_run_analysis():
+            return Response({"detail": "Plan limit reached."}, status=status.HTTP_402_PAYMENT_REQUIRED)
 
-            source_payload = extract_text_from_upload(upload)
-            source_input = upload.name
+        if upload is not None:
+            # Only persist the bytes here; extraction runs in the worker so request latency is size-independent.
+            job = AnalyzeJob(
+                owner=request.user,
+                source_type=source_type,
+                source_input=upload.name,
+                source_file_key=storage_service.save_temp_upload(upload).key,
+                content_hash=upload_handler.content_hash,
+            )
         else:
-            github_url = serializer.validated_data["github_url"].strip()
-            source_payload = github_url
-            source_input = github_url
+            job = AnalyzeJob(owner=request.user, source_type=source_type, source_input=source_payload)
+        job.save()
 
-        job = AnalyzeJob.objects.create(
-            owner=request.user,
-            source_type=source_type,
-            source_input=source_input,
-            source_file_key=source_file_key,
-        )
+        if coalesce_key:
+            leader = analyze_coalescer.claim(coalesce_key, job)
+            if leader is not None:
+                # An identical request claimed the key between our lookup and insert.
+                storage_service.delete(job.source_file_key)
+                job.delete()
+                return self._coalesced(leader)
 
-        process_analyze_job.delay(
-            str(job.id),
-            source_type,
-            source_payload,
-            serializer.validated_data.get("job_description", ""),
-        )
+        enqueue_analyze_job(job, source_payload, job_description)
 
         return Response({"job_id": str(job.id)}, status=status.HTTP_202_ACCEPTED)
 
+    def _coalesced(self, leader: AnalyzeJob) -> Response:
+        analyze_coalescer.record_hit()
+        return Response({"job_id": str(leader.id), "coalesced": True}, status=status.HTTP_202_ACCEPTED)
+
 
 class AnalyzeStatusView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -67,7 +113,113 @@ class AnalyzeStatusView(APIView):
 
         data = AnalyzeJobStatusSerializer(job).data
         if job.status == AnalyzeJob.Status.COMPLETED:
-            cache_key = build_cache_key("analyze_result", str(job.id))
-            data["result"] = get_json_cache(cache_key)
+            data["result"] = load_analysis_result(job)
 
         return Response(data)
+
+
+class AnalyzeBatchCreateView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        upload_handler = LimitedUploadHandler(
+            request,
+            max_bytes=settings.ANALYZE_BATCH_MAX_UPLOAD_MB * 1024 * 1024,
+            hash_content=False,
+        )
+        request.upload_handlers.insert(0, upload_handler)
+
+        data = request.data
+        if upload_handler.exceeded:
+            return Response({"detail": "Upload too large."}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = AnalyzeBatchCreateSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        files = serializer.validated_data.get("files") or []
+        archive = serializer.validated_data.get("archive")
+
+        max_size = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+        if archive is not None:
+            try:
+                count = len(list_archive_members(archive))
+            except BatchArchiveError as exc:
+                return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            oversized = next((upload.name for upload in files if upload.size > max_size), None)
+            if oversized:
+                return Response({"detail": f"File too large: {oversized}"}, status=status.HTTP_400_BAD_REQUEST)
+            count = len(files)
+
+        subscription, _ = Subscription.objects.get_or_create(owner=request.user)
+        if not subscription.can_run_analysis(count):
+            return Response({"detail": "Plan limit reached."}, status=status.HTTP_402_PAYMENT_REQUIRED)
+
+        batch = AnalyzeBatch.objects.create(
+            owner=request.user,
+            job_description=serializer.validated_data["job_description"],
+            total=count,
+        )
+
+        if archive is not None:
+            # Members are unpacked by the worker; the request only stores the zip.
+            batch.archive_key = storage_service.save_temp_upload(archive).key
+            batch.save(update_fields=["archive_key", "updated_at"])
+            expand_analyze_batch.delay(str(batch.id))
+        else:
+            jobs = AnalyzeJob.objects.bulk_create(
+                [
+                    AnalyzeJob(
+                        owner=request.user,
+                        batch=batch,
+                        source_input=upload.name,
+                        source_file_key=storage_service.save_temp_upload(upload).key,
+                    )
+                    for upload in files
+                ]
+            )
+            batch.status = AnalyzeBatch.Status.PROCESSING
+            batch.save(update_fields=["status", "updated_at"])
+            dispatch_analyze_batch(batch, jobs)
+
+        return Response({"batch_id": str(batch.id), "total": count}, status=status.HTTP_202_ACCEPTED)
+
+
+class AnalyzeBatchStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, batch_id):
+        batch = AnalyzeBatch.objects.filter(id=batch_id, owner=request.user).first()
+        if not batch:
+            return Response({"detail": "Batch not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        data = AnalyzeBatchStatusSerializer(batch).data
+        data["progress"] = batch_progress(batch)
+        data["ranking"] = batch.ranking if batch.status == AnalyzeBatch.Status.COMPLETED else None
+        return Response(data)
+
+
+class EventStreamRenderer(BaseRenderer):
+    # Lets EventSource's "Accept: text/event-stream" pass content negotiation; errors still render as JSON.
+    media_type = "text/event-stream"
+    format = "sse"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode("utf-8")
+
+
+class AnalyzeStreamView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def get(self, request, job_id):
+        if not AnalyzeJob.objects.filter(id=job_id, owner=request.user).exists():
+            return Response({"detail": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        stream = AnalyzeEventStream(job_id)
+        # Under ASGI open streams only wait on the event loop. Under WSGI a waiting stream would hold
+        # a sync worker, so it answers with the current state and a poll event instead.
+        frames = stream.aiter_frames() if isinstance(request._request, ASGIRequest) else iter(stream)
+        response = StreamingHttpResponse(frames, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
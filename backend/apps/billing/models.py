@@ -14,11 +14,12 @@ class Subscription(models.Model):
     period_start = models.DateTimeField(default=timezone.now)
     monthly_analysis_used = models.PositiveIntegerField(default=0)
 
-    def can_run_analysis(self) -> bool:
+    def can_run_analysis(self, count: int = 1) -> bool:
         if self.plan == self.Plan.PRO:
             return True
-        return self.monthly_analysis_used < settings.FREE_PLAN_ANALYSIS_LIMIT
+        return self.monthly_analysis_used + count <= settings.FREE_PLAN_ANALYSIS_LIMIT
 
     def register_analysis(self) -> None:
-        self.monthly_analysis_used += 1
-        self.save(update_fields=["monthly_analysis_used"])
+        # F() keeps concurrent workers from losing each other's increments.
+        Subscription.objects.filter(pk=self.pk).update(monthly_analysis_used=models.F("monthly_analysis_used") + 1)
+        self.refresh_from_db(fields=["monthly_analysis_used"])
@@ -4,7 +4,17 @@ from rest_framework import permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.analysis.coalescing import analyze_coalescer
 from apps.analysis.models import AnalyzeJob
+from apps.analysis.gemini_client import gemini_client
+from apps.analysis.github_cache import github_response_cache
+from apps.analysis.github_rate_limit import github_token_pool
+from apps.analysis.github_source_cache import github_source_cache
+from apps.analysis.llm_governor import gemini_governor
+from apps.analysis.prompt_budget import prompt_budget_stats
+from apps.analysis.queues import queue_stats
+from apps.analysis.reaper import reaper_stats
+from apps.analysis.result_cache import analysis_cache
 from apps.billing.models import Subscription
 
 
@@ -29,5 +39,15 @@ class AdminMetricsView(APIView):
                 "completed_jobs": completed_jobs,
                 "revenue_estimate_usd": revenue,
                 "ai_cost_estimate_usd": ai_cost,
+                "analysis_cache": analysis_cache.stats(),
+                "gemini_governor": gemini_governor.stats(),
+                "gemini_hedging": gemini_client.hedge_stats(),
+                "prompt_budget": prompt_budget_stats.snapshot(),
+                "analyze_coalescing": analyze_coalescer.stats(),
+                "analysis_queues": queue_stats(),
+                "analyze_reaper": reaper_stats(),
+                "github_cache": github_response_cache.stats(),
+                "github_rate_limit": github_token_pool.stats(),
+                "github_source_cache": github_source_cache.stats(),
             }
         )
@@ -5,6 +5,7 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.accounts.idempotency import idempotent
 from apps.resumes.models import Resume, ResumeVersion
 from apps.resumes.pdf_export import build_export_filename, build_resume_pdf_bytes
 from apps.resumes.serializers import ResumeSerializer
@@ -18,6 +19,7 @@ class ResumeListCreateView(APIView):
         qs = Resume.objects.filter(owner=request.user).prefetch_related("versions")
         return Response(ResumeSerializer(qs, many=True).data)
 
+    @idempotent
     def post(self, request):
         serializer = ResumeSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -42,6 +44,7 @@ class ResumeDetailView(APIView):
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
         return Response(ResumeSerializer(resume).data)
 
+    @idempotent
     def patch(self, request, resume_id):
         resume = self.get_object(request.user, resume_id)
         if not resume:
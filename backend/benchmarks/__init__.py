@@ -0,0 +1 @@
+# Standalone benchmark scripts. Run from backend/: python -m benchmarks.<name>
@@ -0,0 +1,72 @@
+"""Per-call overhead of the Gemini client against a local stub server.
+
+"legacy" re-runs genai.configure() and builds a GenerativeModel on every call
+(the previous behaviour); "persistent" uses GeminiClient.get_model(), which
+configures once per process and reuses the model and its HTTP session.
+
+    python -m benchmarks.bench_gemini_client [--calls 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+from apps.analysis.gemini_client import GeminiClient  # noqa: E402
+from benchmarks.stubs import FakeGeminiServer  # noqa: E402
+
+
+def run_legacy(server_url: str, calls: int) -> float:
+    import google.generativeai as genai
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        genai.configure(api_key="bench", transport="rest", client_options={"api_endpoint": server_url})
+        model = genai.GenerativeModel(settings.GEMINI_MODEL)
+        model.generate_content("ping")
+    return time.perf_counter() - started
+
+
+def run_persistent(calls: int) -> float:
+    client = GeminiClient()
+    started = time.perf_counter()
+    for _ in range(calls):
+        client.get_model().generate_content("ping")
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    with FakeGeminiServer() as server:
+        settings.GEMINI_API_KEY = "bench"
+        settings.GEMINI_TRANSPORT = "rest"
+        settings.GEMINI_API_ENDPOINT = server.url
+
+        rows = []
+        for label, runner in (
+            ("legacy", lambda: run_legacy(server.url, args.calls)),
+            ("persistent", lambda: run_persistent(args.calls)),
+        ):
+            connections_before = server.connections
+            elapsed = runner()
+            rows.append((label, elapsed, server.connections - connections_before))
+
+    print(f"{'client':<11} {'calls':>6} {'total s':>8} {'ms/call':>8} {'tcp conns':>10}")
+    for label, elapsed, connections in rows:
+        print(f"{label:<11} {args.calls:>6} {elapsed:>8.2f} {elapsed / args.calls * 1000:>8.2f} {connections:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""GitHub scrape wall time: serial one-shot requests vs concurrent calls on a pooled session.
+
+"serial" issues the scraper's API calls one after another with a fresh
+requests.get() each (the previous behaviour); "concurrent" is
+GitHubScraper.scrape(), which runs them at once over a keep-alive session.
+The fake GitHub API adds a fixed delay to every call.
+
+    python -m benchmarks.bench_github_scraper [--scrapes 50] [--latency-ms 60]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+import requests  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from apps.analysis.github_scraper import GitHubScraper  # noqa: E402
+from benchmarks.stubs import FakeGitHubServer, fixed_latency  # noqa: E402
+
+
+class SerialScraper(GitHubScraper):
+    def _get(self, path: str, headers: dict):
+        return requests.get(f"{self.base_api}{path}", headers=headers, timeout=15)
+
+    def _fetch_concurrently(self, calls: dict, timings):
+        return {label: call() for label, call in calls.items()}
+
+
+def run(scraper: GitHubScraper, url: str, scrapes: int) -> list:
+    samples = []
+    for _ in range(scrapes):
+        started = time.perf_counter()
+        scraper.scrape(url)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scrapes", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=60)
+    args = parser.parse_args()
+
+    # Every scrape has to reach the fake API; the response cache would answer repeats itself.
+    settings.GITHUB_CACHE_ENABLED = False
+    rows = []
+    with FakeGitHubServer(latency=fixed_latency(args.latency_ms / 1000)) as server:
+        for label, scraper_class in (("serial", SerialScraper), ("concurrent", GitHubScraper)):
+            scraper = scraper_class()
+            scraper.base_api = server.url
+            for kind, url in (("repo", "https://github.com/bench/tool"), ("user", "https://github.com/bench")):
+                connections_before = server.connections
+                samples = run(scraper, url, args.scrapes)
+                rows.append((label, kind, samples, server.connections - connections_before))
+
+    print(f"{'scraper':<11} {'source':<6} {'p50 ms':>8} {'mean ms':>8} {'max ms':>8} {'tcp conns':>10}")
+    for label, kind, samples, connections in rows:
+        print(
+            f"{label:<11} {kind:<6} {statistics.median(samples):>8.1f} {statistics.fmean(samples):>8.1f} "
+            f"{max(samples):>8.1f} {connections:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
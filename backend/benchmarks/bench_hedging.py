@@ -0,0 +1,86 @@
+"""Tail latency of Gemini calls with and without hedging, against a fake LLM server.
+
+The stub samples each response delay from a log-normal distribution, so a
+few calls land far in the tail, the way real LLM APIs behave.
+
+    python -m benchmarks.bench_hedging [--calls 300] [--median-ms 60] [--sigma 0.9]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import override_settings  # noqa: E402
+
+from apps.analysis.gemini_client import GeminiClient  # noqa: E402
+from benchmarks.stubs import FakeGeminiServer, lognormal_latency  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(calls: int, concurrency: int, hedged: bool):
+    settings.GEMINI_HEDGE_ENABLED = hedged
+    client = GeminiClient()
+    # Prime the latency window so the hedge threshold reflects the distribution.
+    for _ in range(25):
+        client._generate("warm-up")
+
+    def one_call(_):
+        started = time.perf_counter()
+        result = client._generate("Analyze this CV.")
+        return time.perf_counter() - started, result["llm_meta"]["path"]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        rows = list(pool.map(one_call, range(calls)))
+    latencies = [row[0] for row in rows]
+    hedge_wins = sum(1 for row in rows if row[1] == "hedge")
+    return latencies, hedge_wins
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--median-ms", type=float, default=60)
+    parser.add_argument("--sigma", type=float, default=0.9)
+    parser.add_argument("--percentile", type=float, default=90)
+    args = parser.parse_args()
+
+    # Counters go to an in-process cache so the benchmark does not need Redis.
+    override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}).enable()
+    settings.GEMINI_HEDGE_PERCENTILE = args.percentile
+    settings.GEMINI_HEDGE_MIN_DELAY_SECONDS = 0.0
+
+    print(f"{'mode':<9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'upstream req':>13} {'hedge wins':>11}")
+    for hedged in (False, True):
+        with FakeGeminiServer(latency=lognormal_latency(args.median_ms / 1000, args.sigma, seed=7)) as server:
+            settings.GEMINI_API_KEY = "bench"
+            settings.GEMINI_TRANSPORT = "rest"
+            settings.GEMINI_API_ENDPOINT = server.url
+            latencies, hedge_wins = run(args.calls, args.concurrency, hedged)
+            requests_made = server.requests
+
+        print(
+            f"{'hedged' if hedged else 'single':<9} "
+            f"{statistics.median(latencies) * 1000:>8.1f} {percentile(latencies, 95) * 1000:>8.1f} "
+            f"{percentile(latencies, 99) * 1000:>8.1f} {max(latencies) * 1000:>8.1f} "
+            f"{requests_made:>13} {hedge_wins:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
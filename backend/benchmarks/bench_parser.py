@@ -0,0 +1,108 @@
+"""Benchmark upload text extraction on ~10 MB multi-page PDF and DOCX inputs.
+
+Compares the previous read-everything-and-decode approach with the streaming
+extractors in apps.analysis.parser. Reports wall time and peak Python heap.
+
+    python -m benchmarks.bench_parser [--size-mb 10] [--repeat 3]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.analysis.parser import MAX_ANALYSIS_TEXT_CHARS, extract_text_from_upload  # noqa: E402
+
+LINE = "Led migration of 40 Django services to Kubernetes, cutting p95 latency by 35% and cloud spend by 22%."
+
+
+class NamedBytesIO(io.BytesIO):
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def build_pdf(target_bytes: int) -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4, pageCompression=0)
+    page_number = 0
+    while buffer.tell() < target_bytes:
+        page_number += 1
+        for row in range(60):
+            pdf.drawString(36, 800 - row * 12, f"p{page_number} {LINE}")
+        pdf.showPage()
+        if page_number % 50 == 0:
+            # Canvas buffers pages until save(); estimate size from the page count instead.
+            if page_number * 8000 >= target_bytes:
+                break
+    pdf.save()
+    return buffer.getvalue()
+
+
+def build_docx(target_bytes: int) -> bytes:
+    paragraph = f"<w:p><w:r><w:t>{LINE}</w:t></w:r></w:p>"
+    body = paragraph * (target_bytes // len(paragraph))
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", document)
+        # Embedded images make real-world DOCX uploads large on the wire.
+        archive.writestr("word/media/image1.png", os.urandom(target_bytes))
+    return buffer.getvalue()
+
+
+def legacy_extract(upload) -> str:
+    raw_bytes = upload.read()
+    upload.seek(0)
+    return raw_bytes.decode("utf-8", errors="ignore")[:MAX_ANALYSIS_TEXT_CHARS]
+
+
+def measure(func, data: bytes, name: str, repeat: int):
+    best = None
+    peak = 0
+    text = ""
+    for _ in range(repeat):
+        upload = NamedBytesIO(data, name)
+        tracemalloc.start()
+        started = time.perf_counter()
+        text = func(upload)
+        elapsed = time.perf_counter() - started
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = elapsed if best is None else min(best, elapsed)
+    printable = sum(ch.isalnum() or ch.isspace() for ch in text) / max(len(text), 1)
+    return best, peak, len(text), printable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=10.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    target = int(args.size_mb * 1024 * 1024)
+
+    inputs = [("resume.pdf", build_pdf(target)), ("resume.docx", build_docx(target))]
+    print(f"{'input':<12} {'size':>8} {'extractor':<10} {'best ms':>9} {'peak MiB':>9} {'chars':>6} {'clean %':>8}")
+    for name, data in inputs:
+        for label, func in (("legacy", legacy_extract), ("streaming", extract_text_from_upload)):
+            elapsed, peak, chars, printable = measure(func, data, name, args.repeat)
+            print(
+                f"{name:<12} {len(data) / 1048576:>7.1f}M {label:<10} {elapsed * 1000:>9.1f} "
+                f"{peak / 1048576:>9.2f} {chars:>6} {printable * 100:>7.1f}%"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Latency of the local ATS pre-scoring engine for typical and maximum-size CVs.
+
+Sources are capped at MAX_ANALYSIS_TEXT_CHARS by the parser, so the largest
+case here is the worst a job can hit before the LLM stage.
+
+    python -m benchmarks.bench_prescore [--repeat 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.analysis.parser import MAX_ANALYSIS_TEXT_CHARS  # noqa: E402
+from apps.analysis.prescore import prescore  # noqa: E402
+
+CV_LINES = [
+    "Senior backend engineer with 8 years of Python, Django and PostgreSQL.",
+    "Led migration of 40 services to Kubernetes, cutting p95 latency by 35% and cloud spend by 22%.",
+    "Built Celery pipelines processing 2M documents per day with Redis and S3.",
+    "Mentored 5 engineers; introduced code review guidelines and contract tests.",
+    "Skills: Python, Django, FastAPI, Celery, Redis, PostgreSQL, Docker, Kubernetes, AWS, Terraform.",
+]
+JOB_DESCRIPTION = (
+    "We are hiring a Backend Engineer to design and operate REST and GraphQL APIs in Python. "
+    "You will own PostgreSQL schemas, Redis caching and asynchronous jobs, deploy with Docker and "
+    "Kubernetes on AWS, and improve observability with Prometheus and OpenTelemetry. "
+    "Experience with Kafka, Terraform and machine learning pipelines is a plus."
+)
+
+
+def build_cv(chars: int) -> str:
+    lines = []
+    while sum(len(line) + 1 for line in lines) < chars:
+        lines.append(CV_LINES[len(lines) % len(CV_LINES)])
+    return "\n".join(lines)[:chars]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'cv chars':>9} {'mean ms':>8} {'p95 ms':>8} {'score':>6}")
+    for chars in (1500, 4000, MAX_ANALYSIS_TEXT_CHARS):
+        cv_text = build_cv(chars)
+        samples = []
+        result = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = prescore(cv_text, JOB_DESCRIPTION)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(f"{chars:>9} {statistics.mean(samples):>8.2f} {p95:>8.2f} {result.ats_score:>6}")
+
+
+if __name__ == "__main__":
+    main()
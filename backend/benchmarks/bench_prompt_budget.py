@@ -0,0 +1,72 @@
+"""Prompt source size and budgeting cost: blind 12,000-character cut vs the section budgeter.
+
+Prints, per synthetic source, the tokens each approach sends to the model, the
+tokens saved, whether the late sections (skills, education) survive, and how
+long budgeting takes.
+
+    python -m benchmarks.bench_prompt_budget [--repeat 50] [--budget 2500]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from apps.analysis.prompt_budget import budget_source_text, estimate_tokens  # noqa: E402
+
+LEGACY_CUT_CHARS = 12000
+ROLE_LINES = [
+    "Senior Engineer, Example Corp {index} ({year} - {end})",
+    "- Led migration of {index} services to Kubernetes, cutting p95 latency by {index}% on the platform.",
+    "- Built Celery pipelines processing {index}M documents per day with Redis and S3.",
+    "- Mentored {index} engineers; introduced code review guidelines and contract tests.",
+]
+
+
+def build_cv(roles: int) -> str:
+    lines = ["Jane Doe", "jane@example.com | linkedin.com/in/janedoe", "", "PROFESSIONAL SUMMARY"]
+    lines += ["Backend engineer with 10 years of Python, Django and PostgreSQL.", "", "WORK EXPERIENCE"]
+    for index in range(roles):
+        year = 2024 - index // 2
+        lines += [line.format(index=index + 1, year=year, end=year + 1) for line in ROLE_LINES]
+        if index % 3 == 2:
+            lines += [f"Page {index // 3 + 1} of {roles // 3 + 1}", "Jane Doe - Curriculum Vitae"]
+    lines += ["", "TECHNICAL SKILLS", "Python, Django, FastAPI, Celery, Redis, PostgreSQL, Docker, Kubernetes, AWS"]
+    lines += ["", "EDUCATION", "BSc Computer Science, Example University, 2014", "", "REFERENCES"]
+    lines += ["Available on request."] * 3
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--budget", type=int, default=2500)
+    args = parser.parse_args()
+
+    print(f"{'roles':>6} {'source tok':>11} {'cut tok':>8} {'budget tok':>11} {'saved':>6} {'skills kept':>12} {'ms':>6}")
+    for roles in (5, 20, 60, 120):
+        source = build_cv(roles)
+        legacy = source[:LEGACY_CUT_CHARS]
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            budgeted = budget_source_text(source, max_tokens=args.budget)
+        elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+        kept = "TECHNICAL SKILLS" in budgeted.text
+        legacy_kept = "TECHNICAL SKILLS" in legacy
+        print(
+            f"{roles:>6} {estimate_tokens(source):>11} {estimate_tokens(legacy):>8} {budgeted.prompt_tokens:>11} "
+            f"{budgeted.tokens_saved:>6} {f'{legacy_kept!s:>5}/{kept!s:<5}':>12} {elapsed_ms:>6.2f}"
+        )
+    print("skills kept: blind cut / budgeter")
+
+
+if __name__ == "__main__":
+    main()
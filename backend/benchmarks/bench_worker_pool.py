@@ -0,0 +1,151 @@
+"""Analysis jobs/sec per core for prefork, thread and gevent worker pools.
+
+Each job runs the I/O-bound part of the pipeline for real: GitHubScraper
+against a fake GitHub API (three requests), skill gap and prompt budgeting,
+then one Gemini REST call against a fake LLM with log-normal latency. The
+database writes and checkpoint saves are left out. Every pool runs in its own
+child process, so the gevent one can monkey-patch before anything is imported.
+
+"prefork" keeps one job in flight per process, as a prefork child does;
+"threads" and "gevent" keep --concurrency jobs in flight in one process.
+"jobs/cpu-s" is the throughput one fully used core would sustain.
+
+    python -m benchmarks.bench_worker_pool [--jobs 600] [--concurrency 200] [--llm-median-ms 800]
+"""
+
+import sys
+
+if __name__ == "__main__" and "--child" in sys.argv and "gevent" in sys.argv:
+    from gevent import monkey
+
+    monkey.patch_all()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import resource  # noqa: E402
+import subprocess  # noqa: E402
+import time  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.stubs import FakeGeminiServer, FakeGitHubServer, fixed_latency, lognormal_latency  # noqa: E402
+
+JOB_DESCRIPTION = "Backend engineer: Python, Django, Celery, PostgreSQL, Redis, Kubernetes, Terraform, AWS."
+POOLS = ("prefork", "threads", "gevent")
+# A prefork child finishes one job per LLM round trip; a handful is enough to measure it.
+PREFORK_JOBS = 12
+
+
+def run_job(index: int) -> bool:
+    from apps.analysis.gemini_client import gemini_client
+    from apps.analysis.github_scraper import github_scraper
+    from apps.analysis.prompt_budget import budget_source_text
+    from apps.analysis.skills import github_skill_text, skill_gap
+
+    scraped = github_scraper.scrape(f"https://github.com/bench/repo-{index}")
+    text = github_scraper.to_analysis_text(scraped)
+    gap = skill_gap(text, JOB_DESCRIPTION, github_skill_text(scraped))
+    prompt = gemini_client.build_prompt(budget_source_text(text).text, JOB_DESCRIPTION, "github", skill_gap=gap)
+    result = gemini_client.analyze_resume(text, JOB_DESCRIPTION, source_kind="github", prompt=prompt)
+    # Errors fall back to the mock result, which carries no llm_meta.
+    return "llm_meta" in result
+
+
+def run_child(pool: str, jobs: int, concurrency: int) -> dict:
+    import django
+
+    django.setup()
+    from apps.analysis.gemini_client import gemini_client
+    from apps.analysis.skills import get_skill_taxonomy
+
+    # Build the taxonomy and the REST client up front, as a warm worker would have them.
+    get_skill_taxonomy()
+    gemini_client.warm_up()
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    if pool == "prefork":
+        results = [run_job(index) for index in range(jobs)]
+    elif pool == "threads":
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(run_job, range(jobs)))
+    else:
+        from gevent.pool import Pool
+
+        results = Pool(concurrency).map(run_job, range(jobs))
+    elapsed = time.perf_counter() - started
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+
+    cpu = (usage.ru_utime - usage_before.ru_utime) + (usage.ru_stime - usage_before.ru_stime)
+    return {
+        "pool": pool,
+        "in_flight": 1 if pool == "prefork" else concurrency,
+        "jobs": jobs,
+        "failed": results.count(False),
+        "elapsed": elapsed,
+        "cpu": cpu,
+        "rss_mb": usage.ru_maxrss / 1024,
+    }
+
+
+def spawn(pool: str, jobs: int, concurrency: int, github_url: str, gemini_url: str) -> dict:
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "config.settings",
+        "GEMINI_API_KEY": "bench",
+        "GEMINI_TRANSPORT": "rest",
+        "GEMINI_API_ENDPOINT": gemini_url,
+        "GEMINI_HEDGE_ENABLED": "false",
+        "GITHUB_API_URL": github_url,
+        "GITHUB_CACHE_ENABLED": "false",
+        "ANALYSIS_CACHE_ENABLED": "false",
+    }
+    command = [
+        sys.executable, "-m", "benchmarks.bench_worker_pool", "--child",
+        "--pool", pool, "--jobs", str(jobs), "--concurrency", str(concurrency),
+    ]
+    output = subprocess.run(command, cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--llm-median-ms", type=float, default=800)
+    parser.add_argument("--github-ms", type=float, default=80)
+    parser.add_argument("--pools", default=",".join(POOLS))
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--pool", choices=POOLS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.pool, args.jobs, args.concurrency)))
+        return
+
+    rows = []
+    with FakeGitHubServer(latency=fixed_latency(args.github_ms / 1000)) as github, FakeGeminiServer(
+        latency=lognormal_latency(args.llm_median_ms / 1000, sigma=0.4, seed=7)
+    ) as gemini:
+        for pool in args.pools.split(","):
+            jobs = min(args.jobs, PREFORK_JOBS) if pool == "prefork" else args.jobs
+            rows.append(spawn(pool, jobs, args.concurrency, github.url, gemini.url))
+
+    print(
+        f"{'pool':<8} {'in flight':>9} {'jobs':>6} {'failed':>7} {'wall s':>7} {'jobs/s':>8} "
+        f"{'cpu s':>7} {'jobs/cpu-s':>11} {'rss MB':>7}"
+    )
+    for row in rows:
+        print(
+            f"{row['pool']:<8} {row['in_flight']:>9} {row['jobs']:>6} {row['failed']:>7} {row['elapsed']:>7.2f} "
+            f"{row['jobs'] / row['elapsed']:>8.1f} {row['cpu']:>7.2f} {row['jobs'] / row['cpu']:>11.1f} "
+            f"{row['rss_mb']:>7.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
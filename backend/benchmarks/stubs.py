@@ -0,0 +1,204 @@
+"""Local stub upstreams for benchmarks: fake Gemini and GitHub REST APIs with injectable latency."""
+
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANALYSIS = {
+    "ats_score": 74,
+    "overall_summary": "Solid backend profile.",
+    "strengths": ["Django", "Celery"],
+    "weaknesses": ["Few metrics"],
+    "missing_keywords": ["Kubernetes"],
+    "feature_highlights": ["Async pipelines"],
+    "rewritten_summary": "Backend engineer.",
+    "improved_bullets": ["Cut p95 latency by 35%."],
+    "next_actions": ["Add metrics."],
+}
+
+
+def fixed_latency(seconds: float):
+    return lambda: seconds
+
+
+def lognormal_latency(median: float, sigma: float = 0.6, seed=None):
+    """Heavy-tailed latency distribution, roughly what LLM APIs show in practice."""
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def sample():
+        with lock:
+            return rng.lognormvariate(0, sigma) * median
+
+    return sample
+
+
+class StubServer:
+    def __init__(self, handler_class):
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        owner = self
+
+        class Handler(handler_class):
+            server_owner = owner
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with owner._lock:
+                    owner.connections += 1
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_text(self, text: str, status=200):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeGeminiServer(StubServer):
+    """Answers generateContent / streamGenerateContent like the v1beta REST API."""
+
+    def __init__(self, latency=None, analysis=None):
+        self.latency = latency or fixed_latency(0.0)
+        self.analysis = analysis or DEFAULT_ANALYSIS
+        self.models = []
+        super().__init__(self._handler())
+
+    def _handler(self):
+        class Handler(_JsonHandler):
+            def do_POST(self):
+                owner = self.server_owner
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                owner.count_request()
+                model = self.path.split("/models/", 1)[-1].split(":", 1)[0]
+                owner.models.append(model)
+
+                delay = owner.latency()
+                if delay:
+                    time.sleep(delay)
+
+                text = json.dumps(owner.analysis)
+                if ":streamGenerateContent" in self.path:
+                    # The REST stream is a JSON array of partial responses.
+                    step = max(1, len(text) // 4)
+                    chunks = [text[i : i + step] for i in range(0, len(text), step)]
+                    self.send_json([_candidate(chunk) for chunk in chunks])
+                    return
+                self.send_json(_candidate(text))
+
+        return Handler
+
+
+DEFAULT_README = """# Task Queue Service
+
+Distributed job runner built with Python, Django and Celery on PostgreSQL and Redis.
+
+## Features
+- Priority queues with per-tenant fairness
+- Retries with exponential backoff and dead-letter handling
+- Prometheus metrics and Grafana dashboards
+
+## Architecture
+Workers pull from Redis; results land in PostgreSQL. Deployed with Docker on Kubernetes.
+
+## Installation
+pip install -r requirements.txt
+"""
+
+
+class FakeGitHubServer(StubServer):
+    """Answers the repository and user endpoints GitHubScraper calls, after ``latency``."""
+
+    def __init__(self, latency=None, readme=DEFAULT_README):
+        self.latency = latency or fixed_latency(0.0)
+        self.readme = readme
+        super().__init__(self._handler())
+
+    def _handler(self):
+        class Handler(_JsonHandler):
+            def do_GET(self):
+                owner = self.server_owner
+                owner.count_request()
+                delay = owner.latency()
+                if delay:
+                    time.sleep(delay)
+
+                parts = [part for part in self.path.split("?", 1)[0].split("/") if part]
+                if parts[:1] == ["repos"] and len(parts) == 3:
+                    self.send_json(_repo(parts[1], parts[2]))
+                elif parts[:1] == ["repos"] and parts[3:] == ["languages"]:
+                    self.send_json({"Python": 81234, "Shell": 2311, "Dockerfile": 640})
+                elif parts[:1] == ["repos"] and parts[3:] == ["readme"]:
+                    self.send_text(owner.readme)
+                elif parts[:1] == ["users"] and len(parts) == 2:
+                    self.send_json({"login": parts[1], "name": parts[1].title(), "bio": "Backend engineer",
+                                    "followers": 120, "public_repos": 8})
+                elif parts[:1] == ["users"] and parts[2:] == ["repos"]:
+                    self.send_json([_repo(parts[1], f"project-{index}") for index in range(8)])
+                else:
+                    self.send_json({"message": "Not Found"}, status=404)
+
+        return Handler
+
+
+def _repo(owner: str, name: str) -> dict:
+    return {
+        "name": name,
+        "full_name": f"{owner}/{name}",
+        "description": "Distributed job runner",
+        "stargazers_count": 42,
+        "forks_count": 7,
+        "topics": ["celery", "django", "task-queue"],
+        "language": "Python",
+        "pushed_at": "2026-01-05T10:00:00Z",
+        "updated_at": "2026-01-05T10:00:00Z",
+    }
+
+
+def _candidate(text: str) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": 1}]}
@@ -1,9 +1,26 @@
 ﻿import os
+import sys
 
 from celery import Celery
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
+
+def gevent_patched() -> bool:
+    if "gevent" not in sys.modules:
+        return False
+    from gevent import monkey
+
+    return monkey.is_module_patched("socket")
+
+
+if gevent_patched():
+    # `--pool gevent` monkey-patches the stdlib before this module is imported, but psycopg2
+    # is a C extension: without a wait callback every query would block all greenlets.
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
+
 app = Celery("cv_analyzer")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
@@ -2,6 +2,7 @@ import os
 import urllib.parse
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -142,6 +143,14 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Uploads, extracted text and prompts are handed from web to worker by storage key.
+# "local" keeps them under MEDIA_ROOT, which web and worker must then share (one volume mounted
+# by both services). "s3" uses an S3-compatible bucket instead; credentials come from the usual
+# AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY variables.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+STORAGE_S3_BUCKET = os.getenv("STORAGE_S3_BUCKET", "")
+STORAGE_S3_ENDPOINT_URL = os.getenv("STORAGE_S3_ENDPOINT_URL", "")
+STORAGE_S3_REGION = os.getenv("STORAGE_S3_REGION", "")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -166,6 +175,8 @@ if cors_allow_all_env is None:
     CORS_ALLOW_ALL_ORIGINS = DEBUG or (not CORS_ALLOWED_ORIGINS and not CORS_ALLOWED_ORIGIN_REGEXES)
 else:
     CORS_ALLOW_ALL_ORIGINS = cors_allow_all_env.lower() == "true"
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
 
 USE_X_FORWARDED_HOST = True
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
@@ -177,12 +188,114 @@ REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/1")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/2")
 
+# CPU-bound document extraction can be pointed at a dedicated prefork worker (see start-worker.sh).
+ANALYZE_EXTRACTION_QUEUE = os.getenv("ANALYZE_EXTRACTION_QUEUE", "celery")
+CELERY_TASK_ROUTES = {
+    "apps.analysis.tasks.extract_analyze_source": {"queue": ANALYZE_EXTRACTION_QUEUE},
+}
+# process_analyze_job is routed per job by the owner's plan (apps/analysis/queues.py), so a
+# free-plan backlog cannot starve Pro jobs; start-worker.sh sizes a pool per queue.
+ANALYZE_QUEUE_PRO = os.getenv("ANALYZE_QUEUE_PRO", "analysis.pro")
+ANALYZE_QUEUE_FREE = os.getenv("ANALYZE_QUEUE_FREE", "analysis.free")
+# Analysis tasks run for seconds; reserving one at a time keeps queues fair across workers.
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv("CELERY_WORKER_PREFETCH_MULTIPLIER", "1"))
+# process_analyze_job time limits: the soft one raises inside the task (which then retries from
+# its checkpoint), the hard one kills it. No stage may outlive the hard limit, so a PROCESSING job
+# whose heartbeat is older than ANALYZE_STALE_AFTER_SECONDS has lost its worker; the reaper
+# re-enqueues it up to ANALYZE_REAP_MAX_REQUEUES times and fails it after that.
+ANALYZE_TASK_SOFT_TIME_LIMIT = int(os.getenv("ANALYZE_TASK_SOFT_TIME_LIMIT", "240"))
+ANALYZE_TASK_TIME_LIMIT = int(os.getenv("ANALYZE_TASK_TIME_LIMIT", "300"))
+ANALYZE_STALE_AFTER_SECONDS = int(os.getenv("ANALYZE_STALE_AFTER_SECONDS", "420"))
+ANALYZE_REAP_MAX_REQUEUES = int(os.getenv("ANALYZE_REAP_MAX_REQUEUES", "1"))
+# PENDING jobs still without a checkpoint after this long were lost before analysis started.
+ANALYZE_PENDING_STALE_AFTER_SECONDS = int(os.getenv("ANALYZE_PENDING_STALE_AFTER_SECONDS", "3600"))
+ANALYZE_REAPER_INTERVAL_SECONDS = int(os.getenv("ANALYZE_REAPER_INTERVAL_SECONDS", "60"))
+# Drops Idempotency-Key records past IDEMPOTENCY_TTL_SECONDS (see below).
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = int(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "3600"))
+CELERY_BEAT_SCHEDULE = {
+    "reap-stale-analyze-jobs": {
+        "task": "apps.analysis.tasks.reap_stale_analyze_jobs",
+        "schedule": ANALYZE_REAPER_INTERVAL_SECONDS,
+    },
+    "purge-idempotency-records": {
+        "task": "apps.accounts.tasks.purge_idempotency_records",
+        "schedule": IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+    },
+}
+
 ANALYZE_RESULT_TTL_SECONDS = int(os.getenv("ANALYZE_RESULT_TTL_SECONDS", "1800"))
 MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "10"))
+UPLOAD_CONTENT_HASH_ENABLED = os.getenv("UPLOAD_CONTENT_HASH_ENABLED", "true").lower() == "true"
+# POST /api/analyze/batch: one JD against many CVs (multi-file upload or a zip archive).
+ANALYZE_BATCH_MAX_FILES = int(os.getenv("ANALYZE_BATCH_MAX_FILES", "500"))
+ANALYZE_BATCH_MAX_UPLOAD_MB = int(os.getenv("ANALYZE_BATCH_MAX_UPLOAD_MB", "200"))
+DATA_UPLOAD_MAX_NUMBER_FILES = ANALYZE_BATCH_MAX_FILES + 1
+# Identical submissions (owner, file hash or GitHub URL, JD) join the job already in flight.
+ANALYZE_COALESCE_ENABLED = os.getenv("ANALYZE_COALESCE_ENABLED", "true").lower() == "true"
+ANALYZE_COALESCE_TTL_SECONDS = int(os.getenv("ANALYZE_COALESCE_TTL_SECONDS", "900"))
+# Idempotency-Key replay window, and how long an unfinished first attempt blocks retries. The lock
+# must outlast the slowest request (a slow upload plus GUNICORN_TIMEOUT), or a retry runs it twice.
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "600"))
+# Skill/alias list for the deterministic keyword gap; empty uses apps/analysis/data/skill_taxonomy.txt.
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", "")
+# Token budget for the candidate source inside the prompt; sections are kept by priority.
+ANALYSIS_PROMPT_SOURCE_TOKENS = int(os.getenv("ANALYSIS_PROMPT_SOURCE_TOKENS", "2500"))
+# Close the job's DB connection before the scrape and LLM stages. Set by the "io" worker
+# profile, where hundreds of in-flight jobs would otherwise each hold a connection while waiting.
+ANALYZE_RELEASE_DB_DURING_IO = os.getenv("ANALYZE_RELEASE_DB_DURING_IO", "false").lower() == "true"
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+# Optional transport ("grpc" or "rest") and endpoint override, e.g. a local stub server.
+GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT", "")
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "")
+# Cluster-wide Gemini budget shared through Redis; 0 disables a limit.
+GEMINI_RATE_LIMIT_RPM = int(os.getenv("GEMINI_RATE_LIMIT_RPM", "0"))
+GEMINI_RATE_LIMIT_TPM = int(os.getenv("GEMINI_RATE_LIMIT_TPM", "0"))
+GEMINI_MAX_IN_FLIGHT = int(os.getenv("GEMINI_MAX_IN_FLIGHT", "0"))
+GEMINI_IN_FLIGHT_LEASE_SECONDS = int(os.getenv("GEMINI_IN_FLIGHT_LEASE_SECONDS", "120"))
+GEMINI_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("GEMINI_RATE_LIMIT_MAX_WAIT_SECONDS", "5"))
+GEMINI_PROVIDER_BACKOFF_SECONDS = float(os.getenv("GEMINI_PROVIDER_BACKOFF_SECONDS", "30"))
+# Hedged requests: once the primary call runs past the given latency percentile, race a
+# second call (same model, or GEMINI_FALLBACK_MODEL) and keep the first answer.
+GEMINI_HEDGE_ENABLED = os.getenv("GEMINI_HEDGE_ENABLED", "false").lower() == "true"
+GEMINI_HEDGE_PERCENTILE = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "95"))
+GEMINI_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("GEMINI_HEDGE_MIN_DELAY_SECONDS", "2"))
+GEMINI_FALLBACK_MODEL = os.getenv("GEMINI_FALLBACK_MODEL", "")
+# Stream generations and publish each completed top-level field for GET /api/analyze/<id>/stream.
+GEMINI_STREAMING_ENABLED = os.getenv("GEMINI_STREAMING_ENABLED", "true").lower() == "true"
+ANALYZE_STREAM_MAX_SECONDS = int(os.getenv("ANALYZE_STREAM_MAX_SECONDS", "120"))
+ANALYZE_STREAM_KEEPALIVE_SECONDS = int(os.getenv("ANALYZE_STREAM_KEEPALIVE_SECONDS", "15"))
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
+# Optional comma-separated token pool; requests go to the token with the most X-RateLimit budget
+# left. When all are spent, GitHub jobs are deferred until the earliest reset instead of failing.
+GITHUB_TOKENS = os.getenv("GITHUB_TOKENS", "")
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "0"))
+GITHUB_RATE_LIMIT_DEFAULT_WAIT_SECONDS = int(os.getenv("GITHUB_RATE_LIMIT_DEFAULT_WAIT_SECONDS", "60"))
+# GitHub REST root; override for GitHub Enterprise or a local stub.
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+# GitHub responses are kept with their ETag: within the fresh window no request is made, after
+# it a conditional request revalidates them (304s do not count against the rate limit).
+GITHUB_CACHE_ENABLED = os.getenv("GITHUB_CACHE_ENABLED", "true").lower() == "true"
+GITHUB_CACHE_FRESH_SECONDS = int(os.getenv("GITHUB_CACHE_FRESH_SECONDS", "300"))
+GITHUB_CACHE_TTL_SECONDS = int(os.getenv("GITHUB_CACHE_TTL_SECONDS", "86400"))
+# "graphql" scrapes a source in one query (profile, top repos with language sizes and topics,
+# README blobs); it needs GITHUB_TOKEN or GITHUB_TOKENS and falls back to "rest" without one.
+GITHUB_SCRAPER_BACKEND = os.getenv("GITHUB_SCRAPER_BACKEND", "rest").lower()
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+GITHUB_GRAPHQL_REPOS = int(os.getenv("GITHUB_GRAPHQL_REPOS", "20"))
+# Whole scraped sources shared across users by canonical owner/repo or login, so a repeat GitHub
+# job only pays for the LLM stage; least recently used entries go first past MAX_ENTRIES.
+GITHUB_SOURCE_CACHE_ENABLED = os.getenv("GITHUB_SOURCE_CACHE_ENABLED", "true").lower() == "true"
+GITHUB_SOURCE_CACHE_TTL_SECONDS = int(os.getenv("GITHUB_SOURCE_CACHE_TTL_SECONDS", "21600"))
+GITHUB_SOURCE_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_SOURCE_CACHE_MAX_ENTRIES", "5000"))
+
+# Content-addressed LLM result cache. Scope "user" keys entries per owner, "global" shares them.
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+ANALYSIS_CACHE_SCOPE = os.getenv("ANALYSIS_CACHE_SCOPE", "user").lower()
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "604800"))
+ANALYSIS_PROMPT_VERSION = os.getenv("ANALYSIS_PROMPT_VERSION", "3")
 
 FREE_PLAN_ANALYSIS_LIMIT = int(os.getenv("FREE_PLAN_ANALYSIS_LIMIT", "25"))
 
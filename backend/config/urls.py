@@ -1,7 +1,13 @@
 ﻿from django.contrib import admin
 from django.urls import include, path
 
-from apps.analysis.views import AnalyzeCreateView, AnalyzeStatusView
+from apps.analysis.views import (
+    AnalyzeBatchCreateView,
+    AnalyzeBatchStatusView,
+    AnalyzeCreateView,
+    AnalyzeStatusView,
+    AnalyzeStreamView,
+)
 from apps.billing.views import AdminMetricsView
 from apps.resumes.views import ResumeDetailView, ResumeListCreateView, ResumePdfExportView, ResumeShareCreateView
 from apps.sharing.views import ShareDetailView
@@ -17,6 +23,9 @@ urlpatterns = [
     path("api/auth/", include("apps.accounts.urls")),
     path("api/analyze", AnalyzeCreateView.as_view(), name="analyze-create"),
     path("api/analyze/<uuid:job_id>", AnalyzeStatusView.as_view(), name="analyze-status"),
+    path("api/analyze/<uuid:job_id>/stream", AnalyzeStreamView.as_view(), name="analyze-stream"),
+    path("api/analyze/batch", AnalyzeBatchCreateView.as_view(), name="analyze-batch-create"),
+    path("api/analyze/batch/<uuid:batch_id>", AnalyzeBatchStatusView.as_view(), name="analyze-batch-status"),
     path("api/resumes", ResumeListCreateView.as_view(), name="resume-list-create"),
     path("api/resumes/<int:resume_id>", ResumeDetailView.as_view(), name="resume-detail"),
     path("api/resumes/<int:resume_id>/share", ResumeShareCreateView.as_view(), name="resume-share"),
@@ -11,3 +11,18 @@ def set_json_cache(key: str, payload: dict, ttl: int) -> None:
 
 def get_json_cache(key: str):
     return cache.get(key)
+
+
+def increment_cache_counter(key: str, amount: int = 1) -> int:
+    # add() is a no-op when the key exists, so concurrent first increments do not reset each other.
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key, amount)
+    except ValueError:
+        cache.set(key, amount, timeout=None)
+        return amount
+
+
+def get_cache_counters(keys: list[str]) -> dict:
+    values = cache.get_many(keys)
+    return {key: int(values.get(key) or 0) for key in keys}
@@ -0,0 +1,119 @@
+import time
+import uuid
+from dataclasses import dataclass
+
+from core.redis_client import get_redis_client
+
+# Refills every bucket from Redis server time and consumes from all of them only
+# when every bucket has enough tokens, so a request never burns RPM budget while
+# being refused on TPM. Returns {allowed, wait_ms, remaining...}.
+_TOKEN_BUCKETS_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local allowed = 1
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local base = (i - 1) * 3
+    local capacity = tonumber(ARGV[base + 1])
+    local rate = tonumber(ARGV[base + 2])
+    local requested = math.min(tonumber(ARGV[base + 3]), capacity)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < requested then
+        allowed = 0
+        wait = math.max(wait, (requested - tokens) / rate)
+    end
+end
+local result = {allowed, math.ceil(wait * 1000)}
+for i, key in ipairs(KEYS) do
+    local base = (i - 1) * 3
+    local capacity = tonumber(ARGV[base + 1])
+    local rate = tonumber(ARGV[base + 2])
+    local tokens = levels[i]
+    if allowed == 1 then
+        tokens = tokens - math.min(tonumber(ARGV[base + 3]), capacity)
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 60)
+    table.insert(result, tostring(tokens))
+end
+return result
+"""
+
+# Holders are a sorted set scored by lease expiry, so slots held by a killed
+# worker free themselves once the lease runs out.
+_SEMAPHORE_ACQUIRE_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+    redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2])) + 60)
+    return 1
+end
+return 0
+"""
+
+
+@dataclass
+class Bucket:
+    name: str
+    key: str
+    capacity: float
+    refill_per_second: float
+
+
+class TokenBuckets:
+    """Atomic multi-bucket token limiter backed by Redis. Buckets with zero capacity are disabled."""
+
+    def __init__(self, buckets: list[Bucket]):
+        self.buckets = [bucket for bucket in buckets if bucket.capacity > 0]
+
+    def try_acquire(self, amounts: dict):
+        """Returns (allowed, wait_seconds). ``amounts`` maps bucket names to the cost of this request."""
+        if not self.buckets:
+            return True, 0.0
+        client = get_redis_client()
+        args = []
+        for bucket in self.buckets:
+            args.extend([bucket.capacity, bucket.refill_per_second, amounts.get(bucket.name, 0)])
+        allowed, wait_ms, *_levels = client.eval(
+            _TOKEN_BUCKETS_LUA, len(self.buckets), *[bucket.key for bucket in self.buckets], *args
+        )
+        return bool(allowed), int(wait_ms) / 1000
+
+    def levels(self) -> dict:
+        client = get_redis_client()
+        levels = {}
+        for bucket in self.buckets:
+            tokens = client.hget(bucket.key, "tokens")
+            levels[bucket.name] = float(tokens) if tokens is not None else float(bucket.capacity)
+        return levels
+
+
+class DistributedSemaphore:
+    def __init__(self, key: str, limit: int, lease_seconds: int):
+        self.key = key
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+
+    def try_acquire(self):
+        """Returns a holder token, or None when every slot is taken."""
+        if self.limit <= 0:
+            return ""
+        token = uuid.uuid4().hex
+        acquired = get_redis_client().eval(_SEMAPHORE_ACQUIRE_LUA, 1, self.key, self.limit, self.lease_seconds, token)
+        return token if acquired else None
+
+    def release(self, token) -> None:
+        if token:
+            get_redis_client().zrem(self.key, token)
+
+    def in_use(self) -> int:
+        if self.limit <= 0:
+            return 0
+        return get_redis_client().zcount(self.key, time.time(), "+inf")
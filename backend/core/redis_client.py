@@ -0,0 +1,23 @@
+import os
+import threading
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+
+
+def get_redis_client():
+    """Shared raw Redis client for Lua scripts, pub/sub and counters the cache API cannot express.
+
+    One connection pool per process; a forked child builds its own.
+    """
+    global _client, _client_pid
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            import redis
+
+            _client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=5, health_check_interval=30)
+            _client_pid = os.getpid()
+        return _client
@@ -1,8 +1,13 @@
-﻿from dataclasses import dataclass
+﻿from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+import tempfile
 import uuid
 
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 @dataclass
@@ -12,16 +17,118 @@ class StoredFile:
 
 
 class LocalStorageService:
-    """MVP local storage abstraction. Can be replaced with S3/R2 service."""
+    """Keeps blobs under MEDIA_ROOT, so web and worker must share that directory."""
 
     def save_temp_upload(self, upload_file) -> StoredFile:
         file_key = f"tmp/{uuid.uuid4()}_{upload_file.name}"
-        file_path = Path(settings.MEDIA_ROOT) / file_key
+        file_path = self.path_for(file_key)
         file_path.parent.mkdir(parents=True, exist_ok=True)
         with file_path.open("wb+") as dst:
             for chunk in upload_file.chunks():
                 dst.write(chunk)
         return StoredFile(key=file_key, path=str(file_path))
 
+    def save_temp_text(self, text: str, name: str = "source.txt") -> StoredFile:
+        file_key = f"tmp/{uuid.uuid4()}_{name}"
+        file_path = self.path_for(file_key)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(text, encoding="utf-8")
+        return StoredFile(key=file_key, path=str(file_path))
+
+    def read_text(self, file_key: str) -> str:
+        return self.path_for(file_key).read_text(encoding="utf-8", errors="ignore")
+
+    @contextmanager
+    def local_copy(self, file_key: str):
+        yield self.path_for(file_key)
+
+    def delete(self, file_key: str) -> None:
+        if not file_key:
+            return
+        self.path_for(file_key).unlink(missing_ok=True)
+
+    def path_for(self, file_key: str) -> Path:
+        root = Path(settings.MEDIA_ROOT).resolve()
+        file_path = (root / file_key).resolve()
+        if root not in file_path.parents:
+            raise ValueError("Storage key escapes the media root.")
+        return file_path
+
+
+@contextmanager
+def _s3_errors():
+    # Callers retry on OSError (extract_analyze_source autoretries it), as with local files.
+    try:
+        yield
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+            raise FileNotFoundError(str(exc)) from exc
+        raise OSError(str(exc)) from exc
+    except BotoCoreError as exc:
+        raise OSError(str(exc)) from exc
+
+
+class S3StorageService:
+    """Keeps blobs in an S3-compatible bucket (AWS S3, Cloudflare R2, MinIO) that every service can reach."""
+
+    def __init__(self, client=None):
+        if not settings.STORAGE_S3_BUCKET:
+            raise ImproperlyConfigured("STORAGE_BACKEND=s3 requires STORAGE_S3_BUCKET.")
+        self.bucket = settings.STORAGE_S3_BUCKET
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=settings.STORAGE_S3_ENDPOINT_URL or None,
+                region_name=settings.STORAGE_S3_REGION or None,
+            )
+        return self._client
+
+    def save_temp_upload(self, upload_file) -> StoredFile:
+        file_key = f"tmp/{uuid.uuid4()}_{upload_file.name}"
+        self._put(file_key, b"".join(upload_file.chunks()))
+        return StoredFile(key=file_key, path=self._url(file_key))
+
+    def save_temp_text(self, text: str, name: str = "source.txt") -> StoredFile:
+        file_key = f"tmp/{uuid.uuid4()}_{name}"
+        self._put(file_key, text.encode("utf-8"))
+        return StoredFile(key=file_key, path=self._url(file_key))
+
+    def read_text(self, file_key: str) -> str:
+        with _s3_errors():
+            body = self.client.get_object(Bucket=self.bucket, Key=file_key)["Body"].read()
+        return body.decode("utf-8", errors="ignore")
+
+    @contextmanager
+    def local_copy(self, file_key: str):
+        # Parsers and zipfile want a seekable file; the original name keeps the suffix they dispatch on.
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / Path(file_key).name
+            with _s3_errors():
+                self.client.download_file(self.bucket, file_key, str(file_path))
+            yield file_path
+
+    def delete(self, file_key: str) -> None:
+        if not file_key:
+            return
+        with _s3_errors():
+            self.client.delete_object(Bucket=self.bucket, Key=file_key)
+
+    def _put(self, file_key: str, body: bytes) -> None:
+        with _s3_errors():
+            self.client.put_object(Bucket=self.bucket, Key=file_key, Body=body)
+
+    def _url(self, file_key: str) -> str:
+        return f"s3://{self.bucket}/{file_key}"
+
+
+def build_storage_service():
+    if settings.STORAGE_BACKEND == "s3":
+        return S3StorageService()
+    return LocalStorageService()
+
 
-storage_service = LocalStorageService()
+storage_service = build_storage_service()
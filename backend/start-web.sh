@@ -4,6 +4,16 @@ set -e
 python manage.py migrate --noinput
 python manage.py collectstatic --noinput
 
+# WEB_ASGI=true serves config.asgi through uvicorn workers, which keeps
+# long-lived /api/analyze/<id>/stream connections off the worker threads.
+if [ "${WEB_ASGI:-false}" = "true" ]; then
+  exec gunicorn config.asgi:application \
+    --worker-class uvicorn_worker.UvicornWorker \
+    --bind 0.0.0.0:${PORT:-8000} \
+    --workers ${GUNICORN_WORKERS:-3} \
+    --timeout ${GUNICORN_TIMEOUT:-120}
+fi
+
 exec gunicorn config.wsgi:application \
   --bind 0.0.0.0:${PORT:-8000} \
   --workers ${GUNICORN_WORKERS:-3} \
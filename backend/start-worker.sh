@@ -2,10 +2,63 @@
 set -e
 
 export C_FORCE_ROOT=${C_FORCE_ROOT:-true}
+ANALYZE_QUEUE_PRO=${ANALYZE_QUEUE_PRO:-analysis.pro}
+ANALYZE_QUEUE_FREE=${ANALYZE_QUEUE_FREE:-analysis.free}
+EXTRACTION_QUEUE=${ANALYZE_EXTRACTION_QUEUE:-celery}
+# CELERY_WORKER_PROFILE=io: analysis jobs spend nearly all their time waiting on
+# GitHub and Gemini, so one gevent process keeps hundreds of them in flight.
+# Extraction is CPU-bound and stays on a prefork worker on ANALYZE_EXTRACTION_QUEUE.
+if [ "${CELERY_WORKER_PROFILE:-}" = "io" ]; then
+  CELERY_POOL=${CELERY_POOL:-gevent}
+  CELERY_CONCURRENCY=${CELERY_CONCURRENCY:-${CELERY_IO_CONCURRENCY:-200}}
+  CELERY_QUEUES=${CELERY_QUEUES:-${ANALYZE_QUEUE_PRO},${ANALYZE_QUEUE_FREE}}
+  case ",${CELERY_QUEUES}," in
+    *",${EXTRACTION_QUEUE},"*) ;;
+    *) echo "start-worker.sh: the io profile does not consume ${EXTRACTION_QUEUE};" \
+         "run a prefork worker with CELERY_QUEUES=${EXTRACTION_QUEUE} next to it." >&2 ;;
+  esac
+  # The gRPC transport does not yield to gevent; REST goes through patched sockets.
+  export GEMINI_TRANSPORT=${GEMINI_TRANSPORT:-rest}
+  export ANALYZE_RELEASE_DB_DURING_IO=${ANALYZE_RELEASE_DB_DURING_IO:-true}
+fi
 CELERY_CONCURRENCY=${CELERY_CONCURRENCY:-2}
 CELERY_POOL=${CELERY_POOL:-prefork}
+# Comma-separated queues to consume, e.g. "celery" (ANALYZE_EXTRACTION_QUEUE) for a CPU-bound pool
+# started with CELERY_CONCURRENCY=$(nproc). The default consumes every queue;
+# a worker on several queues takes from them in turn, so a free-plan backlog
+# only ever delays a Pro job by one task per process.
+CELERY_QUEUES=${CELERY_QUEUES:-${EXTRACTION_QUEUE},${ANALYZE_QUEUE_PRO},${ANALYZE_QUEUE_FREE}}
+# Weighted pools, e.g. "analysis.pro=3,analysis.free=1,celery=1": one worker per
+# queue with CELERY_CONCURRENCY * weight processes, so each is sized on its own.
+CELERY_QUEUE_WEIGHTS=${CELERY_QUEUE_WEIGHTS:-}
+
+if [ -n "${CELERY_QUEUE_WEIGHTS}" ]; then
+  # Extraction and the batch tasks run on this queue; without a pool for it uploads stay pending.
+  case ",${CELERY_QUEUE_WEIGHTS}" in
+    *",${EXTRACTION_QUEUE}="*) ;;
+    *) echo "start-worker.sh: CELERY_QUEUE_WEIGHTS has no ${EXTRACTION_QUEUE} pool;" \
+         "make sure another worker consumes it." >&2 ;;
+  esac
+  pids=""
+  for entry in $(echo "${CELERY_QUEUE_WEIGHTS}" | tr ',' ' '); do
+    queue=${entry%%=*}
+    weight=${entry#*=}
+    celery -A config worker \
+      -l ${CELERY_LOG_LEVEL:-info} \
+      --pool "${CELERY_POOL}" \
+      --concurrency $((CELERY_CONCURRENCY * weight)) \
+      --queues "${queue}" \
+      --hostname "${queue}@%h" &
+    pids="${pids} $!"
+  done
+  # Forward stop signals so every pool gets its warm shutdown.
+  trap 'kill -TERM ${pids} 2>/dev/null; wait' TERM INT
+  wait
+  exit 0
+fi
 
 exec celery -A config worker \
   -l ${CELERY_LOG_LEVEL:-info} \
   --pool "${CELERY_POOL}" \
-  --concurrency "${CELERY_CONCURRENCY}"
+  --concurrency "${CELERY_CONCURRENCY}" \
+  --queues "${CELERY_QUEUES}"